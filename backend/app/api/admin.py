@@ -0,0 +1,38 @@
+"""
+API routes for maintenance tasks.
+"""
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, HTTPException, Query
+from app.core.readiness import requires
+from app.services.reindexer import reindexer
+
+router = APIRouter()
+
+
+@router.post(
+    "/admin/reindex",
+    status_code=202,
+    dependencies=[requires("embedding_model", "vector_store")]
+)
+async def start_reindex(
+    model: Optional[str] = Query(None, description="Embedding model (default EMBEDDING_MODEL)")
+) -> Dict[str, Any]:
+    """
+    Re-embed all entries into a new collection in the background.
+
+    Search keeps using the current collection until the new one is complete,
+    then switches over. An interrupted run for the same model resumes from
+    its last checkpoint. Follow progress with GET /admin/reindex.
+    """
+    try:
+        return reindexer.start(model)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/admin/reindex")
+async def get_reindex_status() -> Dict[str, Any]:
+    """Get re-index progress (indexed/total, entries per second, ETA)."""
+    return await reindexer.get_status()
@@ -2,19 +2,27 @@
 API routes for entries management.
 """
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from app.models.entry import (
     Entry,
     EntryCreate,
+    EntryBulkCreate,
     EntryUpdate,
+    EnrichmentStatus,
     SearchResult,
+    SearchBatchRequest,
+    SearchBatchResult,
     KnowledgeGraph
 )
+from app.core.config import settings
+from app.core.readiness import readiness, requires
 from app.db.database import db
-from app.services.ai_processor import ai_processor
+from app.services.enrichment_queue import PRIORITY_BULK, PRIORITY_INTERACTIVE, enrichment_queue
+from app.services.inference import InferenceOverloaded
 from app.services.semantic_search import semantic_search
 from app.services.knowledge_graph import knowledge_graph
 from datetime import datetime
+import asyncio
 import uuid
 
 router = APIRouter()
@@ -23,117 +31,131 @@ router = APIRouter()
 @router.post("/entries", response_model=Entry, status_code=201)
 async def create_entry(entry_data: EntryCreate):
     """
-    Create a new entry with AI processing.
-
-    This endpoint:
-    1. Accepts the entry content
-    2. Processes it with AI to extract insights
-    3. Generates embeddings for semantic search
-    4. Builds knowledge graph connections
-    5. Returns the enriched entry
+    Create a new entry.
+
+    The entry is stored and returned right away with processing_status
+    "pending". AI enrichment (insights, embeddings, knowledge graph
+    connections, actions) runs in the background enrichment queue, ahead of
+    bulk imports; poll GET /entries/{entry_id}/status to follow it.
     """
     try:
-        # Process content with AI
-        ai_result = await ai_processor.process_entry(entry_data.content)
-
-        # Create entry in database
-        entry_dict = {
-            'content': entry_data.content,
-            'type': entry_data.type.value,
-            'tags': entry_data.tags,
-            'ai_categories': ai_result.categories,
-            'ai_entities': [e.dict() for e in ai_result.entities],
-            'ai_summary': ai_result.summary,
-            'ai_sentiment': ai_result.sentiment,
-            'ai_key_phrases': ai_result.key_phrases,
-        }
-
-        created_entry = await db.create_entry(entry_dict)
-        entry_id = created_entry['id']
-
-        # Add to semantic search
-        await semantic_search.add_entry(
-            entry_id,
-            entry_data.content,
-            {'type': entry_data.type.value, 'categories': ai_result.categories}
-        )
-
-        # Add to knowledge graph
-        await knowledge_graph.add_entry_node(
-            entry_id,
-            entry_data.content,
+        created_entry = await db.create_entry(
             {
-                'created_at': created_entry['created_at'],
-                'categories': ai_result.categories,
-                'entities': [e.dict() for e in ai_result.entities]
-            }
+                'content': entry_data.content,
+                'type': entry_data.type.value,
+                'tags': entry_data.tags,
+            },
+            enrichment_priority=PRIORITY_INTERACTIVE
         )
+        enrichment_queue.notify()
 
-        # Build connections
-        await knowledge_graph.build_connections(entry_id)
-
-        # Create actions if extracted
-        extracted_actions = []
-        for action in ai_result.actions:
-            action_dict = {
-                'entry_id': entry_id,
-                'description': action.description,
-                'priority': action.priority.value,
-                'due_date': action.due_date.isoformat() if action.due_date else None,
-                'status': action.status.value
-            }
-            created_action = await db.create_action(action_dict)
-            extracted_actions.append(created_action)
-
-        # Build response
-        response = Entry(
-            id=entry_id,
-            content=entry_data.content,
-            type=entry_data.type,
-            tags=entry_data.tags,
+        return Entry(
+            id=created_entry['id'],
+            content=created_entry['content'],
+            type=created_entry['type'],
+            tags=created_entry.get('tags', []),
             created_at=datetime.fromisoformat(created_entry['created_at']),
             updated_at=datetime.fromisoformat(created_entry['updated_at']),
-            ai_categories=ai_result.categories,
-            ai_entities=ai_result.entities,
-            ai_summary=ai_result.summary,
-            ai_sentiment=ai_result.sentiment,
-            ai_key_phrases=ai_result.key_phrases,
-            extracted_actions=[],
-            related_entry_ids=[],
+            processing_status=created_entry['processing_status'],
             view_count=0
         )
 
-        return response
-
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating entry: {str(e)}")
 
 
+@router.post("/entries/bulk", response_model=List[Entry], status_code=201)
+async def create_entries_bulk(bulk_data: EntryBulkCreate):
+    """
+    Create many entries in one request.
+
+    All entries are stored in a single transaction and returned as
+    "pending"; they are enriched in the background in batches, in the bulk
+    lane behind interactive captures.
+    """
+    if len(bulk_data.entries) > settings.BULK_MAX_ENTRIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Bulk requests are limited to {settings.BULK_MAX_ENTRIES} entries"
+        )
+
+    try:
+        created_entries = await db.create_entries_many(
+            [
+                {
+                    'content': entry_data.content,
+                    'type': entry_data.type.value,
+                    'tags': entry_data.tags,
+                }
+                for entry_data in bulk_data.entries
+            ],
+            enrichment_priority=PRIORITY_BULK
+        )
+        enrichment_queue.notify()
+
+        return [
+            Entry(
+                id=created['id'],
+                content=created['content'],
+                type=created['type'],
+                tags=created.get('tags', []),
+                created_at=datetime.fromisoformat(created['created_at']),
+                updated_at=datetime.fromisoformat(created['updated_at']),
+                processing_status=created['processing_status'],
+                view_count=0
+            )
+            for created in created_entries
+        ]
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating entries: {str(e)}")
+
+
 @router.get("/entries", response_model=List[Entry])
 async def list_entries(
+    response: Response,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     type: Optional[str] = None,
-    tag: Optional[str] = None
+    tag: Optional[List[str]] = Query(None),
+    tag_match: str = Query("any", pattern="^(any|all)$")
 ):
     """
     List entries with optional filters.
 
-    Supports pagination and filtering by type and tags.
+    Supports pagination and filtering by type and tags. Repeat `tag` to filter
+    by several tags; `tag_match=all` requires every tag instead of any.
+    Each entry comes with its `extracted_actions`, loaded for the whole page
+    in one query.
+
+    Pages can be fetched by `offset` or by `cursor`. When a page is full, the
+    cursor for the next page is returned in the `X-Next-Cursor` header; cursor
+    pages cost the same no matter how deep they are.
     """
+    try:
+        position = db.decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
     try:
         entries = await db.list_entries(
             limit=limit,
             offset=offset,
             type_filter=type,
-            tag_filter=tag
+            tag_filter=tag,
+            tag_match=tag_match,
+            cursor=position
         )
 
+        if len(entries) == limit:
+            response.headers["X-Next-Cursor"] = db.encode_cursor(entries[-1])
+
+        # Fetch actions for the whole page in one query
+        actions_by_entry = await db.list_actions_for_entries([e['id'] for e in entries])
+
         result = []
         for entry_data in entries:
-            # Get actions for this entry
-            actions = await db.list_actions(entry_id=entry_data['id'])
-
             result.append(Entry(
                 id=entry_data['id'],
                 content=entry_data['content'],
@@ -146,8 +168,9 @@ async def list_entries(
                 ai_summary=entry_data.get('ai_summary'),
                 ai_sentiment=entry_data.get('ai_sentiment'),
                 ai_key_phrases=entry_data.get('ai_key_phrases', []),
-                extracted_actions=[],
+                extracted_actions=actions_by_entry[entry_data['id']],
                 related_entry_ids=[],
+                processing_status=entry_data.get('processing_status', 'completed'),
                 view_count=entry_data.get('view_count', 0)
             ))
 
@@ -169,9 +192,11 @@ async def get_entry(entry_id: str):
         if not entry_data:
             raise HTTPException(status_code=404, detail="Entry not found")
 
-        # Get related entries from graph
-        similar = await semantic_search.find_similar(entry_id, limit=5)
-        related_ids = [s['entry_id'] for s in similar]
+        # Get related entries from graph (skipped while the vector store loads)
+        related_ids = []
+        if readiness.is_ready("vector_store"):
+            similar = await semantic_search.find_similar(entry_id, limit=5)
+            related_ids = [s['entry_id'] for s in similar]
 
         # Get actions
         actions = await db.list_actions(entry_id=entry_id)
@@ -190,6 +215,7 @@ async def get_entry(entry_id: str):
             ai_key_phrases=entry_data.get('ai_key_phrases', []),
             extracted_actions=[],
             related_entry_ids=related_ids,
+            processing_status=entry_data.get('processing_status', 'completed'),
             view_count=entry_data.get('view_count', 0)
         )
 
@@ -199,15 +225,56 @@ async def get_entry(entry_id: str):
         raise HTTPException(status_code=500, detail=f"Error getting entry: {str(e)}")
 
 
+@router.get("/entries/{entry_id}/status", response_model=EnrichmentStatus)
+async def get_entry_status(entry_id: str):
+    """
+    Get the progress of an entry's AI enrichment.
+
+    Reports attempts made so far, the last error and, while a retry is
+    scheduled, when it will run.
+    """
+    try:
+        entry_data = await db.get_entry(entry_id)
+        if not entry_data:
+            raise HTTPException(status_code=404, detail="Entry not found")
+
+        job = await db.get_enrichment_job(entry_id)
+        if not job:
+            return EnrichmentStatus(entry_id=entry_id, processing_status=entry_data['processing_status'])
+
+        retry_scheduled = job['status'] == 'queued' and job['attempts'] > 0
+        return EnrichmentStatus(
+            entry_id=entry_id,
+            processing_status=entry_data['processing_status'],
+            attempts=job['attempts'],
+            last_error=job['last_error'],
+            next_attempt_at=datetime.fromisoformat(job['run_after']) if retry_scheduled else None
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting entry status: {str(e)}")
+
+
 @router.put("/entries/{entry_id}", response_model=Entry)
 async def update_entry(entry_id: str, update_data: EntryUpdate):
-    """Update an existing entry."""
+    """
+    Update an existing entry.
+
+    A content change re-embeds the entry right away and queues it for AI
+    enrichment again, like a new capture; it waits for the embedding model
+    and vector store. Type and tag edits don't.
+    """
     try:
         # Check if entry exists
         existing = await db.get_entry(entry_id)
         if not existing:
             raise HTTPException(status_code=404, detail="Entry not found")
 
+        if update_data.content is not None:
+            await readiness.wait_for("embedding_model", "vector_store")
+
         # Update database
         updates = {}
         if update_data.content is not None:
@@ -217,7 +284,11 @@ async def update_entry(entry_id: str, update_data: EntryUpdate):
         if update_data.tags is not None:
             updates['tags'] = update_data.tags
 
-        updated_entry = await db.update_entry(entry_id, updates)
+        updated_entry = await db.update_entry(
+            entry_id,
+            updates,
+            enrichment_priority=PRIORITY_INTERACTIVE
+        )
 
         # If content changed, reprocess with AI
         if update_data.content is not None:
@@ -226,6 +297,7 @@ async def update_entry(entry_id: str, update_data: EntryUpdate):
                 update_data.content,
                 {'type': updated_entry['type']}
             )
+            enrichment_queue.notify()
 
         return Entry(
             id=updated_entry['id'],
@@ -241,16 +313,17 @@ async def update_entry(entry_id: str, update_data: EntryUpdate):
             ai_key_phrases=updated_entry.get('ai_key_phrases', []),
             extracted_actions=[],
             related_entry_ids=[],
+            processing_status=updated_entry.get('processing_status', 'completed'),
             view_count=updated_entry.get('view_count', 0)
         )
 
-    except HTTPException:
+    except (HTTPException, InferenceOverloaded):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating entry: {str(e)}")
 
 
-@router.delete("/entries/{entry_id}", status_code=204)
+@router.delete("/entries/{entry_id}", status_code=204, dependencies=[requires("vector_store")])
 async def delete_entry(entry_id: str):
     """Delete an entry."""
     try:
@@ -275,51 +348,135 @@ async def delete_entry(entry_id: str):
 @router.get("/search", response_model=List[SearchResult])
 async def search_entries(
     query: str = Query(..., min_length=1),
-    limit: int = Query(10, ge=1, le=50)
+    limit: int = Query(10, ge=1, le=50),
+    mode: str = Query("semantic", pattern="^(semantic|keyword|hybrid)$")
 ):
     """
-    Perform semantic search across all entries.
+    Search across all entries.
+
+    In `semantic` mode (default), uses AI embeddings to find relevant entries
+    by meaning, not just keywords. In `keyword` mode, answers from the
+    full-text index with BM25 ranking, without touching the embedding model.
+    In `hybrid` mode, fuses both rankings and reports each retriever's score
+    in `source_scores`. Highlights show where the query's words appear in
+    each entry. Keyword mode is available while models are still loading.
+    """
+    if mode != "keyword":
+        await readiness.wait_for("embedding_model", "vector_store")
+
+    try:
+        if mode == "keyword":
+            search_results = await db.keyword_search(query, limit=limit)
+        elif mode == "hybrid":
+            search_results = await semantic_search.hybrid_search(query, limit=limit)
+        else:
+            search_results = await semantic_search.search(query, limit=limit)
+            highlights = await db.get_highlights([r['entry_id'] for r in search_results], query)
+            for result in search_results:
+                result['highlights'] = highlights.get(result['entry_id'], [])
+
+        # Fetch full entry details for all hits in one query
+        entries_by_id = {
+            entry_data['id']: entry_data
+            for entry_data in await db.get_entries_many([r['entry_id'] for r in search_results])
+        }
+
+        return _search_results(search_results, entries_by_id)
+
+    except InferenceOverloaded:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching: {str(e)}")
+
+
+@router.post("/search/batch", response_model=List[SearchBatchResult])
+async def search_entries_batch(batch: SearchBatchRequest):
+    """
+    Run several searches in one request.
 
-    Uses AI embeddings to find relevant entries by meaning, not just keywords.
+    Takes the modes of GET /search and returns one result list per query,
+    in query order. Semantic and hybrid modes embed all queries in one
+    batched encode and score them in one vector store call, and the hits of
+    every query are loaded with one database query.
     """
+    if len(batch.queries) > settings.SEARCH_BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch searches are limited to {settings.SEARCH_BATCH_MAX_QUERIES} queries"
+        )
+
+    if batch.mode != "keyword":
+        await readiness.wait_for("embedding_model", "vector_store")
+
     try:
-        # Perform semantic search
-        search_results = await semantic_search.search(query, limit=limit)
-
-        # Fetch full entry details
-        results = []
-        for result in search_results:
-            entry_data = await db.get_entry(result['entry_id'])
-            if entry_data:
-                entry = Entry(
-                    id=entry_data['id'],
-                    content=entry_data['content'],
-                    type=entry_data['type'],
-                    tags=entry_data.get('tags', []),
-                    created_at=datetime.fromisoformat(entry_data['created_at']),
-                    updated_at=datetime.fromisoformat(entry_data['updated_at']),
-                    ai_categories=entry_data.get('ai_categories', []),
-                    ai_entities=entry_data.get('ai_entities', []),
-                    ai_summary=entry_data.get('ai_summary'),
-                    ai_sentiment=entry_data.get('ai_sentiment'),
-                    ai_key_phrases=entry_data.get('ai_key_phrases', []),
-                    extracted_actions=[],
-                    related_entry_ids=[],
-                    view_count=entry_data.get('view_count', 0)
-                )
-
-                results.append(SearchResult(
-                    entry=entry,
-                    score=result['score'],
-                    highlights=[]
-                ))
-
-        return results
+        if batch.mode == "keyword":
+            all_results = await asyncio.gather(
+                *(db.keyword_search(query, limit=batch.limit) for query in batch.queries)
+            )
+        elif batch.mode == "hybrid":
+            all_results = await semantic_search.hybrid_search_many(batch.queries, limit=batch.limit)
+        else:
+            all_results = await semantic_search.search_many(batch.queries, limit=batch.limit)
+            all_highlights = await asyncio.gather(*(
+                db.get_highlights([r['entry_id'] for r in search_results], query)
+                for query, search_results in zip(batch.queries, all_results)
+            ))
+            for search_results, highlights in zip(all_results, all_highlights):
+                for result in search_results:
+                    result['highlights'] = highlights.get(result['entry_id'], [])
+
+        # Fetch full entry details for the hits of every query in one query
+        hit_ids = {r['entry_id'] for search_results in all_results for r in search_results}
+        entries_by_id = {
+            entry_data['id']: entry_data
+            for entry_data in await db.get_entries_many(list(hit_ids))
+        }
+
+        return [
+            SearchBatchResult(query=query, results=_search_results(search_results, entries_by_id))
+            for query, search_results in zip(batch.queries, all_results)
+        ]
 
+    except InferenceOverloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching: {str(e)}")
 
 
+def _search_results(search_results: List[dict], entries_by_id: dict) -> List[SearchResult]:
+    """Build SearchResults from search hits and their entries; hits without an entry are dropped."""
+    results = []
+    for result in search_results:
+        entry_data = entries_by_id.get(result['entry_id'])
+        if entry_data:
+            entry = Entry(
+                id=entry_data['id'],
+                content=entry_data['content'],
+                type=entry_data['type'],
+                tags=entry_data.get('tags', []),
+                created_at=datetime.fromisoformat(entry_data['created_at']),
+                updated_at=datetime.fromisoformat(entry_data['updated_at']),
+                ai_categories=entry_data.get('ai_categories', []),
+                ai_entities=entry_data.get('ai_entities', []),
+                ai_summary=entry_data.get('ai_summary'),
+                ai_sentiment=entry_data.get('ai_sentiment'),
+                ai_key_phrases=entry_data.get('ai_key_phrases', []),
+                extracted_actions=[],
+                related_entry_ids=[],
+                processing_status=entry_data.get('processing_status', 'completed'),
+                view_count=entry_data.get('view_count', 0)
+            )
+
+            results.append(SearchResult(
+                entry=entry,
+                score=result['score'],
+                highlights=result['highlights'],
+                source_scores=result.get('source_scores', {})
+            ))
+
+    return results
+
+
 @router.get("/graph", response_model=KnowledgeGraph)
 async def get_knowledge_graph(
     entry_id: Optional[str] = None,
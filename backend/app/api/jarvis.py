@@ -84,11 +84,9 @@ async def build_user_context(
     # Semantic search for relevant entries
     search_results = await semantic_search.search(query, limit=20)
 
-    relevant_entries = []
-    for result in search_results:
-        entry_data = await db.get_entry(result['entry_id'])
-        if entry_data:
-            relevant_entries.append(entry_data)
+    relevant_entries = await db.get_entries_many(
+        [result['entry_id'] for result in search_results]
+    )
 
     # Get knowledge graph summary
     try:
@@ -20,26 +20,97 @@ class Settings(BaseSettings):
 
     # Database Settings
     DATABASE_URL: str = "sqlite+aiosqlite:///./coherence.db"
+    DB_READ_POOL_SIZE: int = 4
+    DB_SYNCHRONOUS: str = "NORMAL"
+    DB_CACHE_SIZE_KB: int = 20000
+    DB_MMAP_SIZE: int = 268435456  # 256 MB
 
     # ChromaDB Settings
     CHROMA_PERSIST_DIR: str = "./chroma_db"
     CHROMA_COLLECTION_NAME: str = "coherence_embeddings"
 
+    # Vector Store Settings
+    VECTOR_STORE: str = "chroma"  # "chroma" or "flat" (memory-mapped NumPy index)
+    VECTOR_INDEX_DIR: str = "./vector_index"  # Flat index files
+    VECTOR_COMPACT_RATIO: float = 0.2  # Tombstoned fraction that triggers flat index compaction
+    VECTOR_INDEX: str = "exact"  # Flat store search: "exact", or approximate "ivf" or "binary"
+    IVF_NLIST: int = 0  # IVF cells; 0 uses sqrt(rows) at each training
+    IVF_NPROBE: int = 8  # Cells scanned per query: higher is slower with better recall
+    IVF_MIN_ROWS: int = 10000  # Exact search until a collection has this many rows
+    IVF_DRIFT_TOLERANCE: float = 0.25  # Retrain once new vectors fit the centroids this much worse
+    BINARY_CANDIDATES: int = 200  # Rows re-ranked with float vectors after the binary code scan
+    VECTOR_PRECISION: str = "float32"  # Flat store rows of new collections: "float32", or "float16" (half the size; pair with an approximate VECTOR_INDEX)
+    VECTOR_PCA_DIMENSION: int = 0  # Project flat store rows to this many dimensions; 0 keeps all
+    VECTOR_PCA_MIN_ROWS: int = 5000  # Rows the PCA projection is fitted on
+
     # AI Settings
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
     OPENAI_API_KEY: str = ""  # Optional
     USE_LOCAL_EMBEDDINGS: bool = True
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_MICRO_BATCH: bool = True  # Group concurrent single-text embeds into one encode
+    EMBEDDING_MAX_BATCH_SIZE: int = 32
+    EMBEDDING_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_CACHE_SIZE: int = 10000  # Embeddings kept in the in-memory LRU
+    EMBEDDING_CACHE_PATH: str = "./embedding_cache.db"  # Persistent tier; empty disables it
+    EMBEDDING_BACKEND: str = "sentence-transformers"  # "sentence-transformers" or "onnx"
+    FALLBACK_EMBEDDING_DIM: int = 384  # Hashed TF-IDF embeddings when USE_LOCAL_EMBEDDINGS is off
+    FALLBACK_EMBEDDING_IDF_PATH: str = ""  # IDF weights from HashingEmbeddingBackend.save_idf; empty weighs features equally
+    ONNX_MODEL_DIR: str = "./models/all-MiniLM-L6-v2-onnx"  # Export of EMBEDDING_MODEL: model.onnx + tokenizer.json
+    ONNX_QUANTIZE: bool = False  # int8 dynamic quantization
+    ONNX_MAX_LENGTH: int = 256
+    ONNX_THREADS: int = 0  # 0 lets ONNX Runtime decide
 
     # Spacy Model
     SPACY_MODEL: str = "en_core_web_sm"
 
+    # Rule-based extraction lexicons (JSON file; empty uses the built-in defaults)
+    LEXICON_PATH: str = ""
+
+    # Inference Executor Settings
+    INFERENCE_THREADS: int = 2  # Thread pool for embedding models (torch releases the GIL)
+    SPACY_EXECUTOR: str = "process"  # "process" or "thread"
+    SPACY_PROCESSES: int = 2
+    SPACY_BATCH_SIZE: int = 64  # Texts per nlp.pipe batch for bulk processing
+    SPACY_PIPE_PROCESSES: int = 1  # nlp.pipe n_process when SPACY_EXECUTOR is "thread"
+    INFERENCE_MAX_PENDING: int = 64  # Max model calls in flight at once
+    INFERENCE_MAX_WAITING: int = 256  # Max calls waiting for an in-flight slot; more get a 503
+    INFERENCE_RETRY_AFTER: int = 1  # Retry-After seconds on 503 while overloaded
+
+    # Startup Settings (models load in the background after the app starts)
+    READINESS_WAIT_SECONDS: float = 10.0  # How long requests wait for a loading component
+    READINESS_RETRY_AFTER: int = 5  # Retry-After seconds on 503 while loading
+
+    # AI Enrichment Queue Settings (entries are enriched by background workers)
+    ENRICHMENT_WORKERS: int = 2
+    ENRICHMENT_BATCH_SIZE: int = 16  # Jobs claimed and processed together
+    ENRICHMENT_MAX_ATTEMPTS: int = 5
+    ENRICHMENT_BACKOFF_SECONDS: float = 2.0  # Retry delay, doubled after each failed attempt
+    ENRICHMENT_POLL_SECONDS: float = 1.0  # How often idle workers check for due retries
+
+    # Re-index Settings (re-embedding entries after EMBEDDING_MODEL changes)
+    REINDEX_CHUNK_SIZE: int = 500  # Entries encoded and checkpointed together
+
     # Search Settings
     SIMILARITY_THRESHOLD: float = 0.7
     MAX_SEARCH_RESULTS: int = 20
+    SEARCH_BATCH_MAX_QUERIES: int = 32  # Queries per POST /search/batch request
+
+    # Hybrid Search Settings (reciprocal rank fusion of lexical and vector results)
+    HYBRID_CANDIDATES: int = 50
+    HYBRID_RRF_K: int = 60
+    HYBRID_LEXICAL_WEIGHT: float = 1.0
+    HYBRID_VECTOR_WEIGHT: float = 1.0
+
+    # Bulk Ingestion Settings
+    BULK_MAX_ENTRIES: int = 1000
 
     # Graph Settings
     GRAPH_MAX_DEPTH: int = 3
     GRAPH_MIN_SIMILARITY: float = 0.6
+    GRAPH_GROUP_COMMIT: bool = False  # Coalesce edge writes across concurrent requests
+    GRAPH_GROUP_COMMIT_INTERVAL_MS: int = 50
+    GRAPH_GROUP_COMMIT_MAX_BATCH: int = 1000
 
     # WebSocket Settings
     WS_MESSAGE_QUEUE_SIZE: int = 100
@@ -0,0 +1,151 @@
+"""
+Readiness tracking for components that load in the background.
+
+The app starts serving as soon as the database is open; models and the
+vector store load in background tasks. Endpoints that need a component
+declare it with `requires(...)`: requests wait up to READINESS_WAIT_SECONDS
+for it and then get a 503 with Retry-After. A component that loaded in a
+reduced mode (e.g. NER without its spaCy model) is "degraded": usable, but
+reported as such.
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import time
+from fastapi import Depends, HTTPException
+from app.core.config import settings
+
+
+class ComponentDegraded(Exception):
+    """Raised by an initializer whose component loaded but works in a reduced mode."""
+
+
+class Readiness:
+    """Load state and timings of the app's components."""
+
+    def __init__(self):
+        """Initialize with no registered components."""
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def load(self, name: str, init: Callable[[], Awaitable[Any]]):
+        """
+        Run a component's initializer and record its state and load time.
+
+        Args:
+            name: Component name reported by /health and /ready
+            init: Async initializer
+
+        Raises:
+            Whatever the initializer raises, after marking the component
+            failed (except ComponentDegraded, which marks it degraded)
+        """
+        state = self.components[name] = {'state': 'loading', 'load_ms': None, 'error': None}
+        start = time.perf_counter()
+        try:
+            await init()
+        except ComponentDegraded as e:
+            state['state'] = 'degraded'
+            state['error'] = str(e)
+        except Exception as e:
+            state['state'] = 'failed'
+            state['error'] = str(e)
+            raise
+        else:
+            state['state'] = 'ready'
+        finally:
+            state['load_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    def start(self, name: str, init: Callable[[], Awaitable[Any]]):
+        """Load a component in a background task."""
+        self.components[name] = {'state': 'pending', 'load_ms': None, 'error': None}
+        task = asyncio.create_task(self.load(name, init))
+        task.add_done_callback(lambda t: self._report(name, t))
+        self._tasks[name] = task
+
+    def _report(self, name: str, task: asyncio.Task):
+        """Log the outcome of a background load."""
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            print(f"❌ {name} failed to load: {task.exception()}")
+        elif self.components[name]['state'] == 'degraded':
+            print(f"⚠️  {name} degraded: {self.components[name]['error']}")
+        else:
+            print(f"✅ {name} ready ({self.components[name]['load_ms']:.0f} ms)")
+
+    def is_ready(self, name: str) -> bool:
+        """Whether a component is usable (untracked components always are)."""
+        state = self.components.get(name)
+        return state is None or state['state'] in ('ready', 'degraded')
+
+    @property
+    def all_ready(self) -> bool:
+        """Whether every registered component has loaded (possibly degraded)."""
+        return all(self.is_ready(name) for name in self.components)
+
+    @property
+    def status(self) -> str:
+        """
+        Overall status: "healthy", "starting" or "degraded" (a component
+        failed or runs in a reduced mode).
+        """
+        states = [state['state'] for state in self.components.values()]
+        if 'failed' in states or 'degraded' in states:
+            return "degraded"
+        return "healthy" if self.all_ready else "starting"
+
+    async def wait_for(self, *names: str, timeout: Optional[float] = None):
+        """
+        Wait for components to finish loading.
+
+        Args:
+            names: Components the caller needs
+            timeout: Seconds to wait (default READINESS_WAIT_SECONDS)
+
+        Raises:
+            HTTPException: 503 if a component is still loading (with
+                Retry-After) or failed to load
+        """
+        pending = [
+            self._tasks[name] for name in names
+            if name in self._tasks and not self._tasks[name].done()
+        ]
+        if pending:
+            await asyncio.wait(
+                pending,
+                timeout=settings.READINESS_WAIT_SECONDS if timeout is None else timeout
+            )
+
+        for name in names:
+            if self.is_ready(name):
+                continue
+            state = self.components[name]
+            if state['state'] == 'failed':
+                raise HTTPException(status_code=503, detail=f"{name} failed to load: {state['error']}")
+            raise HTTPException(
+                status_code=503,
+                detail=f"{name} is still loading",
+                headers={"Retry-After": str(settings.READINESS_RETRY_AFTER)}
+            )
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-component state, load time and error."""
+        return {name: dict(state) for name, state in self.components.items()}
+
+    async def cancel(self):
+        """Cancel loads still running (on shutdown)."""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+
+def requires(*names: str):
+    """Route dependency that waits for components to be ready."""
+    async def dependency():
+        await readiness.wait_for(*names)
+    return Depends(dependency)
+
+
+# Global readiness tracker
+readiness = Readiness()
@@ -1,29 +1,172 @@
 """
 Database connection and session management.
 """
+import base64
 import json
-from typing import List, Optional, Dict, Any
+import re
+from typing import List, Optional, Dict, Any, Tuple, Union
 from datetime import datetime
 import uuid
 import aiosqlite
 from pathlib import Path
+from app.core.config import settings
+from app.db.group_commit import GroupCommitWriter
+from app.db.pool import ConnectionPool
+
+_INSERT_ENTRY = """
+    INSERT INTO entries (
+        id, content, type, tags, ai_categories, ai_entities,
+        ai_summary, ai_sentiment, ai_key_phrases, processing_status,
+        created_at, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_ACTION = """
+    INSERT INTO actions (id, entry_id, description, priority, due_date, status, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Relationships are unique per (source_id, target_id, type); the unique index
+# also serves lookups by source_id
+_RELATIONSHIPS_TABLE = """
+    CREATE TABLE IF NOT EXISTS relationships (
+        id INTEGER PRIMARY KEY,
+        source_id TEXT NOT NULL,
+        target_id TEXT NOT NULL,
+        weight REAL NOT NULL,
+        type TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        UNIQUE (source_id, target_id, type),
+        FOREIGN KEY (source_id) REFERENCES entries (id) ON DELETE CASCADE,
+        FOREIGN KEY (target_id) REFERENCES entries (id) ON DELETE CASCADE
+    )
+"""
+
+_INSERT_ENRICHMENT_JOB = """
+    INSERT INTO enrichment_jobs (entry_id, priority, status, run_after, created_at, updated_at)
+    VALUES (?, ?, 'queued', ?, ?, ?)
+"""
+
+# Re-enrichment after an edit; a running job is left alone, since
+# complete_enrichment requeues it when it finds the content changed
+_REQUEUE_ENRICHMENT_JOB = """
+    INSERT INTO enrichment_jobs (entry_id, priority, status, run_after, created_at, updated_at)
+    VALUES (?, ?, 'queued', ?, ?, ?)
+    ON CONFLICT (entry_id) DO UPDATE SET
+        priority = excluded.priority, status = 'queued', attempts = 0, last_error = NULL,
+        run_after = excluded.run_after, updated_at = excluded.updated_at
+    WHERE enrichment_jobs.status != 'running'
+"""
+
+_UPSERT_RELATIONSHIP = """
+    INSERT INTO relationships (source_id, target_id, weight, type, created_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (source_id, target_id, type) DO UPDATE SET weight = excluded.weight
+"""
+
+# One-off data migrations, tracked with PRAGMA user_version. Step N brings the
+# database to user_version N; append new steps, never edit applied ones.
+_MIGRATIONS: List[List[str]] = [
+    # 1: backfill entry_tags from the JSON tags column
+    [
+        """
+        INSERT OR IGNORE INTO entry_tags (entry_id, tag)
+        SELECT entries.id, tag.value
+        FROM entries, json_each(
+            CASE WHEN json_valid(entries.tags) THEN entries.tags ELSE '[]' END
+        ) AS tag
+        WHERE tag.type = 'text'
+        """,
+    ],
+    # 2: idx_entries_created_at is superseded by idx_entries_created_at_id
+    [
+        "DROP INDEX IF EXISTS idx_entries_created_at",
+    ],
+    # 3: index entries that existed before entries_fts
+    [
+        "INSERT INTO entries_fts(entries_fts) VALUES ('rebuild')",
+    ],
+    # 4: rebuild relationships with integer keys and one row per
+    # (source_id, target_id, type), keeping the latest weight and first created_at
+    [
+        "DROP TABLE IF EXISTS relationships_compacted",
+        _RELATIONSHIPS_TABLE.replace("IF NOT EXISTS relationships", "relationships_compacted"),
+        """
+        INSERT INTO relationships_compacted (source_id, target_id, weight, type, created_at)
+        SELECT source_id, target_id, weight, type, first_created_at
+        FROM (
+            SELECT source_id, target_id, weight, type,
+                   MIN(created_at) OVER edge AS first_created_at,
+                   ROW_NUMBER() OVER (edge ORDER BY created_at DESC) AS newest
+            FROM relationships
+            WINDOW edge AS (PARTITION BY source_id, target_id, type)
+        )
+        WHERE newest = 1
+        """,
+        "DROP TABLE relationships",
+        "ALTER TABLE relationships_compacted RENAME TO relationships",
+        "CREATE INDEX IF NOT EXISTS idx_relationships_target ON relationships(target_id)",
+    ],
+    # 5: entries track their AI enrichment; existing entries were enriched inline
+    [
+        "ALTER TABLE entries ADD COLUMN processing_status TEXT NOT NULL DEFAULT 'completed'",
+    ],
+]
+
+# Markers wrapped around matched terms in search highlights
+_HIGHLIGHT_OPEN = "<mark>"
+_HIGHLIGHT_CLOSE = "</mark>"
+_HIGHLIGHT_TOKENS = 12
+
+
+def _fts_query(text: str, operator: str = "AND") -> Optional[str]:
+    """
+    Build an FTS5 MATCH expression from free text.
+
+    Each word is quoted so user input can never be parsed as FTS5 syntax.
+    Returns None if the text contains no searchable words.
+    """
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return None
+    return f" {operator} ".join(f'"{term}"' for term in terms)
+
+# Stay well below SQLite's bound-parameter limit for IN (...) lookups
+_IN_CHUNK_SIZE = 500
+
+
+def _chunks(items: List[Any], size: int = _IN_CHUNK_SIZE) -> List[List[Any]]:
+    """Split items into lists of at most size elements."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
 
 
 class Database:
-    """Async SQLite database manager."""
+    """Async SQLite database manager backed by a pooled set of connections."""
 
     def __init__(self, db_path: str = "coherence.db"):
         """Initialize database."""
         self.db_path = db_path
         self._ensure_db_exists()
+        self.pool = ConnectionPool(
+            db_path,
+            readers=settings.DB_READ_POOL_SIZE,
+            pragmas={
+                'synchronous': settings.DB_SYNCHRONOUS,
+                'cache_size': -settings.DB_CACHE_SIZE_KB,
+                'mmap_size': settings.DB_MMAP_SIZE,
+                'temp_store': 'MEMORY',
+            }
+        )
 
     def _ensure_db_exists(self):
         """Ensure database file exists."""
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
 
     async def initialize(self):
-        """Initialize database schema."""
-        async with aiosqlite.connect(self.db_path) as db:
+        """Open the connection pool and initialize database schema."""
+        await self.pool.open()
+
+        async with self.pool.writer() as db:
             # Entries table
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS entries (
@@ -42,6 +185,7 @@ class Database:
                     last_accessed TEXT
                 )
             """)
+            # (processing_status is added by migration 5)
 
             # Actions table
             await db.execute("""
@@ -58,76 +202,296 @@ class Database:
             """)
 
             # Relationships table (for graph connections)
+            await db.execute(_RELATIONSHIPS_TABLE)
+
+            # Durable AI enrichment queue, one job per entry; lower priority runs first
             await db.execute("""
-                CREATE TABLE IF NOT EXISTS relationships (
-                    id TEXT PRIMARY KEY,
-                    source_id TEXT NOT NULL,
-                    target_id TEXT NOT NULL,
-                    weight REAL NOT NULL,
-                    type TEXT NOT NULL,
+                CREATE TABLE IF NOT EXISTS enrichment_jobs (
+                    id INTEGER PRIMARY KEY,
+                    entry_id TEXT NOT NULL UNIQUE,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    run_after TEXT NOT NULL,
+                    last_error TEXT,
                     created_at TEXT NOT NULL,
-                    FOREIGN KEY (source_id) REFERENCES entries (id) ON DELETE CASCADE,
-                    FOREIGN KEY (target_id) REFERENCES entries (id) ON DELETE CASCADE
+                    updated_at TEXT NOT NULL,
+                    FOREIGN KEY (entry_id) REFERENCES entries (id) ON DELETE CASCADE
+                )
+            """)
+
+            # Vector collections and the embedding model each was built with: one
+            # "active" collection serves search; a "building" one is a re-index
+            # shadow whose row doubles as its resume checkpoint
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS vector_collections (
+                    name TEXT PRIMARY KEY,
+                    embedding_model TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    last_rowid INTEGER NOT NULL DEFAULT 0,
+                    indexed INTEGER NOT NULL DEFAULT 0,
+                    started_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+
+            # Entry tags (normalized copy of entries.tags for indexed filtering)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS entry_tags (
+                    entry_id TEXT NOT NULL,
+                    tag TEXT NOT NULL,
+                    PRIMARY KEY (tag, entry_id),
+                    FOREIGN KEY (entry_id) REFERENCES entries (id) ON DELETE CASCADE
+                ) WITHOUT ROWID
+            """)
+
+            # Full-text index over content and summary, kept in sync by triggers.
+            # External-content table keyed on entries.rowid; run
+            # INSERT INTO entries_fts(entries_fts) VALUES ('rebuild') after a VACUUM.
+            await db.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+                    content,
+                    ai_summary,
+                    content='entries',
+                    content_rowid='rowid'
                 )
             """)
+            await db.execute("""
+                CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+                    INSERT INTO entries_fts (rowid, content, ai_summary)
+                    VALUES (new.rowid, new.content, new.ai_summary);
+                END
+            """)
+            await db.execute("""
+                CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+                    INSERT INTO entries_fts (entries_fts, rowid, content, ai_summary)
+                    VALUES ('delete', old.rowid, old.content, old.ai_summary);
+                END
+            """)
+            await db.execute("""
+                CREATE TRIGGER IF NOT EXISTS entries_fts_update AFTER UPDATE OF content, ai_summary ON entries BEGIN
+                    INSERT INTO entries_fts (entries_fts, rowid, content, ai_summary)
+                    VALUES ('delete', old.rowid, old.content, old.ai_summary);
+                    INSERT INTO entries_fts (rowid, content, ai_summary)
+                    VALUES (new.rowid, new.content, new.ai_summary);
+                END
+            """)
 
-            # Create indexes
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_entries_created_at ON entries(created_at)")
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_entries_created_at_id ON entries(created_at, id)")
             await db.execute("CREATE INDEX IF NOT EXISTS idx_entries_type ON entries(type)")
             await db.execute("CREATE INDEX IF NOT EXISTS idx_actions_entry_id ON actions(entry_id)")
             await db.execute("CREATE INDEX IF NOT EXISTS idx_actions_status ON actions(status)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_relationships_source ON relationships(source_id)")
             await db.execute("CREATE INDEX IF NOT EXISTS idx_relationships_target ON relationships(target_id)")
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_entry_tags_entry_id ON entry_tags(entry_id)")
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_enrichment_jobs_queue ON enrichment_jobs(status, priority)")
 
-            await db.commit()
+            await self._migrate(db)
 
-    async def create_entry(self, entry_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a new entry."""
+    async def _migrate(self, db: aiosqlite.Connection):
+        """Apply pending data migrations."""
+        async with db.execute("PRAGMA user_version") as cursor:
+            version = (await cursor.fetchone())[0]
+
+        for target, statements in enumerate(_MIGRATIONS[version:], start=version + 1):
+            for statement in statements:
+                await db.execute(statement)
+            await db.execute(f"PRAGMA user_version = {target}")
+
+    async def close(self):
+        """Close all pooled connections."""
+        await self.pool.close()
+
+    async def create_entry(
+        self,
+        entry_data: Dict[str, Any],
+        enrichment_priority: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Create a new entry.
+
+        Args:
+            entry_data: Entry fields
+            enrichment_priority: If given, the entry is stored as pending and an
+                enrichment job with this priority is queued in the same transaction
+        """
         entry_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat()
+        if enrichment_priority is not None:
+            entry_data = {**entry_data, 'processing_status': 'pending'}
 
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT INTO entries (
-                    id, content, type, tags, ai_categories, ai_entities,
-                    ai_summary, ai_sentiment, ai_key_phrases,
-                    created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                entry_id,
-                entry_data['content'],
-                entry_data['type'],
-                json.dumps(entry_data.get('tags', [])),
-                json.dumps(entry_data.get('ai_categories', [])),
-                json.dumps(entry_data.get('ai_entities', [])),
-                entry_data.get('ai_summary'),
-                json.dumps(entry_data.get('ai_sentiment')),
-                json.dumps(entry_data.get('ai_key_phrases', [])),
-                now,
-                now
-            ))
-            await db.commit()
+        async with self.pool.writer() as db:
+            await db.execute(_INSERT_ENTRY, self._entry_params(entry_id, entry_data, now))
+            await self._insert_tags(db, entry_id, entry_data.get('tags', []))
+            if enrichment_priority is not None:
+                await db.execute(_INSERT_ENRICHMENT_JOB, (entry_id, enrichment_priority, now, now, now))
 
         return await self.get_entry(entry_id)
 
+    async def create_entries_many(
+        self,
+        entries: List[Dict[str, Any]],
+        enrichment_priority: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Create many entries in a single transaction.
+
+        Args:
+            entries: Entry dicts in the same shape accepted by create_entry
+            enrichment_priority: If given, entries are stored as pending and
+                enrichment jobs with this priority are queued in the same transaction
+
+        Returns:
+            Created entries, in input order
+        """
+        now = datetime.utcnow().isoformat()
+        if enrichment_priority is not None:
+            entries = [{**entry_data, 'processing_status': 'pending'} for entry_data in entries]
+        rows = [self._entry_params(str(uuid.uuid4()), entry_data, now) for entry_data in entries]
+
+        async with self.pool.writer() as db:
+            await db.executemany(_INSERT_ENTRY, rows)
+            if enrichment_priority is not None:
+                await db.executemany(
+                    _INSERT_ENRICHMENT_JOB,
+                    [(row[0], enrichment_priority, now, now, now) for row in rows]
+                )
+            await db.executemany(
+                "INSERT OR IGNORE INTO entry_tags (entry_id, tag) VALUES (?, ?)",
+                [
+                    (row[0], tag)
+                    for row, entry_data in zip(rows, entries)
+                    for tag in entry_data.get('tags', [])
+                ]
+            )
+
+        created = []
+        for (entry_id, *_), entry_data in zip(rows, entries):
+            created.append({
+                'id': entry_id,
+                'content': entry_data['content'],
+                'type': entry_data['type'],
+                'tags': entry_data.get('tags', []),
+                'ai_categories': entry_data.get('ai_categories', []),
+                'ai_entities': entry_data.get('ai_entities', []),
+                'ai_summary': entry_data.get('ai_summary'),
+                'ai_sentiment': entry_data.get('ai_sentiment'),
+                'ai_key_phrases': entry_data.get('ai_key_phrases', []),
+                'processing_status': entry_data.get('processing_status', 'completed'),
+                'created_at': now,
+                'updated_at': now,
+                'view_count': 0,
+                'last_accessed': None
+            })
+        return created
+
+    async def _insert_tags(self, db: aiosqlite.Connection, entry_id: str, tags: List[str]):
+        """Insert tag rows for an entry."""
+        await db.executemany(
+            "INSERT OR IGNORE INTO entry_tags (entry_id, tag) VALUES (?, ?)",
+            [(entry_id, tag) for tag in tags]
+        )
+
+    def _entry_params(self, entry_id: str, entry_data: Dict[str, Any], now: str) -> tuple:
+        """Build the INSERT parameters for an entry."""
+        return (
+            entry_id,
+            entry_data['content'],
+            entry_data['type'],
+            json.dumps(entry_data.get('tags', [])),
+            json.dumps(entry_data.get('ai_categories', [])),
+            json.dumps(entry_data.get('ai_entities', [])),
+            entry_data.get('ai_summary'),
+            json.dumps(entry_data.get('ai_sentiment')),
+            json.dumps(entry_data.get('ai_key_phrases', [])),
+            entry_data.get('processing_status', 'completed'),
+            now,
+            now
+        )
+
     async def get_entry(self, entry_id: str) -> Optional[Dict[str, Any]]:
         """Get entry by ID."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.pool.reader() as db:
             async with db.execute("SELECT * FROM entries WHERE id = ?", (entry_id,)) as cursor:
                 row = await cursor.fetchone()
                 if row:
                     return self._row_to_dict(row)
         return None
 
+    async def get_entries_after_rowid(
+        self,
+        after_rowid: int,
+        limit: int,
+        updated_since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Stream entries in storage (rowid) order.
+
+        Args:
+            after_rowid: Return entries after this rowid (0 to start)
+            limit: Maximum number of entries
+            updated_since: Only entries updated after this ISO timestamp
+
+        Returns:
+            Entries with their rowid, in rowid order
+        """
+        query = "SELECT rowid, * FROM entries WHERE rowid > ?"
+        params: List[Any] = [after_rowid]
+        if updated_since:
+            query += " AND updated_at > ?"
+            params.append(updated_since)
+        query += " ORDER BY rowid LIMIT ?"
+        params.append(limit)
+
+        async with self.pool.reader() as db:
+            async with db.execute(query, params) as cursor:
+                return [self._row_to_dict(row) for row in await cursor.fetchall()]
+
+    async def count_entries(self) -> int:
+        """Count all entries."""
+        async with self.pool.reader() as db:
+            async with db.execute("SELECT COUNT(*) FROM entries") as cursor:
+                return (await cursor.fetchone())[0]
+
+    async def get_entries_many(self, entry_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get many entries by ID with one query per chunk of IDs.
+
+        Args:
+            entry_ids: Entry IDs to fetch
+
+        Returns:
+            Found entries in the order of entry_ids (missing IDs are skipped)
+        """
+        found = {}
+        async with self.pool.reader() as db:
+            for chunk in _chunks(entry_ids):
+                placeholders = ", ".join("?" for _ in chunk)
+                async with db.execute(
+                    f"SELECT * FROM entries WHERE id IN ({placeholders})", chunk
+                ) as cursor:
+                    for row in await cursor.fetchall():
+                        found[row['id']] = self._row_to_dict(row)
+        return [found[entry_id] for entry_id in entry_ids if entry_id in found]
+
     async def list_entries(
         self,
         limit: int = 50,
         offset: int = 0,
         type_filter: Optional[str] = None,
-        tag_filter: Optional[str] = None
+        tag_filter: Optional[Union[str, List[str]]] = None,
+        tag_match: str = "any",
+        cursor: Optional[Tuple[str, str]] = None
     ) -> List[Dict[str, Any]]:
-        """List entries with filters."""
+        """
+        List entries with filters, newest first.
+
+        Args:
+            tag_filter: Tag or tags to filter by
+            tag_match: "any" to match entries with at least one of the tags,
+                "all" to require every tag
+            cursor: (created_at, id) of the last entry of the previous page;
+                when given, offset is ignored and the page starts right after it
+        """
         query = "SELECT * FROM entries WHERE 1=1"
         params = []
 
@@ -136,20 +500,132 @@ class Database:
             params.append(type_filter)
 
         if tag_filter:
-            query += " AND tags LIKE ?"
-            params.append(f'%"{tag_filter}"%')
+            tags = sorted({tag_filter} if isinstance(tag_filter, str) else set(tag_filter))
+            placeholders = ", ".join("?" for _ in tags)
+            query += f" AND id IN (SELECT entry_id FROM entry_tags WHERE tag IN ({placeholders})"
+            params.extend(tags)
+            if tag_match == "all" and len(tags) > 1:
+                query += " GROUP BY entry_id HAVING COUNT(*) = ?"
+                params.append(len(tags))
+            query += ")"
+
+        if cursor:
+            query += " AND (created_at, id) < (?, ?)"
+            params.extend(cursor)
+            offset = 0
 
-        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        query += " ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
         params.extend([limit, offset])
 
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.pool.reader() as db:
             async with db.execute(query, params) as cursor:
                 rows = await cursor.fetchall()
                 return [self._row_to_dict(row) for row in rows]
 
-    async def update_entry(self, entry_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Update an entry."""
+    def encode_cursor(self, entry: Dict[str, Any]) -> str:
+        """Encode an entry's position in the listing order as an opaque cursor."""
+        raw = json.dumps([entry['created_at'], entry['id']]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> Tuple[str, str]:
+        """
+        Decode a cursor produced by encode_cursor.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            created_at, entry_id = json.loads(raw)
+        except Exception as e:
+            raise ValueError("Invalid cursor") from e
+        if not isinstance(created_at, str) or not isinstance(entry_id, str):
+            raise ValueError("Invalid cursor")
+        return created_at, entry_id
+
+    async def keyword_search(
+        self,
+        query: str,
+        limit: int = 10,
+        match_all: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Search entries by keyword using the FTS5 index.
+
+        Results are ranked by BM25.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of results
+            match_all: Require every word to match; otherwise any word matches
+
+        Returns:
+            List of results with entry_id, score (higher is better) and highlights
+        """
+        match = _fts_query(query, operator="AND" if match_all else "OR")
+        if not match:
+            return []
+
+        async with self.pool.reader() as db:
+            async with db.execute(f"""
+                SELECT entries.id AS entry_id,
+                       -bm25(entries_fts) AS score,
+                       snippet(entries_fts, -1, ?, ?, '…', {_HIGHLIGHT_TOKENS}) AS highlight
+                FROM entries_fts
+                JOIN entries ON entries.rowid = entries_fts.rowid
+                WHERE entries_fts MATCH ?
+                ORDER BY bm25(entries_fts)
+                LIMIT ?
+            """, (_HIGHLIGHT_OPEN, _HIGHLIGHT_CLOSE, match, limit)) as cursor:
+                rows = await cursor.fetchall()
+
+        return [
+            {'entry_id': row['entry_id'], 'score': row['score'], 'highlights': [row['highlight']]}
+            for row in rows
+        ]
+
+    async def get_highlights(self, entry_ids: List[str], query: str) -> Dict[str, List[str]]:
+        """
+        Get snippets of the given entries around any of the query's words.
+
+        Returns:
+            Mapping of entry ID to highlights; entries without a match are omitted
+        """
+        match = _fts_query(query, operator="OR")
+        if not match or not entry_ids:
+            return {}
+
+        highlights = {}
+        async with self.pool.reader() as db:
+            for chunk in _chunks(entry_ids):
+                placeholders = ", ".join("?" for _ in chunk)
+                async with db.execute(f"""
+                    SELECT entries.id AS entry_id,
+                           snippet(entries_fts, -1, ?, ?, '…', {_HIGHLIGHT_TOKENS}) AS highlight
+                    FROM entries_fts
+                    JOIN entries ON entries.rowid = entries_fts.rowid
+                    WHERE entries_fts MATCH ? AND entries.id IN ({placeholders})
+                """, (_HIGHLIGHT_OPEN, _HIGHLIGHT_CLOSE, match, *chunk)) as cursor:
+                    for row in await cursor.fetchall():
+                        highlights[row['entry_id']] = [row['highlight']]
+        return highlights
+
+    async def update_entry(
+        self,
+        entry_id: str,
+        updates: Dict[str, Any],
+        enrichment_priority: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Update an entry.
+
+        Args:
+            entry_id: Entry to update
+            updates: Fields to change (content, type, tags)
+            enrichment_priority: If given and the content changes, the entry is
+                marked pending, its open extracted actions are dropped and an
+                enrichment job with this priority is queued in the same transaction
+        """
         now = datetime.utcnow().isoformat()
         set_clauses = []
         params = []
@@ -165,51 +641,272 @@ class Database:
         if not set_clauses:
             return await self.get_entry(entry_id)
 
+        reenrich = enrichment_priority is not None and 'content' in updates
+        if reenrich:
+            set_clauses.append("processing_status = 'pending'")
         set_clauses.append("updated_at = ?")
         params.append(now)
         params.append(entry_id)
 
         query = f"UPDATE entries SET {', '.join(set_clauses)} WHERE id = ?"
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.writer() as db:
             await db.execute(query, params)
-            await db.commit()
+            if 'tags' in updates:
+                await db.execute("DELETE FROM entry_tags WHERE entry_id = ?", (entry_id,))
+                await self._insert_tags(db, entry_id, updates['tags'])
+            if reenrich:
+                await db.execute(
+                    "DELETE FROM actions WHERE entry_id = ? AND status = 'pending'", (entry_id,)
+                )
+                await db.execute(_REQUEUE_ENRICHMENT_JOB, (entry_id, enrichment_priority, now, now, now))
 
         return await self.get_entry(entry_id)
 
     async def delete_entry(self, entry_id: str) -> bool:
         """Delete an entry."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.writer() as db:
             await db.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
-            await db.commit()
-            return True
+            await db.execute("DELETE FROM entry_tags WHERE entry_id = ?", (entry_id,))
+            await db.execute("DELETE FROM enrichment_jobs WHERE entry_id = ?", (entry_id,))
+        return True
+
+    async def claim_enrichment_jobs(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Claim queued enrichment jobs that are due, from the highest-priority lane.
+
+        Claimed jobs are marked running (with their attempt counted) and their
+        entries marked processing, so other workers skip them.
+
+        Args:
+            limit: Maximum number of jobs to claim
+
+        Returns:
+            Claimed jobs, oldest first
+        """
+        now = datetime.utcnow().isoformat()
+        async with self.pool.writer() as db:
+            async with db.execute("""
+                SELECT * FROM enrichment_jobs
+                WHERE status = 'queued' AND run_after <= ?
+                ORDER BY priority, id
+                LIMIT ?
+            """, (now, limit)) as cursor:
+                jobs = [dict(row) for row in await cursor.fetchall()]
+
+            # Don't mix lanes: an interactive job never waits on a bulk batch
+            jobs = [job for job in jobs if job['priority'] == jobs[0]['priority']] if jobs else []
+            if not jobs:
+                return []
+
+            await db.executemany(
+                "UPDATE enrichment_jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                [(now, job['id']) for job in jobs]
+            )
+            await db.executemany(
+                "UPDATE entries SET processing_status = 'processing' WHERE id = ?",
+                [(job['entry_id'],) for job in jobs]
+            )
+
+        for job in jobs:
+            job['attempts'] += 1
+            job['status'] = 'running'
+        return jobs
+
+    async def complete_enrichment(
+        self,
+        results: List[Dict[str, Any]],
+        actions: List[Dict[str, Any]]
+    ) -> Dict[str, List[str]]:
+        """
+        Store enrichment results, their actions and finish the jobs in one transaction.
+
+        Entries are re-checked inside the transaction. Results of entries
+        deleted since they were read are dropped along with the relationships
+        written for them. Results of entries whose content changed are
+        dropped too, and their jobs are queued again for the new content.
+
+        Args:
+            results: Dicts with entry_id, the content that was enriched and
+                the ai_* fields for each entry
+            actions: Extracted actions to create, as accepted by create_action
+
+        Returns:
+            Dict with the 'deleted' and 'changed' entry IDs whose results were dropped
+        """
+        now = datetime.utcnow().isoformat()
+        stale: Dict[str, List[str]] = {'deleted': [], 'changed': []}
+        async with self.pool.writer() as db:
+            current = {}
+            for chunk in _chunks([result['entry_id'] for result in results]):
+                placeholders = ", ".join("?" for _ in chunk)
+                async with db.execute(
+                    f"SELECT id, content FROM entries WHERE id IN ({placeholders})", chunk
+                ) as cursor:
+                    current.update({row['id']: row['content'] for row in await cursor.fetchall()})
+            for result in results:
+                if result['entry_id'] not in current:
+                    stale['deleted'].append(result['entry_id'])
+                elif current[result['entry_id']] != result['content']:
+                    stale['changed'].append(result['entry_id'])
+            dropped = set(stale['deleted']) | set(stale['changed'])
+            results = [result for result in results if result['entry_id'] not in dropped]
+            actions = [action for action in actions if action['entry_id'] not in dropped]
+
+            await db.executemany(
+                "DELETE FROM relationships WHERE source_id = ? OR target_id = ?",
+                [(entry_id, entry_id) for entry_id in stale['deleted']]
+            )
+            # An edit may already have requeued the job; otherwise do it here
+            await db.executemany(
+                "UPDATE enrichment_jobs SET status = 'queued', attempts = 0, run_after = ?, updated_at = ? "
+                "WHERE entry_id = ? AND status = 'running'",
+                [(now, now, entry_id) for entry_id in stale['changed']]
+            )
+            await db.executemany(
+                "UPDATE entries SET processing_status = 'pending' WHERE id = ?",
+                [(entry_id,) for entry_id in stale['changed']]
+            )
+
+            await db.executemany("""
+                UPDATE entries
+                SET ai_categories = ?, ai_entities = ?, ai_summary = ?, ai_sentiment = ?,
+                    ai_key_phrases = ?, processing_status = 'completed', updated_at = ?
+                WHERE id = ?
+            """, [
+                (
+                    json.dumps(result.get('ai_categories', [])),
+                    json.dumps(result.get('ai_entities', [])),
+                    result.get('ai_summary'),
+                    json.dumps(result.get('ai_sentiment')),
+                    json.dumps(result.get('ai_key_phrases', [])),
+                    now,
+                    result['entry_id']
+                )
+                for result in results
+            ])
+            await db.executemany(
+                _INSERT_ACTION,
+                [self._action_params(str(uuid.uuid4()), action_data, now) for action_data in actions]
+            )
+            await db.executemany(
+                "DELETE FROM enrichment_jobs WHERE entry_id = ?",
+                [(result['entry_id'],) for result in results]
+            )
+        return stale
+
+    async def fail_enrichment_job(self, job_id: int, error: str, retry_at: Optional[datetime] = None):
+        """
+        Record a failed enrichment attempt.
+
+        Args:
+            job_id: Job that failed
+            error: Error message
+            retry_at: When to retry; None gives up and marks the entry failed
+        """
+        now = datetime.utcnow().isoformat()
+        status, entry_status = ('queued', 'pending') if retry_at else ('failed', 'failed')
+        async with self.pool.writer() as db:
+            await db.execute("""
+                UPDATE enrichment_jobs
+                SET status = ?, last_error = ?, run_after = ?, updated_at = ?
+                WHERE id = ?
+            """, (status, error, (retry_at.isoformat() if retry_at else now), now, job_id))
+            await db.execute("""
+                UPDATE entries SET processing_status = ?
+                WHERE id = (SELECT entry_id FROM enrichment_jobs WHERE id = ?)
+            """, (entry_status, job_id))
+
+    async def delete_enrichment_jobs(self, job_ids: List[int]):
+        """Delete enrichment jobs (e.g. whose entries no longer exist)."""
+        async with self.pool.writer() as db:
+            await db.executemany("DELETE FROM enrichment_jobs WHERE id = ?", [(job_id,) for job_id in job_ids])
+
+    async def requeue_running_enrichment_jobs(self, job_ids: Optional[List[int]] = None) -> int:
+        """
+        Put running jobs back in the queue.
+
+        Args:
+            job_ids: Jobs to requeue; None requeues every running job (those
+                left by a previous process, at startup)
+
+        Returns:
+            Number of jobs requeued
+        """
+        only = ""
+        params: List[Any] = []
+        if job_ids is not None:
+            if not job_ids:
+                return 0
+            only = f" AND id IN ({', '.join('?' for _ in job_ids)})"
+            params = list(job_ids)
+        async with self.pool.writer() as db:
+            await db.execute(f"""
+                UPDATE entries SET processing_status = 'pending'
+                WHERE id IN (SELECT entry_id FROM enrichment_jobs WHERE status = 'running'{only})
+            """, params)
+            cursor = await db.execute(
+                f"UPDATE enrichment_jobs SET status = 'queued' WHERE status = 'running'{only}", params
+            )
+            return cursor.rowcount
+
+    async def get_enrichment_job(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """Get the enrichment job of an entry (None once enrichment has completed)."""
+        async with self.pool.reader() as db:
+            async with db.execute("SELECT * FROM enrichment_jobs WHERE entry_id = ?", (entry_id,)) as cursor:
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+
+    async def count_enrichment_jobs(self) -> Dict[str, Dict[int, int]]:
+        """Count enrichment jobs by status and priority lane."""
+        counts: Dict[str, Dict[int, int]] = {}
+        async with self.pool.reader() as db:
+            async with db.execute(
+                "SELECT status, priority, COUNT(*) AS jobs FROM enrichment_jobs GROUP BY status, priority"
+            ) as cursor:
+                for row in await cursor.fetchall():
+                    counts.setdefault(row['status'], {})[row['priority']] = row['jobs']
+        return counts
 
     async def create_action(self, action_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create an action."""
         action_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat()
 
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT INTO actions (id, entry_id, description, priority, due_date, status, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                action_id,
-                action_data['entry_id'],
-                action_data['description'],
-                action_data.get('priority', 'medium'),
-                action_data.get('due_date'),
-                action_data.get('status', 'pending'),
-                now
-            ))
-            await db.commit()
+        async with self.pool.writer() as db:
+            await db.execute(_INSERT_ACTION, self._action_params(action_id, action_data, now))
 
         return await self.get_action(action_id)
 
+    async def create_actions_many(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many actions in a single transaction."""
+        if not actions:
+            return []
+
+        now = datetime.utcnow().isoformat()
+        rows = [self._action_params(str(uuid.uuid4()), action_data, now) for action_data in actions]
+
+        async with self.pool.writer() as db:
+            await db.executemany(_INSERT_ACTION, rows)
+
+        columns = ['id', 'entry_id', 'description', 'priority', 'due_date', 'status', 'created_at']
+        return [dict(zip(columns, row)) for row in rows]
+
+    def _action_params(self, action_id: str, action_data: Dict[str, Any], now: str) -> tuple:
+        """Build the INSERT parameters for an action."""
+        return (
+            action_id,
+            action_data['entry_id'],
+            action_data['description'],
+            action_data.get('priority', 'medium'),
+            action_data.get('due_date'),
+            action_data.get('status', 'pending'),
+            now
+        )
+
     async def get_action(self, action_id: str) -> Optional[Dict[str, Any]]:
         """Get action by ID."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.pool.reader() as db:
             async with db.execute("SELECT * FROM actions WHERE id = ?", (action_id,)) as cursor:
                 row = await cursor.fetchone()
                 if row:
@@ -231,12 +928,31 @@ class Database:
 
         query += " ORDER BY created_at DESC"
 
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.pool.reader() as db:
             async with db.execute(query, params) as cursor:
                 rows = await cursor.fetchall()
                 return [dict(row) for row in rows]
 
+    async def list_actions_for_entries(self, entry_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        List actions for many entries with one query per chunk of IDs.
+
+        Returns:
+            Mapping of entry ID to its actions (newest first); every requested
+            ID is present, with an empty list if it has no actions
+        """
+        actions = {entry_id: [] for entry_id in entry_ids}
+        async with self.pool.reader() as db:
+            for chunk in _chunks(list(actions)):
+                placeholders = ", ".join("?" for _ in chunk)
+                async with db.execute(
+                    f"SELECT * FROM actions WHERE entry_id IN ({placeholders}) ORDER BY created_at DESC",
+                    chunk
+                ) as cursor:
+                    for row in await cursor.fetchall():
+                        actions[row['entry_id']].append(dict(row))
+        return actions
+
     async def update_action(self, action_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update an action."""
         set_clauses = []
@@ -253,37 +969,92 @@ class Database:
         params.append(action_id)
         query = f"UPDATE actions SET {', '.join(set_clauses)} WHERE id = ?"
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.writer() as db:
             await db.execute(query, params)
-            await db.commit()
 
         return await self.get_action(action_id)
 
     async def create_relationship(self, source_id: str, target_id: str, weight: float, rel_type: str) -> Dict[str, Any]:
-        """Create a relationship between entries."""
-        rel_id = str(uuid.uuid4())
+        """
+        Create a relationship between entries.
+
+        If the (source_id, target_id, type) edge already exists, its weight is
+        updated instead.
+        """
+        now = datetime.utcnow().isoformat()
+
+        async with self.pool.writer() as db:
+            await db.execute(_UPSERT_RELATIONSHIP, (source_id, target_id, weight, rel_type, now))
+            async with db.execute("""
+                SELECT * FROM relationships
+                WHERE source_id = ? AND target_id = ? AND type = ?
+            """, (source_id, target_id, rel_type)) as cursor:
+                return dict(await cursor.fetchone())
+
+    async def create_relationships_many(self, edges: List[Tuple[str, str, float, str]]):
+        """
+        Create or update many relationships in a single transaction.
+
+        Args:
+            edges: (source_id, target_id, weight, type) tuples; existing edges
+                get the new weight
+        """
+        if not edges:
+            return
+
         now = datetime.utcnow().isoformat()
+        async with self.pool.writer() as db:
+            await db.executemany(
+                _UPSERT_RELATIONSHIP,
+                [(source_id, target_id, weight, rel_type, now) for source_id, target_id, weight, rel_type in edges]
+            )
 
-        async with aiosqlite.connect(self.db_path) as db:
+    async def get_vector_collection(self, status: str = "active") -> Optional[Dict[str, Any]]:
+        """Get the active (or building) vector collection, if one is registered."""
+        async with self.pool.reader() as db:
+            async with db.execute("SELECT * FROM vector_collections WHERE status = ?", (status,)) as cursor:
+                row = await cursor.fetchone()
+                return dict(row) if row else None
+
+    async def start_vector_collection(self, name: str, embedding_model: str) -> Dict[str, Any]:
+        """Register a new building collection, replacing any previous one."""
+        now = datetime.utcnow().isoformat()
+        async with self.pool.writer() as db:
+            await db.execute("DELETE FROM vector_collections WHERE status = 'building'")
+            await db.execute("""
+                INSERT INTO vector_collections (name, embedding_model, status, started_at, updated_at)
+                VALUES (?, ?, 'building', ?, ?)
+            """, (name, embedding_model, now, now))
+        return await self.get_vector_collection("building")
+
+    async def checkpoint_vector_collection(self, name: str, last_rowid: int, indexed: int):
+        """Record re-index progress of a building collection."""
+        async with self.pool.writer() as db:
             await db.execute("""
-                INSERT INTO relationships (id, source_id, target_id, weight, type, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (rel_id, source_id, target_id, weight, rel_type, now))
-            await db.commit()
-
-        return {
-            'id': rel_id,
-            'source_id': source_id,
-            'target_id': target_id,
-            'weight': weight,
-            'type': rel_type,
-            'created_at': now
-        }
+                UPDATE vector_collections SET last_rowid = ?, indexed = ?, updated_at = ?
+                WHERE name = ?
+            """, (last_rowid, indexed, datetime.utcnow().isoformat(), name))
+
+    async def activate_vector_collection(self, name: str) -> Optional[str]:
+        """
+        Make a building collection the active one in a single transaction.
+
+        Returns:
+            Name of the collection it replaced, if one was registered
+        """
+        async with self.pool.writer() as db:
+            async with db.execute("SELECT name FROM vector_collections WHERE status = 'active'") as cursor:
+                row = await cursor.fetchone()
+            await db.execute("DELETE FROM vector_collections WHERE status = 'active'")
+            await db.execute(
+                "UPDATE vector_collections SET status = 'active', updated_at = ? WHERE name = ?",
+                (datetime.utcnow().isoformat(), name)
+            )
+        return row['name'] if row else None
 
     async def get_relationships(self, entry_id: str) -> List[Dict[str, Any]]:
         """Get relationships for an entry."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.pool.reader() as db:
             async with db.execute("""
                 SELECT * FROM relationships
                 WHERE source_id = ? OR target_id = ?
@@ -312,3 +1083,10 @@ class Database:
 
 # Global database instance
 db = Database()
+
+# Coalesces relationship inserts from concurrent graph builds (see GRAPH_GROUP_COMMIT)
+relationship_writer = GroupCommitWriter(
+    db.create_relationships_many,
+    interval=settings.GRAPH_GROUP_COMMIT_INTERVAL_MS / 1000,
+    max_batch=settings.GRAPH_GROUP_COMMIT_MAX_BATCH
+)
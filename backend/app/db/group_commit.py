@@ -0,0 +1,97 @@
+"""
+Group-commit queue that coalesces small writes into batched transactions.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+
+class GroupCommitWriter:
+    """
+    Coalesce writes from concurrent callers into one batched flush.
+
+    Callers submit lists of items and wait until those items are committed.
+    A background task gathers everything submitted within `interval` seconds
+    (or until `max_batch` items are queued) and hands it to `flush` in a
+    single call, so N concurrent requests cost one transaction instead of N.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[Any]], Awaitable[Any]],
+        interval: float = 0.05,
+        max_batch: int = 1000
+    ):
+        """Initialize writer (the background task starts on first submit)."""
+        self.flush = flush
+        self.interval = interval
+        self.max_batch = max_batch
+        self._pending: List[Tuple[List[Any], asyncio.Future]] = []
+        self._size = 0
+        self._has_items = asyncio.Event()
+        self._full = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, items: List[Any]):
+        """
+        Queue items and wait until they have been flushed.
+
+        Raises:
+            Exception: Whatever the flush raised for the batch these items were in
+        """
+        if not items:
+            return
+        if self._closing:
+            raise RuntimeError("GroupCommitWriter is closed")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((items, future))
+        self._size += len(items)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._has_items.set()
+        if self._size >= self.max_batch:
+            self._full.set()
+
+        await future
+
+    async def close(self):
+        """Flush anything still queued and stop the background task."""
+        self._closing = True
+        self._has_items.set()
+        self._full.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def _run(self):
+        """Flush queued items in batches until closed."""
+        while True:
+            await self._has_items.wait()
+            if not self._closing:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch, self._pending = self._pending, []
+            self._size = 0
+            self._has_items.clear()
+            self._full.clear()
+
+            items = [item for submitted, _ in batch for item in submitted]
+            try:
+                if items:
+                    await self.flush(items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+
+            if self._closing and not self._pending:
+                return
@@ -0,0 +1,130 @@
+"""
+SQLite connection pool for the database layer.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Union
+import aiosqlite
+
+
+class ConnectionPool:
+    """
+    Long-lived aiosqlite connections shared across requests.
+
+    SQLite in WAL mode lets readers run alongside a single writer, so the
+    pool keeps one writer connection (serialized by a lock) and a fixed set
+    of reader connections handed out through a queue. Connections are opened
+    once and reused, which avoids paying for a new connection and background
+    thread on every query.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        readers: int = 4,
+        pragmas: Optional[Dict[str, Union[str, int]]] = None
+    ):
+        """Initialize pool (connections are opened lazily by open())."""
+        self.db_path = db_path
+        self.reader_count = max(1, readers)
+        self.pragmas = pragmas or {}
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._write_lock = asyncio.Lock()
+        self._open_lock = asyncio.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the pool currently holds open connections."""
+        return self._writer is not None
+
+    async def open(self):
+        """Open the writer and reader connections and apply pragmas."""
+        async with self._open_lock:
+            if self.is_open:
+                return
+
+            idle: asyncio.Queue = asyncio.Queue()
+            opened: List[aiosqlite.Connection] = []
+            try:
+                writer = await self._connect()
+                opened.append(writer)
+                # journal_mode is persistent in the database file, set it once on the writer
+                await writer.execute("PRAGMA journal_mode=WAL")
+                await writer.commit()
+
+                readers = []
+                for _ in range(self.reader_count):
+                    conn = await self._connect()
+                    opened.append(conn)
+                    readers.append(conn)
+                    idle.put_nowait(conn)
+            except BaseException:
+                # Each connection runs on a non-daemon thread; don't leak them
+                for conn in opened:
+                    await conn.close()
+                raise
+
+            self._writer = writer
+            self._readers = readers
+            self._idle = idle
+
+    async def close(self):
+        """Close all pooled connections."""
+        async with self._open_lock:
+            if not self.is_open:
+                return
+
+            for conn in self._readers:
+                await conn.close()
+            await self._writer.close()
+
+            self._writer = None
+            self._readers = []
+            self._idle = None
+
+    async def _connect(self) -> aiosqlite.Connection:
+        """Open a single configured connection."""
+        conn = await aiosqlite.connect(self.db_path)
+        try:
+            conn.row_factory = aiosqlite.Row
+            for name, value in self.pragmas.items():
+                await conn.execute(f"PRAGMA {name}={value}")
+        except BaseException:
+            await conn.close()
+            raise
+        return conn
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a reader connection for the duration of the block."""
+        if not self.is_open:
+            await self.open()
+
+        idle = self._idle
+        conn = await idle.get()
+        try:
+            yield conn
+        finally:
+            idle.put_nowait(conn)
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Hold the writer connection for one transaction.
+
+        The transaction is committed when the block exits normally and rolled
+        back if it raises.
+        """
+        if not self.is_open:
+            await self.open()
+
+        async with self._write_lock:
+            conn = self._writer
+            try:
+                yield conn
+                await conn.commit()
+            except BaseException:
+                await conn.rollback()
+                raise
@@ -1,40 +1,71 @@
 """
 Main FastAPI application for Coherence.
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.api import entries
-from app.db.database import db
+from app.core.readiness import ComponentDegraded, readiness
+from app.api import admin, entries
+from app.db.database import db, relationship_writer
 from app.services.ai_processor import ai_processor
+from app.services.enrichment_queue import enrichment_queue
+from app.services.inference import InferenceOverloaded, inference
+from app.services.reindexer import reindexer
 from app.services.semantic_search import semantic_search
 from app.services.knowledge_graph import knowledge_graph
 
 
+async def load_nlp():
+    """Load spaCy; without its model, entities come from simple extraction."""
+    await ai_processor.load_nlp()
+    if not ai_processor.nlp_available:
+        raise ComponentDegraded(f"spaCy model {settings.SPACY_MODEL} is not available; using simple extraction")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     print("🚀 Starting Coherence AI System...")
 
-    # Initialize database
-    print("📊 Initializing database...")
-    await db.initialize()
-
-    # Initialize AI services
-    print("🧠 Loading AI models...")
-    await ai_processor.initialize()
-    await semantic_search.initialize()
-    await knowledge_graph.initialize()
-
-    print("✅ Coherence is ready!")
-
-    yield
-
-    # Shutdown
-    print("👋 Shutting down Coherence...")
+    # Pooled connections run on non-daemon threads: close them however
+    # startup or shutdown ends, or the process cannot exit
+    try:
+        # Initialize database
+        print("📊 Initializing database...")
+        await readiness.load("database", db.initialize)
+        # Serve from the collection (and embedding model) the last re-index activated
+        await semantic_search.resolve_active_collection()
+
+        # Load AI services in the background; endpoints that need them wait
+        # for them (or return 503) until they are ready
+        print("🧠 Loading AI models in the background...")
+        readiness.start("embedding_model", ai_processor.load_embedding_model)
+        readiness.start("nlp", load_nlp)
+        readiness.start("vector_store", semantic_search.initialize)
+        readiness.start("knowledge_graph", knowledge_graph.initialize)
+
+        # Enrichment workers pick up queued entries (including any left from a
+        # previous run) once the models above are loaded
+        await enrichment_queue.start()
+
+        print("✅ Coherence is accepting requests!")
+
+        yield
+
+        # Shutdown
+        print("👋 Shutting down Coherence...")
+        await reindexer.stop()
+        await enrichment_queue.stop()
+        await readiness.cancel()
+        await relationship_writer.close()
+    finally:
+        await db.close()
+        await ai_processor.embedding_cache.close()
+        inference.shutdown()
 
 
 # Create FastAPI app
@@ -55,14 +86,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+
+@app.exception_handler(InferenceOverloaded)
+async def inference_overloaded_handler(request: Request, exc: InferenceOverloaded):
+    """Answer 503 with Retry-After when too many model calls are waiting."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 # Include routers
 app.include_router(
     entries.router,
     prefix=settings.API_V1_STR,
     tags=["entries"]
 )
+app.include_router(
+    admin.router,
+    prefix=settings.API_V1_STR,
+    tags=["admin"]
+)
 
 
 @app.get("/")
@@ -78,29 +126,55 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """
+    Liveness check.
+
+    Always 200 while the process serves requests; reports each component's
+    load state and load time.
+    """
     return {
-        "status": "healthy",
-        "services": {
-            "database": "operational",
-            "ai_processor": "operational",
-            "semantic_search": "operational",
-            "knowledge_graph": "operational"
-        }
+        "status": readiness.status,
+        "services": readiness.report(),
+        "nlp_available": ai_processor.nlp_available
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness check.
+
+    200 once every component has loaded; 503 with Retry-After before that
+    (or if a component failed to load). Components that loaded in a reduced
+    mode don't block readiness; they show as "degraded" in status and services.
+    """
+    body = {"ready": readiness.all_ready, "status": readiness.status, "services": readiness.report()}
+    if readiness.all_ready:
+        return body
+    return JSONResponse(
+        status_code=503,
+        content=body,
+        headers={"Retry-After": str(settings.READINESS_RETRY_AFTER)}
+    )
+
+
 @app.get(f"{settings.API_V1_STR}/stats")
 async def get_stats():
     """Get system statistics."""
     try:
-        entry_count = await semantic_search.count()
+        if readiness.is_ready("vector_store"):
+            entry_count = await semantic_search.count()
+        else:
+            entry_count = await db.count_entries()
         central_nodes = await knowledge_graph.get_central_nodes(limit=5)
 
         return {
             "total_entries": entry_count,
             "central_nodes": central_nodes,
             "ai_model": settings.EMBEDDING_MODEL,
+            "inference": inference.get_stats(),
+            "embedding_cache": ai_processor.embedding_cache.get_stats(),
+            "enrichment_queue": await enrichment_queue.get_stats(),
             "version": settings.VERSION
         }
     except Exception as e:
@@ -2,7 +2,7 @@
 Data models for entries and related entities.
 """
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Annotated, Optional, List, Dict, Any
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -33,6 +33,14 @@ class ActionStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+class ProcessingStatus(str, Enum):
+    """Status of an entry's AI enrichment."""
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class EntryBase(BaseModel):
     """Base entry model."""
     content: str = Field(..., min_length=1, description="Main content of the entry")
@@ -45,6 +53,11 @@ class EntryCreate(EntryBase):
     pass
 
 
+class EntryBulkCreate(BaseModel):
+    """Model for creating many entries in one request."""
+    entries: List[EntryCreate] = Field(..., min_length=1, description="Entries to create")
+
+
 class EntryUpdate(BaseModel):
     """Model for updating an entry."""
     content: Optional[str] = None
@@ -94,6 +107,8 @@ class Entry(EntryBase):
     ai_sentiment: Optional[Dict[str, float]] = None
     ai_key_phrases: List[str] = Field(default_factory=list)
 
+    processing_status: ProcessingStatus = ProcessingStatus.COMPLETED
+
     # Relationships
     extracted_actions: List[ExtractedAction] = Field(default_factory=list)
     related_entry_ids: List[str] = Field(default_factory=list)
@@ -108,6 +123,15 @@ class Entry(EntryBase):
         from_attributes = True
 
 
+class EnrichmentStatus(BaseModel):
+    """Progress of an entry's AI enrichment."""
+    entry_id: str
+    processing_status: ProcessingStatus
+    attempts: int = 0
+    last_error: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None  # Set while a retry is scheduled
+
+
 class GraphNode(BaseModel):
     """Node in knowledge graph."""
     id: str
@@ -139,6 +163,20 @@ class SearchResult(BaseModel):
     entry: Entry
     score: float
     highlights: List[str] = Field(default_factory=list)
+    source_scores: Dict[str, float] = Field(default_factory=dict)  # Per-retriever scores in hybrid mode
+
+
+class SearchBatchRequest(BaseModel):
+    """Model for running several searches in one request."""
+    queries: List[Annotated[str, Field(min_length=1)]] = Field(..., min_length=1, description="Search queries")
+    limit: int = Field(10, ge=1, le=50, description="Maximum results per query")
+    mode: str = Field("semantic", pattern="^(semantic|keyword|hybrid)$")
+
+
+class SearchBatchResult(BaseModel):
+    """Results of one query of a batch search."""
+    query: str
+    results: List[SearchResult]
 
 
 class Suggestion(BaseModel):
@@ -2,10 +2,19 @@
 AI Processing Service - Core AI engine for understanding and processing entries.
 """
 from typing import List, Dict, Any, Optional
+import asyncio
 import re
 from datetime import datetime
-from sentence_transformers import SentenceTransformer
 from app.core.config import settings
+from app.services.embedding_backends import (
+    HashingEmbeddingBackend,
+    create_embedding_backend,
+    embedding_cache_key
+)
+from app.services.embedding_cache import EmbeddingCache
+from app.services.inference import inference
+from app.services.lexicon import Lexicon, LexiconHits
+from app.services.micro_batcher import MicroBatcher
 from app.models.entry import (
     AIProcessingResult,
     ExtractedEntity,
@@ -13,6 +22,24 @@ from app.models.entry import (
     Priority
 )
 
+# Description following an action cue, up to the end of the sentence
+_ACTION_DESCRIPTION = re.compile(r'\s+([^.!?\n]+)')
+
+_DUE_DATE = re.compile(r'\b(\d{1,2}/\d{1,2}/\d{4}|\d{4}-\d{2}-\d{2})\b')
+
+_FALLBACK_DATE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in [
+        r'\b\d{1,2}/\d{1,2}/\d{4}\b',
+        r'\b\d{4}-\d{2}-\d{2}\b',
+        r'\b(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)\b',
+        r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2}\b'
+    ]
+]
+
+_EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+_CAPITALIZED_PHRASE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\b')
+
 
 class AIProcessor:
     """Main AI processing engine."""
@@ -20,27 +47,78 @@ class AIProcessor:
     def __init__(self):
         """Initialize AI processor."""
         self.embedding_model = None
-        self.nlp = None
-        self._initialized = False
+        # Used instead of the model when USE_LOCAL_EMBEDDINGS is off
+        self.fallback_embedding = HashingEmbeddingBackend(
+            dimension=settings.FALLBACK_EMBEDDING_DIM,
+            idf_path=settings.FALLBACK_EMBEDDING_IDF_PATH or None
+        )
+        # Model used for embeddings; semantic search may switch it to the one
+        # its active collection was built with
+        self.embedding_model_name = settings.EMBEDDING_MODEL
+        self.nlp_available = False
+        self.lexicon = Lexicon.from_file(settings.LEXICON_PATH or None)
+        self.embedding_batcher = MicroBatcher(
+            self._encode,
+            max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+            max_wait=settings.EMBEDDING_MAX_WAIT_MS / 1000
+        )
+        self.embedding_cache = EmbeddingCache(
+            embedding_cache_key(),
+            capacity=settings.EMBEDDING_CACHE_SIZE,
+            path=settings.EMBEDDING_CACHE_PATH or None
+        )
+        self._embedding_lock = asyncio.Lock()
+        self._embedding_loaded = False
+        self._nlp_lock = asyncio.Lock()
+        self._nlp_loaded = False
 
     async def initialize(self):
         """Initialize models (lazy loading)."""
-        if self._initialized:
+        if self._embedding_loaded and self._nlp_loaded:
             return
 
-        # Load embedding model
-        if settings.USE_LOCAL_EMBEDDINGS:
-            self.embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
+        await asyncio.gather(self.load_embedding_model(), self.load_nlp())
+
+    async def load_embedding_model(self):
+        """Load the embedding model (backend selected by EMBEDDING_BACKEND) off the event loop."""
+        async with self._embedding_lock:
+            if self._embedding_loaded:
+                return
+            if settings.USE_LOCAL_EMBEDDINGS:
+                self.embedding_model = await self.create_embedding_backend(self.embedding_model_name)
+            self._embedding_loaded = True
+
+    async def create_embedding_backend(self, model_name: str):
+        """Load an embedding backend for a model off the event loop."""
+        return await inference.run(
+            "embedding_load",
+            create_embedding_backend,
+            settings.EMBEDDING_BACKEND,
+            model_name
+        )
+
+    def set_embedding_model_name(self, model_name: str):
+        """Choose the embedding model before it is loaded."""
+        self.embedding_model_name = model_name
+        self.embedding_cache.set_model(embedding_cache_key(model_name))
 
-        # Load spaCy for NER
-        try:
-            import spacy
-            self.nlp = spacy.load(settings.SPACY_MODEL)
-        except OSError:
-            # Model not downloaded, use simple extraction
-            self.nlp = None
+    def use_embedding_model(self, model_name: str, backend):
+        """Switch to an already loaded embedding backend (e.g. after a re-index)."""
+        self.embedding_model = backend
+        self.set_embedding_model_name(model_name)
+        self._embedding_loaded = True
 
-        self._initialized = True
+    async def load_nlp(self):
+        """
+        Load spaCy for NER in the inference executor.
+
+        Falls back to simple extraction if the model is not downloaded.
+        """
+        async with self._nlp_lock:
+            if self._nlp_loaded:
+                return
+            self.nlp_available = await inference.load_nlp(settings.SPACY_MODEL)
+            self._nlp_loaded = True
 
     async def process_entry(self, content: str) -> AIProcessingResult:
         """
@@ -54,13 +132,45 @@ class AIProcessor:
         """
         await self.initialize()
 
-        # Run all processing in parallel
-        categories = await self._extract_categories(content)
-        entities = await self._extract_entities(content)
-        actions = await self._extract_actions(content)
+        # Parse once; all spaCy-based extractors share the result
+        parsed = await inference.parse(content) if self.nlp_available else None
+        return await self._build_result(content, parsed)
+
+    async def process_entries(self, contents: List[str]) -> List[AIProcessingResult]:
+        """
+        Process a batch of entries.
+
+        spaCy parses the whole batch with nlp.pipe instead of one call per entry.
+
+        Args:
+            contents: Text contents to process
+
+        Returns:
+            One AIProcessingResult per input, in input order
+        """
+        await self.initialize()
+
+        if self.nlp_available:
+            parses = await inference.parse_many(contents)
+        else:
+            parses = [None] * len(contents)
+
+        return [
+            await self._build_result(content, parsed)
+            for content, parsed in zip(contents, parses)
+        ]
+
+    async def _build_result(self, content: str, parsed: Optional[Dict[str, Any]]) -> AIProcessingResult:
+        """Run all extractors over content and its (optional) spaCy parse."""
+        # One lexicon pass feeds categories, actions and sentiment
+        hits = self.lexicon.scan(content)
+
+        categories = await self._extract_categories(content, hits)
+        entities = await self._extract_entities(content, parsed)
+        actions = await self._extract_actions(content, hits)
         summary = await self._generate_summary(content)
-        sentiment = await self._analyze_sentiment(content)
-        key_phrases = await self._extract_key_phrases(content)
+        sentiment = await self._analyze_sentiment(content, hits)
+        key_phrases = await self._extract_key_phrases(content, parsed)
 
         return AIProcessingResult(
             categories=categories,
@@ -75,41 +185,82 @@ class AIProcessor:
         """
         Generate embedding vector for text.
 
+        Cached embeddings are returned without running the model. With
+        EMBEDDING_MICRO_BATCH enabled, concurrent misses are grouped into one
+        batched encode by the micro-batcher.
+
         Args:
             text: Input text
 
         Returns:
             List of floats representing the embedding
         """
-        await self.initialize()
+        # Embedding never waits on spaCy
+        await self.load_embedding_model()
+
+        if not self.embedding_model:
+            return (await self._encode([text]))[0]
+
+        cached = (await self.embedding_cache.get_many([text]))[0]
+        if cached is not None:
+            return cached
+
+        if settings.EMBEDDING_MICRO_BATCH:
+            embedding = await self.embedding_batcher.submit(text)
+        else:
+            embedding = (await self._encode([text]))[0]
+        await self.embedding_cache.put_many([text], [embedding])
+        return embedding
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embedding vectors for many texts with one batched encode.
+
+        Only texts missing from the embedding cache are encoded.
 
+        Args:
+            texts: Input texts
+
+        Returns:
+            One embedding per input, in input order
+        """
+        # Embedding never waits on spaCy
+        await self.load_embedding_model()
+
+        if not texts:
+            return []
+        if not self.embedding_model:
+            return await self._encode(texts)
+
+        embeddings = await self.embedding_cache.get_many(texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            encoded = await self._encode(missing_texts)
+            await self.embedding_cache.put_many(missing_texts, encoded)
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+        return embeddings
+
+    async def _encode(self, texts: List[str]) -> List[List[float]]:
+        """Encode a batch of texts with the embedding model."""
         if self.embedding_model:
-            embedding = self.embedding_model.encode(text, convert_to_numpy=True)
-            return embedding.tolist()
+            embeddings = await inference.run(
+                "embedding",
+                self.embedding_model.encode,
+                texts,
+                batch_size=settings.EMBEDDING_BATCH_SIZE
+            )
         else:
-            # Fallback to simple hash-based embedding (not recommended for production)
-            return [float(hash(text) % 1000) / 1000.0] * 384
+            # Hashed n-gram TF-IDF vectors: cheap enough to skip the cache
+            embeddings = await inference.run("embedding_fallback", self.fallback_embedding.encode, texts)
+        return embeddings.tolist()
 
-    async def _extract_categories(self, content: str) -> List[str]:
+    async def _extract_categories(self, content: str, hits: Optional[LexiconHits] = None) -> List[str]:
         """Extract categories based on content analysis."""
-        categories = []
-        content_lower = content.lower()
-
         # Rule-based categorization (can be enhanced with ML)
-        category_keywords = {
-            'work': ['meeting', 'project', 'deadline', 'client', 'presentation', 'report'],
-            'personal': ['family', 'friend', 'home', 'health', 'hobby'],
-            'finance': ['money', 'budget', 'invoice', 'payment', 'investment', 'cost'],
-            'learning': ['course', 'book', 'tutorial', 'study', 'learn', 'research'],
-            'health': ['exercise', 'diet', 'doctor', 'medical', 'wellness'],
-            'travel': ['flight', 'hotel', 'trip', 'vacation', 'destination'],
-            'shopping': ['buy', 'purchase', 'order', 'shopping'],
-            'ideas': ['idea', 'concept', 'brainstorm', 'innovation', 'creative'],
-        }
-
-        for category, keywords in category_keywords.items():
-            if any(keyword in content_lower for keyword in keywords):
-                categories.append(category)
+        hits = hits or self.lexicon.scan(content)
+        categories = list(hits.categories)
 
         # Default category if none found
         if not categories:
@@ -117,30 +268,23 @@ class AIProcessor:
 
         return categories
 
-    async def _extract_entities(self, content: str) -> List[ExtractedEntity]:
-        """Extract named entities from text."""
+    async def _extract_entities(self, content: str, parsed: Optional[Dict[str, Any]] = None) -> List[ExtractedEntity]:
+        """Extract named entities from text, using its spaCy parse when available."""
         entities = []
 
-        if self.nlp:
-            doc = self.nlp(content)
-            for ent in doc.ents:
+        if parsed is not None:
+            for ent in parsed['entities']:
                 entities.append(ExtractedEntity(
-                    text=ent.text,
-                    label=ent.label_,
-                    start=ent.start_char,
-                    end=ent.end_char
+                    text=ent['text'],
+                    label=ent['label'],
+                    start=ent['start'],
+                    end=ent['end']
                 ))
         else:
             # Fallback: simple pattern matching for dates and emails
             # Extract dates (simple patterns)
-            date_patterns = [
-                r'\b\d{1,2}/\d{1,2}/\d{4}\b',
-                r'\b\d{4}-\d{2}-\d{2}\b',
-                r'\b(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)\b',
-                r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2}\b'
-            ]
-            for pattern in date_patterns:
-                for match in re.finditer(pattern, content, re.IGNORECASE):
+            for pattern in _FALLBACK_DATE_PATTERNS:
+                for match in pattern.finditer(content):
                     entities.append(ExtractedEntity(
                         text=match.group(),
                         label='DATE',
@@ -149,8 +293,7 @@ class AIProcessor:
                     ))
 
             # Extract emails
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            for match in re.finditer(email_pattern, content):
+            for match in _EMAIL.finditer(content):
                 entities.append(ExtractedEntity(
                     text=match.group(),
                     label='EMAIL',
@@ -160,31 +303,27 @@ class AIProcessor:
 
         return entities
 
-    async def _extract_actions(self, content: str) -> List[ExtractedAction]:
+    async def _extract_actions(self, content: str, hits: Optional[LexiconHits] = None) -> List[ExtractedAction]:
         """Extract actionable items from text."""
         actions = []
 
-        # Action indicators
-        action_patterns = [
-            (r'(?:need to|must|should|have to|todo:|task:)\s+([^.!?\n]+)', Priority.HIGH),
-            (r'(?:will|going to|plan to)\s+([^.!?\n]+)', Priority.MEDIUM),
-            (r'(?:could|might|maybe)\s+([^.!?\n]+)', Priority.LOW),
-            (r'(?:remember to|don\'t forget to)\s+([^.!?\n]+)', Priority.HIGH),
-        ]
-
-        for pattern, priority in action_patterns:
-            for match in re.finditer(pattern, content, re.IGNORECASE):
-                description = match.group(1).strip()
-                if len(description) > 10:  # Filter out very short matches
-                    # Try to extract due date from description
-                    due_date = self._extract_due_date(description)
-
-                    actions.append(ExtractedAction(
-                        description=description,
-                        priority=priority,
-                        due_date=due_date,
-                        entry_id=""  # Will be set later
-                    ))
+        # Each action cue ("need to", "will", ...) is followed by its description
+        hits = hits or self.lexicon.scan(content)
+        for _, cue_end, priority in hits.action_cues:
+            match = _ACTION_DESCRIPTION.match(content, cue_end)
+            if not match:
+                continue
+            description = match.group(1).strip()
+            if len(description) > 10:  # Filter out very short matches
+                # Try to extract due date from description
+                due_date = self._extract_due_date(description)
+
+                actions.append(ExtractedAction(
+                    description=description,
+                    priority=Priority(priority),
+                    due_date=due_date,
+                    entry_id=""  # Will be set later
+                ))
 
         return actions
 
@@ -206,8 +345,7 @@ class AIProcessor:
             return datetime.utcnow() + timedelta(days=7)
 
         # Specific date patterns (basic)
-        date_pattern = r'\b(\d{1,2}/\d{1,2}/\d{4}|\d{4}-\d{2}-\d{2})\b'
-        match = re.search(date_pattern, text)
+        match = _DUE_DATE.search(text)
         if match:
             try:
                 from dateutil import parser
@@ -229,18 +367,14 @@ class AIProcessor:
             return summary
         return None
 
-    async def _analyze_sentiment(self, content: str) -> Optional[Dict[str, float]]:
+    async def _analyze_sentiment(self, content: str, hits: Optional[LexiconHits] = None) -> Optional[Dict[str, float]]:
         """Analyze sentiment of content."""
         # Simple rule-based sentiment (can be enhanced with ML models)
-        positive_words = ['great', 'good', 'excellent', 'happy', 'excited', 'love', 'awesome', 'wonderful']
-        negative_words = ['bad', 'terrible', 'awful', 'hate', 'angry', 'sad', 'worried', 'frustrated']
-        urgent_words = ['urgent', 'asap', 'immediately', 'critical', 'emergency']
-
-        content_lower = content.lower()
+        hits = hits or self.lexicon.scan(content)
 
-        positive_count = sum(1 for word in positive_words if word in content_lower)
-        negative_count = sum(1 for word in negative_words if word in content_lower)
-        urgent_count = sum(1 for word in urgent_words if word in content_lower)
+        positive_count = hits.positive
+        negative_count = hits.negative
+        urgent_count = hits.urgency
 
         total = positive_count + negative_count + 1  # Avoid division by zero
 
@@ -251,21 +385,19 @@ class AIProcessor:
             'urgency': min(urgent_count / 3, 1.0)
         }
 
-    async def _extract_key_phrases(self, content: str) -> List[str]:
-        """Extract key phrases from content."""
+    async def _extract_key_phrases(self, content: str, parsed: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Extract key phrases from content, using its spaCy parse when available."""
         # Simple extraction based on capitalized phrases and noun chunks
         key_phrases = []
 
-        if self.nlp:
-            doc = self.nlp(content)
+        if parsed is not None:
             # Extract noun chunks
-            for chunk in doc.noun_chunks:
-                if len(chunk.text.split()) >= 2:  # Multi-word phrases
-                    key_phrases.append(chunk.text)
+            for chunk in parsed['noun_chunks']:
+                if len(chunk.split()) >= 2:  # Multi-word phrases
+                    key_phrases.append(chunk)
         else:
             # Fallback: extract capitalized multi-word phrases
-            capitalized_pattern = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\b'
-            key_phrases = re.findall(capitalized_pattern, content)
+            key_phrases = _CAPITALIZED_PHRASE.findall(content)
 
         # Remove duplicates and limit
         key_phrases = list(set(key_phrases))[:10]
@@ -0,0 +1,324 @@
+"""
+Embedding Backends - interchangeable implementations of the embedding model.
+
+EMBEDDING_BACKEND selects one:
+- "sentence-transformers": the PyTorch SentenceTransformer model
+- "onnx": the same model exported to ONNX and run with ONNX Runtime, optionally
+  int8 dynamic-quantized; needs neither torch nor transformers at runtime
+
+Export the model once with:
+    optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 \\
+        --task feature-extraction ./models/all-MiniLM-L6-v2-onnx
+
+Both backends mean-pool token embeddings and L2-normalize them like the
+sentence-transformers pipeline, so their vectors share one collection.
+
+With USE_LOCAL_EMBEDDINGS disabled no model is loaded and the hashing backend
+embeds texts instead: hashed word, word-bigram and character n-gram TF-IDF
+vectors projected to the collection dimension with NumPy.
+"""
+from typing import Dict, List, Optional
+from pathlib import Path
+import re
+import zlib
+import numpy as np
+from app.core.config import settings
+
+
+class EmbeddingBackend:
+    """Interface shared by the embedding backends."""
+
+    name = "base"
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Encode texts into embeddings.
+
+        Args:
+            texts: Input texts
+            batch_size: Texts per forward pass
+
+        Returns:
+            Array of shape (len(texts), dimension)
+        """
+        raise NotImplementedError
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """PyTorch sentence-transformers model."""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str):
+        """Load the model by name or path."""
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Encode texts with SentenceTransformer.encode."""
+        return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """ONNX Runtime inference over an exported transformer with mean pooling."""
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantize: bool = False,
+        max_length: int = 256,
+        normalize: bool = True,
+        threads: int = 0
+    ):
+        """
+        Load the exported model and its tokenizer.
+
+        Args:
+            model_dir: Directory with model.onnx and tokenizer.json
+            quantize: Use an int8 dynamic-quantized copy of the model
+                (model.int8.onnx, created next to model.onnx on first use)
+            max_length: Truncate inputs to this many tokens
+            normalize: L2-normalize the pooled embeddings
+            threads: ONNX Runtime intra-op threads (0 lets it decide)
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        directory = Path(model_dir)
+        model_path = directory / "model.onnx"
+        if quantize:
+            model_path = self._quantized(model_path)
+
+        self.tokenizer = Tokenizer.from_file(str(directory / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        self.normalize = normalize
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            str(model_path),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        if quantize:
+            self.name = "onnx-int8"
+
+    @staticmethod
+    def _quantized(model_path: Path) -> Path:
+        """Return the int8 copy of a model, quantizing it if it doesn't exist yet."""
+        quantized_path = model_path.with_name("model.int8.onnx")
+        if not quantized_path.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(str(model_path), str(quantized_path), weight_type=QuantType.QInt8)
+        return quantized_path
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Tokenize, run the model and mean-pool over non-padding tokens."""
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+            inputs = {'input_ids': input_ids, 'attention_mask': attention_mask}
+            if 'token_type_ids' in self.input_names:
+                inputs['token_type_ids'] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+            token_embeddings = self.session.run(None, inputs)[0]
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if self.normalize:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype(np.float32))
+
+        if not batches:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(batches)
+
+
+_WORD = re.compile(r"\w+")
+_BIGRAM_MULTIPLIER = np.uint64(0x9E3779B1)
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    Feature-hashing TF-IDF vectorizer; needs no model and no training.
+
+    Words, word bigrams and character n-grams of each word are hashed with
+    CRC32, which unlike hash() is the same in every process. Each feature adds
+    its sublinear term frequency, times its IDF weight if fitted, with a
+    hash-derived sign to one of `dimension` components (a sparse random
+    projection of the full n-gram space), and vectors are L2-normalized.
+    """
+
+    name = "hashing"
+
+    def __init__(
+        self,
+        dimension: int = 384,
+        char_ngram: int = 3,
+        idf_path: Optional[str] = None,
+        idf_buckets: int = 2 ** 18
+    ):
+        """
+        Initialize vectorizer.
+
+        Args:
+            dimension: Embedding dimension (match the collection's)
+            char_ngram: Length of the character n-grams taken from each word
+                (0 disables them)
+            idf_path: .npy file with IDF weights saved by save_idf(); without
+                one every feature weighs the same
+            idf_buckets: Number of IDF weights when fitting (power of two)
+        """
+        self.dimension = dimension
+        self.char_ngram = char_ngram
+        self.idf: Optional[np.ndarray] = None
+        self.idf_buckets = idf_buckets
+        if idf_path and Path(idf_path).exists():
+            self.idf = np.load(idf_path).astype(np.float32)
+            self.idf_buckets = len(self.idf)
+        # Feature hashes per word; bounded, words repeat across texts
+        self._word_features: Dict[str, np.ndarray] = {}
+
+    def _features_of_word(self, word: str) -> np.ndarray:
+        """Hashes of a word and its character n-grams (the word's own hash first)."""
+        features = self._word_features.get(word)
+        if features is None:
+            grams = [word]
+            if self.char_ngram:
+                padded = f"<{word}>"
+                grams += [
+                    "#" + padded[i:i + self.char_ngram]
+                    for i in range(max(1, len(padded) - self.char_ngram + 1))
+                ]
+            features = np.array([zlib.crc32(gram.encode()) for gram in grams], dtype=np.uint64)
+            if len(self._word_features) >= 100_000:
+                self._word_features.clear()
+            self._word_features[word] = features
+        return features
+
+    def _features(self, text: str) -> np.ndarray:
+        """Feature hashes of a text (with repeats, for term frequencies)."""
+        words = [self._features_of_word(word) for word in _WORD.findall(text.lower())]
+        if not words:
+            return np.zeros(0, dtype=np.uint64)
+        unigrams = np.array([features[0] for features in words], dtype=np.uint64)
+        bigrams = (unigrams[:-1] * _BIGRAM_MULTIPLIER + unigrams[1:]) & _MASK32
+        return np.concatenate(words + [bigrams])
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Vectorize all texts at once (batch_size is unused)."""
+        features = [self._features(text) for text in texts]
+        rows = np.repeat(np.arange(len(texts), dtype=np.uint64), [len(f) for f in features])
+        hashes = np.concatenate(features) if features else np.zeros(0, dtype=np.uint64)
+
+        # Term frequencies per (text, feature)
+        keys, counts = np.unique((rows << np.uint64(32)) | hashes, return_counts=True)
+        rows = (keys >> np.uint64(32)).astype(np.int64)
+        hashes = (keys & _MASK32).astype(np.int64)
+        weights = 1.0 + np.log(counts)
+        if self.idf is not None:
+            weights *= self.idf[hashes & (self.idf_buckets - 1)]
+
+        # Signed projection: the low bits pick the component, the top bit the sign
+        columns = hashes % self.dimension
+        signs = np.where(hashes >> 31, 1.0, -1.0)
+        # With no features at all, bincount ignores the weights and returns ints
+        embeddings = np.bincount(
+            rows * self.dimension + columns,
+            weights=weights * signs,
+            minlength=len(texts) * self.dimension
+        ).astype(np.float64).reshape(len(texts), self.dimension)
+        embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings.astype(np.float32)
+
+    def fit_idf(self, texts: List[str]):
+        """
+        Learn IDF weights from a corpus: log((1 + n) / (1 + df)) + 1, or 1 if unseen.
+
+        Args:
+            texts: Documents, typically all entries
+        """
+        df = np.zeros(self.idf_buckets, dtype=np.float64)
+        for text in texts:
+            buckets = np.unique(self._features(text) & np.uint64(self.idf_buckets - 1))
+            df[buckets.astype(np.int64)] += 1
+        idf = np.log((1 + len(texts)) / (1 + df)) + 1
+        # Features never seen (e.g. bigrams of new word pairs) would otherwise
+        # get the largest weight and dominate short queries
+        idf[df == 0] = 1.0
+        self.idf = idf.astype(np.float32)
+
+    def save_idf(self, path: str):
+        """Save fitted IDF weights for idf_path."""
+        np.save(path, self.idf)
+
+
+def create_embedding_backend(name: str, model_name: Optional[str] = None) -> EmbeddingBackend:
+    """
+    Create the embedding backend selected in settings.
+
+    Args:
+        name: "sentence-transformers" or "onnx"
+        model_name: Model to load (default EMBEDDING_MODEL); the ONNX backend
+            loads the export of EMBEDDING_MODEL in ONNX_MODEL_DIR
+
+    Returns:
+        Loaded backend
+
+    Raises:
+        ValueError: For an unknown backend, or a model the backend can't load
+    """
+    if name == "sentence-transformers":
+        return SentenceTransformerBackend(model_name or settings.EMBEDDING_MODEL)
+    if name == "onnx":
+        check_onnx_model(model_name)
+        return OnnxEmbeddingBackend(
+            settings.ONNX_MODEL_DIR,
+            quantize=settings.ONNX_QUANTIZE,
+            max_length=settings.ONNX_MAX_LENGTH,
+            threads=settings.ONNX_THREADS
+        )
+    raise ValueError(f"Unknown embedding backend: {name}")
+
+
+def check_onnx_model(model_name: Optional[str]):
+    """
+    Check that the ONNX export can stand in for a model.
+
+    ONNX_MODEL_DIR holds a single export, of EMBEDDING_MODEL; vectors of any
+    other model would be recorded under the wrong name.
+
+    Raises:
+        ValueError: If model_name is not EMBEDDING_MODEL
+    """
+    if model_name and model_name != settings.EMBEDDING_MODEL:
+        raise ValueError(
+            f"The onnx backend only serves {settings.EMBEDDING_MODEL} (exported to "
+            f"{settings.ONNX_MODEL_DIR}), not {model_name}"
+        )
+
+
+def embedding_cache_key(model_name: Optional[str] = None) -> str:
+    """
+    Model identifier for the embedding cache.
+
+    Vectors from different backends are close but not identical, so each
+    backend other than the original gets its own cache namespace.
+
+    Args:
+        model_name: Model the vectors come from (default EMBEDDING_MODEL)
+    """
+    if not settings.USE_LOCAL_EMBEDDINGS:
+        return f"hashing-{settings.FALLBACK_EMBEDDING_DIM}"
+    model_name = model_name or settings.EMBEDDING_MODEL
+    if settings.EMBEDDING_BACKEND == "onnx":
+        suffix = "onnx-int8" if settings.ONNX_QUANTIZE else "onnx"
+        return f"{model_name}@{suffix}"
+    return model_name
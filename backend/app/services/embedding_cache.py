@@ -0,0 +1,140 @@
+"""
+Embedding Cache - reuse embeddings of text that has been embedded before.
+
+Entries are keyed by (model name, sha256 of the text), so changing
+EMBEDDING_MODEL never serves stale vectors. An in-memory LRU sits in front
+of a persistent SQLite tier that survives restarts.
+"""
+from typing import Dict, List, Optional, Tuple
+from array import array
+from collections import OrderedDict
+import hashlib
+from app.db.pool import ConnectionPool
+
+# Keys per IN (...) lookup, well below SQLite's bound-parameter limit
+_LOOKUP_CHUNK_SIZE = 500
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + SQLite) embedding cache."""
+
+    def __init__(self, model_name: str, capacity: int = 10000, path: Optional[str] = None):
+        """
+        Initialize cache.
+
+        Args:
+            model_name: Name of the model producing the embeddings
+            capacity: Number of embeddings kept in memory
+            path: SQLite file for the persistent tier; None disables it
+        """
+        self.model_name = model_name
+        self.capacity = capacity
+        self._memory: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._pool = ConnectionPool(path, readers=1) if path else None
+        self._schema_ready = False
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def set_model(self, model_name: str):
+        """Switch to another model's namespace, dropping the memory tier."""
+        self.model_name = model_name
+        self._memory.clear()
+
+    def _key(self, text: str) -> bytes:
+        """Hash text into a cache key."""
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    async def _ensure_schema(self):
+        """Create the persistent table on first use."""
+        if self._schema_ready:
+            return
+        async with self._pool.writer() as conn:
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash BLOB NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                ) WITHOUT ROWID
+            """)
+        self._schema_ready = True
+
+    async def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings for texts.
+
+        Returns:
+            One embedding or None (miss) per input, in input order
+        """
+        keys = [self._key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[bytes, List[int]] = {}
+
+        for i, key in enumerate(keys):
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                results[i] = self._memory[key]
+                self.stats['memory_hits'] += 1
+            else:
+                missing.setdefault(key, []).append(i)
+
+        if missing and self._pool is not None:
+            await self._ensure_schema()
+            missing_keys = list(missing)
+            rows = []
+            async with self._pool.reader() as conn:
+                for start in range(0, len(missing_keys), _LOOKUP_CHUNK_SIZE):
+                    chunk = missing_keys[start:start + _LOOKUP_CHUNK_SIZE]
+                    placeholders = ", ".join("?" for _ in chunk)
+                    async with conn.execute(
+                        f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                        (self.model_name, *chunk)
+                    ) as cursor:
+                        rows.extend(await cursor.fetchall())
+
+            for key, blob in rows:
+                vector = array('f', blob).tolist()
+                self._remember(key, vector)
+                for i in missing.pop(key):
+                    results[i] = vector
+                    self.stats['disk_hits'] += 1
+
+        self.stats['misses'] += sum(len(indexes) for indexes in missing.values())
+        return results
+
+    async def put_many(self, texts: List[str], vectors: List[List[float]]):
+        """Store embeddings for texts in both tiers."""
+        entries: List[Tuple[bytes, List[float]]] = [
+            (self._key(text), vector) for text, vector in zip(texts, vectors)
+        ]
+        for key, vector in entries:
+            self._remember(key, vector)
+
+        if entries and self._pool is not None:
+            await self._ensure_schema()
+            async with self._pool.writer() as conn:
+                await conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                    [(self.model_name, key, array('f', vector).tobytes()) for key, vector in entries]
+                )
+
+    def _remember(self, key: bytes, vector: List[float]):
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current memory tier size."""
+        lookups = sum(self.stats.values())
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        return {
+            **self.stats,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'memory_entries': len(self._memory),
+        }
+
+    async def close(self):
+        """Close the persistent tier."""
+        if self._pool is not None:
+            await self._pool.close()
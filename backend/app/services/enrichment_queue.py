@@ -0,0 +1,241 @@
+"""
+Enrichment Queue - runs AI enrichment of new entries in background workers.
+
+Entries are committed together with a job row in the enrichment_jobs table,
+so the queue survives restarts. Workers claim due jobs from the highest
+priority lane, enrich them as a batch (AI extraction, embedding, vector
+write, graph connections, actions) and retry failures with exponential
+backoff. Interactive captures use a lane ahead of bulk imports.
+
+Results are stored only if the entry still has the content that was
+enriched: jobs for entries edited meanwhile are requeued, and the vector and
+graph node of entries deleted meanwhile are removed again.
+"""
+from typing import Any, Dict, List, Optional
+import asyncio
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.db.database import db
+from app.services.ai_processor import ai_processor
+from app.services.semantic_search import semantic_search
+from app.services.knowledge_graph import knowledge_graph
+
+# Longest pause of a worker after repeated errors, in seconds
+MAX_WORKER_BACKOFF = 60.0
+
+# Priority lanes (lower runs first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+_LANE_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BULK: "bulk"}
+
+
+class EnrichmentQueue:
+    """Background workers over the durable enrichment job queue."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        batch_size: int = 16,
+        max_attempts: int = 5,
+        backoff: float = 2.0,
+        poll_interval: float = 1.0
+    ):
+        """
+        Initialize queue (workers run between start() and stop()).
+
+        Args:
+            workers: Number of worker tasks
+            batch_size: Jobs claimed and enriched together
+            max_attempts: Attempts before a job is marked failed
+            backoff: Delay before the first retry in seconds, doubled per attempt
+            poll_interval: Seconds between checks for due jobs when idle
+        """
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.poll_interval = poll_interval
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {'completed': 0, 'retried': 0, 'failed': 0}
+
+    async def start(self):
+        """Requeue jobs interrupted by a previous shutdown and start the workers."""
+        if self._tasks:
+            return
+        requeued = await db.requeue_running_enrichment_jobs()
+        if requeued:
+            print(f"🔁 Requeued {requeued} interrupted enrichment jobs")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def notify(self):
+        """Wake idle workers after jobs were queued."""
+        self._wake.set()
+
+    async def stop(self):
+        """Stop the workers; jobs they were running are requeued on next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        """
+        Claim and run batches of jobs until cancelled.
+
+        An error outside a job's own enrichment (e.g. "database is locked"
+        while claiming or recording a failure) is logged, and the worker backs
+        off and requeues the jobs it had claimed instead of dying.
+        """
+        delay = self.backoff
+        claimed: List[Dict[str, Any]] = []
+        while True:
+            try:
+                if claimed:
+                    await db.requeue_running_enrichment_jobs([job['id'] for job in claimed])
+                    claimed.clear()
+                await self._run_once(claimed)
+                delay = self.backoff
+            except Exception as e:
+                print(f"⚠️  Enrichment worker error: {type(e).__name__}: {e}; retrying in {delay:g}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_WORKER_BACKOFF)
+
+    async def _run_once(self, claimed: List[Dict[str, Any]]):
+        """
+        Claim one batch of jobs and run it, or wait for jobs when there are none.
+
+        Args:
+            claimed: Receives the claimed jobs until they are finished, so the
+                caller can requeue them if this raises
+        """
+        jobs = await db.claim_enrichment_jobs(self.batch_size)
+        if not jobs:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            return
+
+        claimed.extend(jobs)
+        try:
+            await self._enrich(jobs)
+        except Exception as e:
+            if len(jobs) == 1:
+                await self._fail(jobs[0], e)
+            else:
+                # Retry one by one so a single bad entry doesn't fail its whole batch
+                for job in jobs:
+                    await self._run_single(job)
+        claimed.clear()
+
+    async def _run_single(self, job: Dict[str, Any]):
+        """Enrich one job, scheduling a retry or failing it on error."""
+        try:
+            await self._enrich([job])
+        except Exception as e:
+            await self._fail(job, e)
+
+    async def _fail(self, job: Dict[str, Any], error: Exception):
+        """Schedule a retry with exponential backoff, or give up after max_attempts."""
+        retry_at: Optional[datetime] = None
+        if job['attempts'] < self.max_attempts:
+            delay = self.backoff * 2 ** (job['attempts'] - 1)
+            retry_at = datetime.utcnow() + timedelta(seconds=delay)
+            self.stats['retried'] += 1
+        else:
+            self.stats['failed'] += 1
+        await db.fail_enrichment_job(job['id'], f"{type(error).__name__}: {error}", retry_at)
+
+    async def _enrich(self, jobs: List[Dict[str, Any]]):
+        """Run the enrichment pipeline for a batch of jobs."""
+        entries = await db.get_entries_many([job['entry_id'] for job in jobs])
+        found = {entry['id'] for entry in entries}
+        deleted = [job['id'] for job in jobs if job['entry_id'] not in found]
+        if deleted:
+            await db.delete_enrichment_jobs(deleted)
+        if not entries:
+            return
+
+        entry_ids = [entry['id'] for entry in entries]
+        contents = [entry['content'] for entry in entries]
+        ai_results = await ai_processor.process_entries(contents)
+
+        # Embed and index the whole batch at once
+        await semantic_search.add_entries(
+            entry_ids,
+            contents,
+            [
+                {'type': entry['type'], 'categories': ai_result.categories}
+                for entry, ai_result in zip(entries, ai_results)
+            ]
+        )
+
+        # Add all nodes before connecting so entries in the batch can link to each other
+        for entry, ai_result in zip(entries, ai_results):
+            await knowledge_graph.add_entry_node(
+                entry['id'],
+                entry['content'],
+                {
+                    'created_at': entry['created_at'],
+                    'categories': ai_result.categories,
+                    'entities': [e.dict() for e in ai_result.entities]
+                }
+            )
+        for entry_id in entry_ids:
+            await knowledge_graph.build_connections(entry_id)
+
+        # Results, actions and job completion land in one transaction, for
+        # the entries that still exist with the content enriched above
+        stale = await db.complete_enrichment(
+            [
+                {
+                    'entry_id': entry_id,
+                    'content': content,
+                    'ai_categories': ai_result.categories,
+                    'ai_entities': [e.dict() for e in ai_result.entities],
+                    'ai_summary': ai_result.summary,
+                    'ai_sentiment': ai_result.sentiment,
+                    'ai_key_phrases': ai_result.key_phrases,
+                }
+                for entry_id, content, ai_result in zip(entry_ids, contents, ai_results)
+            ],
+            [
+                {
+                    'entry_id': entry_id,
+                    'description': action.description,
+                    'priority': action.priority.value,
+                    'due_date': action.due_date.isoformat() if action.due_date else None,
+                    'status': action.status.value
+                }
+                for entry_id, ai_result in zip(entry_ids, ai_results)
+                for action in ai_result.actions
+            ]
+        )
+        for entry_id in stale['deleted']:
+            await semantic_search.delete_entry(entry_id)
+            await knowledge_graph.remove_entry(entry_id)
+        self.stats['completed'] += len(entry_ids) - len(stale['deleted']) - len(stale['changed'])
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Queued/running/failed job counts per lane and worker counters."""
+        counts = await db.count_enrichment_jobs()
+        return {
+            'jobs': {
+                status: {_LANE_NAMES.get(priority, str(priority)): n for priority, n in lanes.items()}
+                for status, lanes in counts.items()
+            },
+            **self.stats,
+        }
+
+
+# Global enrichment queue instance
+enrichment_queue = EnrichmentQueue(
+    workers=settings.ENRICHMENT_WORKERS,
+    batch_size=settings.ENRICHMENT_BATCH_SIZE,
+    max_attempts=settings.ENRICHMENT_MAX_ATTEMPTS,
+    backoff=settings.ENRICHMENT_BACKOFF_SECONDS,
+    poll_interval=settings.ENRICHMENT_POLL_SECONDS
+)
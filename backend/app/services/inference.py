@@ -0,0 +1,228 @@
+"""
+Inference Executor - runs model calls off the event loop.
+
+Embedding models (torch releases the GIL) run on a thread pool. spaCy holds
+the GIL while parsing, so it runs on a process pool by default, with each
+worker process loading its own copy of the model. Every call goes through a
+bounded number of in-flight slots and is timed; when too many calls are
+already waiting for a slot, new ones fail fast with InferenceOverloaded.
+"""
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from app.core.config import settings
+
+
+# spaCy model loaded in each worker process by _load_worker_nlp
+_worker_nlp = None
+
+
+def _load_worker_nlp(model_name: str):
+    """Process pool initializer: load the spaCy model once per worker."""
+    global _worker_nlp
+    import spacy
+    _worker_nlp = spacy.load(model_name)
+
+
+def _parse_in_worker(text: str) -> Dict[str, Any]:
+    """Parse text with the worker's spaCy model."""
+    return doc_to_parse(_worker_nlp(text))
+
+
+def _parse_many_in_worker(texts: List[str], batch_size: int) -> List[Dict[str, Any]]:
+    """Parse a batch of texts with the worker's spaCy model using nlp.pipe."""
+    return [doc_to_parse(doc) for doc in _worker_nlp.pipe(texts, batch_size=batch_size)]
+
+
+def doc_to_parse(doc) -> Dict[str, Any]:
+    """
+    Convert a spaCy Doc into the plain data the extractors use.
+
+    Docs are bound to their model's vocab, so only plain data crosses
+    process boundaries.
+    """
+    return {
+        'entities': [
+            {'text': ent.text, 'label': ent.label_, 'start': ent.start_char, 'end': ent.end_char}
+            for ent in doc.ents
+        ],
+        'noun_chunks': [chunk.text for chunk in doc.noun_chunks],
+    }
+
+
+class InferenceOverloaded(Exception):
+    """Raised when too many model calls are already waiting for a slot."""
+
+    def __init__(self, retry_after: int):
+        """
+        Args:
+            retry_after: Seconds after which the call is worth retrying
+        """
+        super().__init__("Inference is overloaded, try again shortly")
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """Executor layer that all model calls go through."""
+
+    def __init__(self):
+        """Initialize executor (pools are created on first use)."""
+        self.nlp = None  # spaCy model, when parsing in threads
+        self._nlp_processes: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0  # Calls waiting for an in-flight slot
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def nlp_available(self) -> bool:
+        """Whether a spaCy model is loaded in either mode."""
+        return self.nlp is not None or self._nlp_processes is not None
+
+    async def load_nlp(self, model_name: str) -> bool:
+        """
+        Load the spaCy model according to SPACY_EXECUTOR.
+
+        Returns:
+            False if the model is not available
+        """
+        if settings.SPACY_EXECUTOR == "process":
+            pool = ProcessPoolExecutor(
+                max_workers=settings.SPACY_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_load_worker_nlp,
+                initargs=(model_name,)
+            )
+            try:
+                # Warm up: fails here if the model can't be loaded in the workers
+                await asyncio.get_running_loop().run_in_executor(pool, _parse_in_worker, "")
+            except Exception:
+                pool.shutdown(wait=False, cancel_futures=True)
+                return False
+            self._nlp_processes = pool
+            return True
+
+        try:
+            import spacy
+            self.nlp = await self.run("spacy_load", spacy.load, model_name)
+        except (ImportError, OSError):
+            return False
+        return True
+
+    async def parse(self, text: str) -> Dict[str, Any]:
+        """Parse text with spaCy off the event loop."""
+        if self._nlp_processes is not None:
+            return await self._submit("spacy", self._nlp_processes, _parse_in_worker, text)
+        return await self.run("spacy", lambda: doc_to_parse(self.nlp(text)))
+
+    async def parse_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Parse many texts with nlp.pipe off the event loop.
+
+        In process mode the batch is split across the worker processes; in
+        thread mode nlp.pipe runs with SPACY_PIPE_PROCESSES processes.
+
+        Returns:
+            One parse per input, in input order
+        """
+        if not texts:
+            return []
+
+        if self._nlp_processes is not None:
+            workers = max(1, settings.SPACY_PROCESSES)
+            chunk_size = -(-len(texts) // workers)
+            chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+            results = await asyncio.gather(*[
+                self._submit(
+                    "spacy_batch",
+                    self._nlp_processes,
+                    _parse_many_in_worker,
+                    chunk,
+                    settings.SPACY_BATCH_SIZE
+                )
+                for chunk in chunks
+            ])
+            return [parse for chunk_result in results for parse in chunk_result]
+
+        return await self.run("spacy_batch", lambda: [
+            doc_to_parse(doc)
+            for doc in self.nlp.pipe(
+                texts,
+                batch_size=settings.SPACY_BATCH_SIZE,
+                n_process=settings.SPACY_PIPE_PROCESSES
+            )
+        ])
+
+    async def run(self, name: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run a model call on the inference thread pool."""
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=settings.INFERENCE_THREADS,
+                thread_name_prefix="inference"
+            )
+        return await self._submit(name, self._threads, lambda: fn(*args, **kwargs))
+
+    async def _submit(self, name: str, executor: Executor, fn: Callable, *args) -> Any:
+        """
+        Submit a call once an in-flight slot is free and record its timing.
+
+        Raises:
+            InferenceOverloaded: If all slots are taken and
+                INFERENCE_MAX_WAITING calls are already waiting for one
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(settings.INFERENCE_MAX_PENDING)
+
+        if self._slots.locked() and self._waiting >= settings.INFERENCE_MAX_WAITING:
+            self._record_rejected(name)
+            raise InferenceOverloaded(settings.INFERENCE_RETRY_AFTER)
+
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        finally:
+            self._record(name, (time.perf_counter() - start) * 1000)
+            self._slots.release()
+
+    def _record(self, name: str, elapsed_ms: float):
+        """Accumulate per-call timing for a kind of call."""
+        stat = self._stat(name)
+        stat['calls'] += 1
+        stat['total_ms'] += elapsed_ms
+        stat['max_ms'] = max(stat['max_ms'], elapsed_ms)
+
+    def _record_rejected(self, name: str):
+        """Count a call turned away because too many were waiting."""
+        self._stat(name)['rejected'] += 1
+
+    def _stat(self, name: str) -> Dict[str, float]:
+        """Timing and rejection counters for a kind of call."""
+        return self.stats.setdefault(name, {'calls': 0, 'rejected': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-kind call counts and timings, with the mean call time."""
+        return {
+            name: {**stat, 'mean_ms': stat['total_ms'] / stat['calls'] if stat['calls'] else 0.0}
+            for name, stat in self.stats.items()
+        }
+
+    def shutdown(self):
+        """Stop the executor pools."""
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
+        if self._nlp_processes is not None:
+            self._nlp_processes.shutdown(wait=False, cancel_futures=True)
+            self._nlp_processes = None
+
+
+# Global inference executor instance
+inference = InferenceExecutor()
@@ -0,0 +1,146 @@
+"""
+IVF Index - inverted-file approximate nearest-neighbour search.
+
+A coarse quantizer (spherical k-means centroids) splits the vectors into
+nlist cells. A query scores the centroids, then only the rows of the nprobe
+nearest cells: more probes, higher recall, slower queries. New rows are
+assigned to their nearest cell as they are inserted. The index tracks how far
+inserted vectors land from their centroids, so callers can retrain when the
+data drifts away from the distribution the centroids were trained on.
+
+This module holds the in-memory structures; the flat vector store persists
+centroids and cell assignments next to its vectors.
+"""
+from typing import List, Optional, Tuple
+import numpy as np
+
+# Rows scored per matrix product while assigning
+_ASSIGN_CHUNK = 16384
+
+
+def assign_cells(vectors: np.ndarray, centroids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Assign normalized vectors to their nearest centroid.
+
+    Returns:
+        (cell per vector as int32, 1 - cosine similarity to that centroid)
+    """
+    cells = np.empty(len(vectors), dtype=np.int32)
+    errors = np.empty(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), _ASSIGN_CHUNK):
+        similarities = np.asarray(vectors[start:start + _ASSIGN_CHUNK], dtype=np.float32) @ centroids.T
+        best = similarities.argmax(axis=1)
+        cells[start:start + len(best)] = best
+        errors[start:start + len(best)] = 1 - similarities[np.arange(len(best)), best]
+    return cells, errors
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means over normalized vectors.
+
+    Args:
+        vectors: Training sample, L2-normalized rows
+        nlist: Number of centroids
+        iterations: Lloyd iterations
+        seed: Seed for the initial centroids and re-seeding empty cells
+
+    Returns:
+        L2-normalized centroids, shape (nlist, dimension)
+    """
+    rng = np.random.default_rng(seed)
+    nlist = min(nlist, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].astype(np.float32)
+    for _ in range(iterations):
+        cells, _ = assign_cells(vectors, centroids)
+        order = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells, minlength=nlist)
+        nonempty = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[nonempty]
+        sums = np.add.reduceat(vectors[order], starts, axis=0)
+        centroids[nonempty] = sums
+        # Re-seed empty cells with random vectors
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids /= np.clip(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12, None)
+    return centroids
+
+
+class IvfIndex:
+    """Centroids and per-cell row lists over a set of vector rows."""
+
+    def __init__(self, nprobe: int = 8, drift_tolerance: float = 0.25):
+        """
+        Initialize an untrained index.
+
+        Args:
+            nprobe: Cells scanned per query
+            drift_tolerance: Retrain once the mean error of inserted vectors
+                exceeds the training error by this fraction
+        """
+        self.nprobe = nprobe
+        self.drift_tolerance = drift_tolerance
+        self.centroids: Optional[np.ndarray] = None
+        self.train_error = 0.0
+        self.trained_rows = 0
+        self._members: List[np.ndarray] = []
+        self._inserted = 0
+        self._inserted_error = 0.0
+
+    @property
+    def trained(self) -> bool:
+        """Whether centroids are set."""
+        return self.centroids is not None
+
+    def set_centroids(self, centroids: np.ndarray, cells: np.ndarray, train_error: float, trained_rows: int):
+        """
+        Install trained centroids and the cell of every row.
+
+        Args:
+            centroids: Normalized centroids
+            cells: Cell of each row, in row order
+            train_error: Mean 1 - cosine of the training sample to its centroids
+            trained_rows: Live rows when the centroids were trained
+        """
+        order = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells, minlength=len(centroids))
+        self._members = np.split(order.astype(np.int64), np.cumsum(counts)[:-1])
+        self.centroids = centroids
+        self.train_error = train_error
+        self.trained_rows = trained_rows
+        self._inserted = 0
+        self._inserted_error = 0.0
+
+    def add(self, first_row: int, cells: np.ndarray, errors: np.ndarray):
+        """Append newly inserted rows (first_row onwards) to their cells."""
+        rows = np.arange(first_row, first_row + len(cells), dtype=np.int64)
+        for cell in np.unique(cells):
+            self._members[cell] = np.concatenate([self._members[cell], rows[cells == cell]])
+        self._inserted += len(cells)
+        self._inserted_error += float(errors.sum())
+
+    def candidates(self, query: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """Rows of the nprobe cells nearest to a normalized query, in row order."""
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        similarities = self.centroids @ query
+        cells = np.argpartition(-similarities, nprobe - 1)[:nprobe]
+        rows = np.concatenate([self._members[cell] for cell in cells])
+        # Sorted rows read the memory-mapped vectors front to back
+        rows.sort()
+        return rows
+
+    def needs_retrain(self, live_rows: int) -> bool:
+        """
+        Whether the centroids no longer fit the data.
+
+        True once the collection has doubled since training, or once enough
+        vectors were inserted (1000, or 10% of the trained rows) and they sit
+        drift_tolerance further from their centroids than the training data.
+        """
+        if live_rows >= 2 * self.trained_rows:
+            return True
+        if self._inserted < max(1000, self.trained_rows // 10):
+            return False
+        inserted_error = self._inserted_error / self._inserted
+        return inserted_error > self.train_error * (1 + self.drift_tolerance)
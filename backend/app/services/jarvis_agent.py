@@ -9,15 +9,17 @@ that provides JARVIS-like intelligent assistance with:
 - Research and planning capabilities
 """
 
-from typing import List, Dict, Any, AsyncGenerator, Optional
+from typing import TYPE_CHECKING, List, Dict, Any, AsyncGenerator, Optional
 from dataclasses import dataclass
 from enum import Enum
 import asyncio
 import json
 from datetime import datetime
-import openai
 from pydantic import BaseModel
 
+if TYPE_CHECKING:
+    import openai
+
 
 class AgentRole(str, Enum):
     """Agent roles in the multi-agent system."""
@@ -95,6 +97,7 @@ class JARVISAgent:
         streaming: bool = True
     ):
         """Initialize JARVIS agent."""
+        import openai
         self.client = openai.AsyncOpenAI(api_key=openai_api_key)
         self.model = model
         self.temperature = temperature
@@ -263,7 +266,7 @@ class JARVISAgent:
 class RouterAgent:
     """Determines the execution path for a query."""
 
-    def __init__(self, client: openai.AsyncOpenAI, model: str):
+    def __init__(self, client: "openai.AsyncOpenAI", model: str):
         self.client = client
         self.model = model
 
@@ -308,7 +311,7 @@ Respond in JSON:
 class ContextAgent:
     """Enriches context from user's knowledge base."""
 
-    def __init__(self, client: openai.AsyncOpenAI, model: str):
+    def __init__(self, client: "openai.AsyncOpenAI", model: str):
         self.client = client
         self.model = model
 
@@ -342,7 +345,7 @@ class ContextAgent:
 class AnalyzerAgent:
     """Performs deep analysis using DS-STAR approach."""
 
-    def __init__(self, client: openai.AsyncOpenAI, model: str):
+    def __init__(self, client: "openai.AsyncOpenAI", model: str):
         self.client = client
         self.model = model
 
@@ -390,7 +393,7 @@ Provide analysis in JSON:
 class PlannerAgent:
     """Creates execution plans using DS-STAR sequential planning."""
 
-    def __init__(self, client: openai.AsyncOpenAI, model: str):
+    def __init__(self, client: "openai.AsyncOpenAI", model: str):
         self.client = client
         self.model = model
 
@@ -472,7 +475,7 @@ Provide refined plan in same JSON format."""
 class CoderAgent:
     """Generates implementation code."""
 
-    def __init__(self, client: openai.AsyncOpenAI, model: str):
+    def __init__(self, client: "openai.AsyncOpenAI", model: str):
         self.client = client
         self.model = model
 
@@ -521,7 +524,7 @@ Provide in JSON:
 class VerifierAgent:
     """Verifies if solution is sufficient (DS-STAR judge)."""
 
-    def __init__(self, client: openai.AsyncOpenAI, model: str):
+    def __init__(self, client: "openai.AsyncOpenAI", model: str):
         self.client = client
         self.model = model
 
@@ -575,7 +578,7 @@ Verify and provide in JSON:
 class SynthesizerAgent:
     """Synthesizes final response in conversational tone."""
 
-    def __init__(self, client: openai.AsyncOpenAI, model: str):
+    def __init__(self, client: "openai.AsyncOpenAI", model: str):
         self.client = client
         self.model = model
 
@@ -1,12 +1,15 @@
 """
 Knowledge Graph Service - Build and query dynamic knowledge graphs.
 """
-from typing import List, Dict, Any, Optional, Set, Tuple
-import networkx as nx
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
+from app.core.config import settings
 from app.models.entry import KnowledgeGraph, GraphNode, GraphEdge
 from app.services.semantic_search import semantic_search
-from app.db.database import db
+from app.db.database import db, relationship_writer
+
+if TYPE_CHECKING:
+    import networkx as nx
 
 
 class KnowledgeGraphService:
@@ -14,7 +17,7 @@ class KnowledgeGraphService:
 
     def __init__(self):
         """Initialize knowledge graph service."""
-        self.graph = nx.DiGraph()
+        self.graph: Optional["nx.DiGraph"] = None  # Created by initialize (networkx is imported on first use)
         self._initialized = False
 
     async def initialize(self):
@@ -28,7 +31,8 @@ class KnowledgeGraphService:
 
     async def _rebuild_graph(self):
         """Rebuild graph from database."""
-        self.graph.clear()
+        import networkx as nx
+        self.graph = nx.DiGraph()
 
         # This would load from database in production
         # For now, graph will be built incrementally
@@ -64,6 +68,8 @@ class KnowledgeGraphService:
         """
         Build connections for a new entry based on similarity and entities.
 
+        Edges found during the build are saved together in one batch.
+
         Args:
             entry_id: Entry to build connections for
         """
@@ -72,6 +78,8 @@ class KnowledgeGraphService:
         if entry_id not in self.graph:
             return
 
+        edges: List[Tuple[str, str, float, str]] = []
+
         # Find similar entries using semantic search
         similar_entries = await semantic_search.find_similar(entry_id, limit=5)
 
@@ -86,22 +94,26 @@ class KnowledgeGraphService:
                     type='similarity'
                 )
 
-                # Save relationship to database
-                await db.create_relationship(
-                    entry_id,
-                    similar_id,
-                    weight,
-                    'similarity'
-                )
+                edges.append((entry_id, similar_id, weight, 'similarity'))
 
         # Build entity-based connections
-        await self._build_entity_connections(entry_id)
+        self._build_entity_connections(entry_id, edges)
 
         # Build temporal connections (entries created around same time)
-        await self._build_temporal_connections(entry_id)
+        self._build_temporal_connections(entry_id, edges)
+
+        # Save relationships to database
+        await self._save_relationships(edges)
+
+    async def _save_relationships(self, edges: List[Tuple[str, str, float, str]]):
+        """Persist edges in one transaction, or via the group-commit queue if enabled."""
+        if settings.GRAPH_GROUP_COMMIT:
+            await relationship_writer.submit(edges)
+        else:
+            await db.create_relationships_many(edges)
 
-    async def _build_entity_connections(self, entry_id: str):
-        """Build connections based on shared entities."""
+    def _build_entity_connections(self, entry_id: str, edges: List[Tuple[str, str, float, str]]):
+        """Build connections based on shared entities, appending new edges to edges."""
         if entry_id not in self.graph:
             return
 
@@ -137,10 +149,10 @@ class KnowledgeGraphService:
                         shared_entities=list(shared_entities)
                     )
 
-                    await db.create_relationship(entry_id, other_id, weight, 'entity')
+                    edges.append((entry_id, other_id, weight, 'entity'))
 
-    async def _build_temporal_connections(self, entry_id: str):
-        """Build connections to temporally related entries."""
+    def _build_temporal_connections(self, entry_id: str, edges: List[Tuple[str, str, float, str]]):
+        """Build connections to temporally related entries, appending new edges to edges."""
         if entry_id not in self.graph:
             return
 
@@ -177,7 +189,7 @@ class KnowledgeGraphService:
                         type='temporal'
                     )
 
-                    await db.create_relationship(entry_id, other_id, weight, 'temporal')
+                    edges.append((entry_id, other_id, weight, 'temporal'))
             except:
                 continue
 
@@ -323,6 +335,7 @@ class KnowledgeGraphService:
             List of paths (each path is a list of entry IDs)
         """
         await self.initialize()
+        import networkx as nx
 
         if source_id not in self.graph or target_id not in self.graph:
             return []
@@ -355,6 +368,7 @@ class KnowledgeGraphService:
             return []
 
         # Calculate PageRank
+        import networkx as nx
         pagerank = nx.pagerank(self.graph, weight='weight')
 
         # Sort by score
@@ -0,0 +1,152 @@
+"""
+Lexicon Scanner - single-pass keyword matching for rule-based extraction.
+
+All lexicon terms (category keywords, sentiment and urgency words, action
+cues) are compiled once into one trie-shaped regular expression. Scanning a
+text is a single pass over it regardless of how many terms are loaded, and
+matches respect word boundaries, so "bad" does not match "badge".
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+import json
+import re
+
+
+DEFAULT_LEXICONS: Dict[str, Any] = {
+    'categories': {
+        'work': ['meeting', 'project', 'deadline', 'client', 'presentation', 'report'],
+        'personal': ['family', 'friend', 'home', 'health', 'hobby'],
+        'finance': ['money', 'budget', 'invoice', 'payment', 'investment', 'cost'],
+        'learning': ['course', 'book', 'tutorial', 'study', 'learn', 'research'],
+        'health': ['exercise', 'diet', 'doctor', 'medical', 'wellness'],
+        'travel': ['flight', 'hotel', 'trip', 'vacation', 'destination'],
+        'shopping': ['buy', 'purchase', 'order', 'shopping'],
+        'ideas': ['idea', 'concept', 'brainstorm', 'innovation', 'creative'],
+    },
+    'sentiment': {
+        'positive': ['great', 'good', 'excellent', 'happy', 'excited', 'love', 'awesome', 'wonderful'],
+        'negative': ['bad', 'terrible', 'awful', 'hate', 'angry', 'sad', 'worried', 'frustrated'],
+    },
+    'urgency': ['urgent', 'asap', 'immediately', 'critical', 'emergency'],
+    'actions': {
+        'high': ['need to', 'must', 'should', 'have to', 'todo:', 'task:', 'remember to', "don't forget to"],
+        'medium': ['will', 'going to', 'plan to'],
+        'low': ['could', 'might', 'maybe'],
+    },
+}
+
+# Inflections accepted after category, sentiment and urgency words
+# ("meetings", "studying"); action cues must match exactly
+_SUFFIX = r"(s|es|ed|ing)?"
+
+# Inflections that drop a word's final "e" ("loved", "hating")
+_E_DROPPING_SUFFIXES = ('ed', 'ing')
+
+
+@dataclass
+class LexiconHits:
+    """Everything one scan of a text found."""
+    categories: List[str] = field(default_factory=list)
+    positive: int = 0  # Distinct positive words present
+    negative: int = 0  # Distinct negative words present
+    urgency: int = 0  # Distinct urgency words present
+    action_cues: List[Tuple[int, int, str]] = field(default_factory=list)  # (start, end, priority)
+
+
+def _trie_regex(terms: List[str]) -> str:
+    """
+    Build a regex alternation for terms, factored by common prefixes.
+
+    A flat "a|b|c|..." alternation retries every branch at every position;
+    the trie shape lets the engine rule out most terms after a character or two.
+    """
+    trie: Dict[str, Any] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        ends_here = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 and not ends_here else f"(?:{'|'.join(branches)})"
+        return f"{body}?" if ends_here else body
+
+    return build(trie)
+
+
+class Lexicon:
+    """Compiled lexicon that extracts all rule-based signals in one pass."""
+
+    def __init__(self, lexicons: Dict[str, Any]):
+        """Compile lexicons (same shape as DEFAULT_LEXICONS)."""
+        self.category_order = list(lexicons.get('categories', {}))
+        # term -> list of (kind, label)
+        self.terms: Dict[str, List[Tuple[str, str]]] = {}
+        # "lov" -> "love", for words whose final "e" drops before ed/ing
+        self.stems: Dict[str, str] = {}
+
+        for category, words in lexicons.get('categories', {}).items():
+            for word in words:
+                self._add(word, 'category', category)
+        for polarity, words in lexicons.get('sentiment', {}).items():
+            for word in words:
+                self._add(word, polarity, polarity)
+        for word in lexicons.get('urgency', []):
+            self._add(word, 'urgency', 'urgency')
+        for priority, cues in lexicons.get('actions', {}).items():
+            for cue in cues:
+                self._add(cue, 'action', priority)
+
+        self.pattern = re.compile(
+            rf"(?<!\w)({_trie_regex(list(self.terms) + list(self.stems))}){_SUFFIX}(?!\w)",
+            re.IGNORECASE
+        )
+
+    def _add(self, term: str, kind: str, label: str):
+        """Register a term under a kind/label."""
+        term = term.lower()
+        self.terms.setdefault(term, []).append((kind, label))
+        if kind != 'action' and len(term) > 2 and term.endswith('e') and term[-2].isalpha():
+            self.stems[term[:-1]] = term
+
+    @classmethod
+    def from_file(cls, path: Optional[str]) -> "Lexicon":
+        """Load lexicons from a JSON file, falling back to the defaults for missing sections."""
+        lexicons = dict(DEFAULT_LEXICONS)
+        if path:
+            with open(path, encoding="utf-8") as f:
+                lexicons.update(json.load(f))
+        return cls(lexicons)
+
+    def scan(self, text: str) -> LexiconHits:
+        """Scan text once and collect category, sentiment, urgency and action-cue hits."""
+        hits = LexiconHits()
+        categories = set()
+        seen: Dict[str, set] = {}
+
+        for match in self.pattern.finditer(text):
+            term = match.group(1).lower()
+            suffix = match.group(2)
+            if term in self.stems and suffix and suffix.lower() in _E_DROPPING_SUFFIXES:
+                term = self.stems[term]
+            elif term not in self.terms:
+                continue  # A bare stem ("lov") is not a word
+            inflected = suffix is not None
+            for kind, label in self.terms.get(term, []):
+                if kind == 'action':
+                    if not inflected:
+                        hits.action_cues.append((match.start(), match.end(1), label))
+                elif kind == 'category':
+                    categories.add(label)
+                else:
+                    seen.setdefault(kind, set()).add(term)
+
+        hits.categories = [c for c in self.category_order if c in categories]
+        hits.positive = len(seen.get('positive', ()))
+        hits.negative = len(seen.get('negative', ()))
+        hits.urgency = len(seen.get('urgency', ()))
+        return hits
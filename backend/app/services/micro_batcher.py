@@ -0,0 +1,67 @@
+"""
+Micro-batching scheduler that groups concurrent single-item calls into batches.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Tuple
+
+
+class MicroBatcher:
+    """
+    Collect concurrent single-item requests and process them as one batch.
+
+    Each submit() queues an item and waits for its result. A background task
+    waits up to `max_wait` seconds for more items (or until `max_batch_size`
+    are queued), calls `process` once with the whole batch and resolves each
+    caller with its own result. `process` must return one result per item,
+    in order.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 32,
+        max_wait: float = 0.005
+    ):
+        """Initialize batcher (the background task runs only while items are queued)."""
+        self.process = process
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._queue: List[Tuple[Any, asyncio.Future]] = []
+        self._full = asyncio.Event()
+        self._task = None
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and return its result once its batch has been processed."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((item, future))
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        if len(self._queue) >= self.max_batch_size:
+            self._full.set()
+
+        return await future
+
+    async def _run(self):
+        """Process queued items batch by batch until the queue is empty."""
+        while self._queue:
+            if len(self._queue) < self.max_batch_size:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+
+            batch = self._queue[:self.max_batch_size]
+            del self._queue[:self.max_batch_size]
+
+            try:
+                results = await self.process([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
@@ -0,0 +1,91 @@
+"""
+Quantization - compact representations of embeddings for vector search.
+
+Binary codes keep one sign bit per dimension, packed into uint8 rows (48
+bytes for a 384-dimensional embedding instead of 1536). The Hamming distance
+between two codes tracks the angle between the vectors, so scanning codes
+with XOR and popcount finds a candidate pool that is then re-ranked with the
+full-precision vectors.
+
+Projections keep the top principal directions of a corpus' embeddings, so
+rows can be stored with fewer dimensions at a small cost in recall.
+"""
+from typing import Tuple
+import numpy as np
+
+# Set bits per byte value, for NumPy versions without bitwise_count (< 2.0)
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def pack_signs(vectors: np.ndarray) -> np.ndarray:
+    """
+    Binary codes of vectors: bit i is set when component i is positive.
+
+    Args:
+        vectors: Array of shape (n, dimension)
+
+    Returns:
+        uint8 array of shape (n, ceil(dimension / 8))
+    """
+    return np.packbits(np.atleast_2d(vectors) > 0, axis=1)
+
+
+def hamming_distances(codes: np.ndarray, query_code: np.ndarray, block_rows: int = 16384) -> np.ndarray:
+    """
+    Hamming distance from every code to a query code.
+
+    Works through the codes in cache-sized blocks, summing per-word
+    popcounts column by column (faster than a reduction along each row).
+
+    Args:
+        codes: uint8 codes of shape (n, code_bytes)
+        query_code: uint8 code of shape (code_bytes,)
+        block_rows: Codes per block
+
+    Returns:
+        uint16 distances of shape (n,)
+    """
+    codes = np.asarray(codes)
+    query_code = np.ascontiguousarray(query_code)
+    words_per_code = codes.shape[1] // 8
+    if codes.shape[1] % 8 == 0 and hasattr(np, "bitwise_count"):
+        # XOR and popcount 64-bit words
+        codes = np.ascontiguousarray(codes).view(np.uint64).reshape(len(codes), words_per_code)
+        query_code = query_code.view(np.uint64)
+        popcount = np.bitwise_count
+    else:
+        popcount = _POPCOUNT.__getitem__
+
+    distances = np.empty(len(codes), dtype=np.uint16)
+    for start in range(0, len(codes), block_rows):
+        counts = popcount(codes[start:start + block_rows] ^ query_code)
+        block = distances[start:start + len(counts)]
+        block[:] = counts[:, 0]
+        for column in range(1, counts.shape[1]):
+            block += counts[:, column]
+    return distances
+
+
+def fit_projection(vectors: np.ndarray, dimension: int) -> Tuple[np.ndarray, float]:
+    """
+    Principal directions of a sample of embeddings.
+
+    The vectors are not mean-centered: search ranks by dot product, which a
+    projection onto the top eigenvectors of the uncentered second-moment
+    matrix preserves best.
+
+    Args:
+        vectors: Sample rows, shape (n, input_dimension)
+        dimension: Directions to keep
+
+    Returns:
+        (components of shape (dimension, input_dimension), fraction of the
+        sample's energy they retain)
+    """
+    vectors = np.asarray(vectors, dtype=np.float64)
+    moments = vectors.T @ vectors
+    eigenvalues, eigenvectors = np.linalg.eigh(moments)
+    # eigh sorts ascending
+    top = np.argsort(eigenvalues)[::-1][:dimension]
+    retained = float(eigenvalues[top].sum() / max(eigenvalues.sum(), 1e-12))
+    return eigenvectors[:, top].T.astype(np.float32), retained
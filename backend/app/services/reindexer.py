@@ -0,0 +1,307 @@
+"""
+Re-indexer - rebuild the vector collection with another embedding model.
+
+Entries are streamed from SQLite in rowid order, batch-encoded and written to
+a shadow collection while search keeps serving from the active one. Progress
+is checkpointed after every chunk, so an interrupted run resumes where it
+stopped. Once the shadow has caught up with entries added, edited or
+deleted in the meantime, it is swapped in atomically together with the
+model used to embed queries. The last catch-up and the swap run under the
+search service's swap lock, so no vector write lands in the old collection
+after the shadow has read the entries it covers.
+
+The vector stores allow a single writing process: use the admin endpoint on
+a running server, or the CLI while the API is stopped:
+
+    python -m app.services.reindexer [--model NAME] [--chunk-size N]
+"""
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+import time
+import uuid
+from app.core.config import settings
+from app.db.database import db
+from app.services.ai_processor import ai_processor
+from app.services.embedding_backends import check_onnx_model, embedding_cache_key
+from app.services.embedding_cache import EmbeddingCache
+from app.services.inference import inference
+from app.services.semantic_search import semantic_search
+
+# The last catch-up also re-reads entries updated this long before the first
+# one started, for writes whose updated_at was taken before it but committed after
+_CATCH_UP_OVERLAP = timedelta(seconds=30)
+
+
+class Reindexer:
+    """Resumable re-embedding of all entries into a shadow collection."""
+
+    def __init__(self, chunk_size: int = 500):
+        """
+        Initialize re-indexer.
+
+        Args:
+            chunk_size: Entries encoded, written and checkpointed together
+        """
+        self.chunk_size = chunk_size
+        self.progress: Dict[str, Any] = {'status': 'idle'}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether a re-index is in progress in this process."""
+        return self._task is not None and not self._task.done()
+
+    def start(self, model_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start a re-index in the background.
+
+        Raises:
+            RuntimeError: If one is already running
+            ValueError: If the embedding backend can't load the model
+        """
+        if self.running:
+            raise RuntimeError("A re-index is already running")
+        self._check_model(model_name)
+        self.progress = {'status': 'starting', 'model': model_name or settings.EMBEDDING_MODEL}
+        self._task = asyncio.create_task(self.run(model_name))
+        self._task.add_done_callback(self._finished)
+        return self.progress
+
+    @staticmethod
+    def _check_model(model_name: Optional[str]):
+        """Reject a model the embedding backend would not actually load."""
+        if settings.USE_LOCAL_EMBEDDINGS and settings.EMBEDDING_BACKEND == "onnx":
+            check_onnx_model(model_name)
+
+    def _finished(self, task: asyncio.Task):
+        """Record the outcome of a background run."""
+        if task.cancelled():
+            self.progress['status'] = 'cancelled'
+        elif task.exception() is not None:
+            self.progress.update(status='failed', error=str(task.exception()))
+
+    async def stop(self):
+        """Cancel a background run; it resumes from its checkpoint next time."""
+        if self.running:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def get_status(self) -> Dict[str, Any]:
+        """Progress of the current run, plus any checkpoint left to resume."""
+        status = dict(self.progress)
+        if not self.running:
+            status['resumable'] = await db.get_vector_collection("building")
+        return status
+
+    async def run(
+        self,
+        model_name: Optional[str] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Re-embed all entries with a model and swap the result in.
+
+        Args:
+            model_name: Model to re-index with (default EMBEDDING_MODEL)
+            on_progress: Called with the progress dict after every chunk
+
+        Returns:
+            Final progress
+
+        Raises:
+            ValueError: If the embedding backend can't load the model
+        """
+        model_name = model_name or settings.EMBEDDING_MODEL
+        self._check_model(model_name)
+        await semantic_search.initialize()
+        await ai_processor.load_embedding_model()
+
+        # Resume a checkpointed run for the same model, or start a new shadow
+        building = await db.get_vector_collection("building")
+        if building and building['embedding_model'] != model_name:
+            await asyncio.to_thread(self._drop_collection, building['name'])
+            building = None
+        if not building:
+            building = await db.start_vector_collection(
+                f"{settings.CHROMA_COLLECTION_NAME}_{uuid.uuid4().hex[:12]}",
+                model_name
+            )
+        name = building['name']
+        shadow = await asyncio.to_thread(
+            semantic_search.store.get_or_create_collection,
+            name,
+            {"description": "Coherence entry embeddings", "embedding_model": model_name}
+        )
+
+        if not settings.USE_LOCAL_EMBEDDINGS:
+            backend = ai_processor.fallback_embedding
+        elif model_name == ai_processor.embedding_model_name and ai_processor.embedding_model:
+            backend = ai_processor.embedding_model
+        else:
+            backend = await ai_processor.create_embedding_backend(model_name)
+        cache = EmbeddingCache(
+            embedding_cache_key(model_name),
+            capacity=self.chunk_size,
+            path=settings.EMBEDDING_CACHE_PATH or None
+        )
+
+        total = await db.count_entries()
+        last_rowid, indexed = building['last_rowid'], building['indexed']
+        self.progress = {
+            'status': 'running',
+            'phase': 'streaming',
+            'collection': name,
+            'model': model_name,
+            'indexed': indexed,
+            'total': total,
+            'rate_per_s': None,
+            'eta_s': None,
+        }
+        started = time.perf_counter()
+        resumed_at = indexed
+
+        try:
+            while True:
+                entries = await db.get_entries_after_rowid(last_rowid, self.chunk_size)
+                if not entries:
+                    break
+                await self._write(shadow, backend, cache, entries)
+                last_rowid = entries[-1]['rowid']
+                indexed += len(entries)
+                await db.checkpoint_vector_collection(name, last_rowid, indexed)
+
+                rate = (indexed - resumed_at) / (time.perf_counter() - started)
+                total = max(total, indexed)
+                self.progress.update(
+                    indexed=indexed,
+                    total=total,
+                    rate_per_s=round(rate, 1),
+                    eta_s=round((total - indexed) / rate, 1) if rate else None
+                )
+                if on_progress:
+                    on_progress(self.progress)
+
+            # Re-embed entries edited since the run started
+            self.progress['phase'] = 'catching_up'
+            caught_up_at = datetime.utcnow() - _CATCH_UP_OVERLAP
+            await self._catch_up(shadow, backend, cache, building['started_at'])
+
+            # Writes to the active collection wait from here: catch up with
+            # the few entries changed meanwhile, drop deleted ones and swap.
+            # The registry flips in one transaction, then this process serves
+            # from the shadow with the model that built it; waiting writes
+            # re-embed with it.
+            async with semantic_search.swap_lock:
+                await self._catch_up(shadow, backend, cache, caught_up_at.isoformat())
+                await self._remove_deleted(shadow)
+
+                self.progress['phase'] = 'swapping'
+                previous = semantic_search.collection_name
+                await db.activate_vector_collection(name)
+                semantic_search.use_collection(name)
+                if settings.USE_LOCAL_EMBEDDINGS:
+                    ai_processor.use_embedding_model(model_name, backend)
+            if previous != name:
+                await asyncio.to_thread(self._drop_collection, previous)
+        finally:
+            await cache.close()
+
+        self.progress.update(status='completed', phase='done', eta_s=0)
+        if on_progress:
+            on_progress(self.progress)
+        return self.progress
+
+    async def _catch_up(self, shadow, backend, cache: EmbeddingCache, updated_since: str):
+        """Re-embed entries added or edited after updated_since into the shadow."""
+        after_rowid = 0
+        while True:
+            entries = await db.get_entries_after_rowid(after_rowid, self.chunk_size, updated_since=updated_since)
+            if not entries:
+                break
+            await self._write(shadow, backend, cache, entries)
+            after_rowid = entries[-1]['rowid']
+
+    async def _write(self, shadow, backend, cache: EmbeddingCache, entries: List[Dict[str, Any]]):
+        """Encode entries (reusing cached vectors) and upsert them into the shadow."""
+        contents = [entry['content'] for entry in entries]
+        embeddings = await cache.get_many(contents)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            missing_texts = [contents[i] for i in missing]
+            encoded = await inference.run(
+                "reindex",
+                backend.encode,
+                missing_texts,
+                batch_size=settings.EMBEDDING_BATCH_SIZE
+            )
+            encoded = encoded.tolist()
+            await cache.put_many(missing_texts, encoded)
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+
+        def write():
+            shadow.upsert(
+                [entry['id'] for entry in entries],
+                embeddings,
+                contents,
+                [{'type': entry['type']} for entry in entries]
+            )
+            # Persist before the checkpoint moves past these entries
+            semantic_search.store.persist()
+
+        await asyncio.to_thread(write)
+
+    async def _remove_deleted(self, shadow):
+        """Delete vectors of entries removed from SQLite during the run."""
+        ids = await asyncio.to_thread(shadow.ids)
+        existing = {entry['id'] for entry in await db.get_entries_many(ids)}
+        stale = [entry_id for entry_id in ids if entry_id not in existing]
+        if stale:
+            def delete():
+                shadow.delete(stale)
+                semantic_search.store.persist()
+            await asyncio.to_thread(delete)
+
+    def _drop_collection(self, name: str):
+        """Delete a collection if it exists."""
+        try:
+            semantic_search.store.delete_collection(name)
+            semantic_search.store.persist()
+        except ValueError:
+            pass  # Already gone
+
+
+# Global re-indexer instance
+reindexer = Reindexer(chunk_size=settings.REINDEX_CHUNK_SIZE)
+
+
+async def _main(model_name: Optional[str]):
+    """Run a re-index from the command line."""
+    def report(progress: Dict[str, Any]):
+        eta = f"{progress['eta_s']:.0f}s" if progress.get('eta_s') is not None else "?"
+        print(
+            f"  {progress['indexed']}/{progress['total']} entries, "
+            f"{progress.get('rate_per_s') or 0:.1f}/s, ETA {eta}"
+        )
+
+    await db.initialize()
+    try:
+        await semantic_search.resolve_active_collection()
+        print(f"🔁 Re-indexing with {model_name or settings.EMBEDDING_MODEL}...")
+        progress = await reindexer.run(model_name, on_progress=report)
+        print(f"✅ {progress['collection']} is now the active collection")
+    finally:
+        await db.close()
+        await ai_processor.embedding_cache.close()
+        inference.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-embed all entries into a new vector collection.")
+    parser.add_argument("--model", help="Embedding model (default EMBEDDING_MODEL)")
+    parser.add_argument("--chunk-size", type=int, default=settings.REINDEX_CHUNK_SIZE)
+    args = parser.parse_args()
+    reindexer.chunk_size = args.chunk_size
+    asyncio.run(_main(args.model))
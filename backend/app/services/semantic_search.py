@@ -1,11 +1,44 @@
 """
-Semantic Search Service using ChromaDB for vector similarity search.
+Semantic Search Service - vector similarity search over entry embeddings.
+
+Embeddings live in the vector store selected by VECTOR_STORE (see
+vector_stores.py). Store calls run in a worker thread so exact scans over
+large collections don't block the event loop.
 """
 from typing import List, Dict, Any, Optional
-import chromadb
-from chromadb.config import Settings as ChromaSettings
+import asyncio
 from app.core.config import settings
+from app.db.database import db
 from app.services.ai_processor import ai_processor
+from app.services.vector_stores import create_vector_store
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, List[str]],
+    weights: Optional[Dict[str, float]] = None,
+    k: int = 60
+) -> List[tuple]:
+    """
+    Fuse several ranked ID lists with weighted reciprocal rank fusion.
+
+    Each ID scores sum(weight / (k + rank)) over the rankings it appears in,
+    with ranks starting at 1.
+
+    Args:
+        rankings: Ranked ID lists keyed by source name
+        weights: Optional weight per source (default 1.0)
+        k: Rank smoothing constant; larger values flatten the head of each list
+
+    Returns:
+        List of (id, fused score) pairs, best first
+    """
+    weights = weights or {}
+    fused: Dict[str, float] = {}
+    for source, ids in rankings.items():
+        weight = weights.get(source, 1.0)
+        for rank, item_id in enumerate(ids, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
 
 
 class SemanticSearchService:
@@ -13,28 +46,104 @@ class SemanticSearchService:
 
     def __init__(self):
         """Initialize semantic search service."""
-        self.client = None
+        self.store = None
         self.collection = None
+        self.collection_name = settings.CHROMA_COLLECTION_NAME
         self._initialized = False
+        self._init_lock = asyncio.Lock()
+        # Serializes collection writes with a re-index swap (see swap_lock)
+        self.swap_lock = asyncio.Lock()
+
+    async def resolve_active_collection(self):
+        """
+        Serve from the collection registered as active, with its embedding model.
+
+        After a re-index the active collection is a swapped-in shadow, and
+        queries must be embedded with the model it was built with, which can
+        differ from EMBEDDING_MODEL until a re-index to that model finishes.
+        Call before the embedding model is loaded.
+        """
+        active = await db.get_vector_collection("active")
+        if not active:
+            return
+        self.collection_name = active['name']
+        if active['embedding_model'] != ai_processor.embedding_model_name:
+            print(
+                f"⚠️  Collection {active['name']} was built with {active['embedding_model']}; "
+                f"serving with it until a re-index to {settings.EMBEDDING_MODEL} completes"
+            )
+            ai_processor.set_embedding_model_name(active['embedding_model'])
 
     async def initialize(self):
-        """Initialize ChromaDB client and collection."""
+        """Open the vector store and the active collection."""
         if self._initialized:
             return
 
-        # Initialize ChromaDB
-        self.client = chromadb.Client(ChromaSettings(
-            chroma_db_impl="duckdb+parquet",
-            persist_directory=settings.CHROMA_PERSIST_DIR
-        ))
-
-        # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name=settings.CHROMA_COLLECTION_NAME,
+        async with self._init_lock:
+            if self._initialized:
+                return
+            # Opening the persisted collection reads from disk; keep it off the event loop
+            await asyncio.to_thread(self._open_collection)
+            self._initialized = True
+
+    def _open_collection(self):
+        """Open the vector store and get or create the collection."""
+        self.store = create_vector_store(settings.VECTOR_STORE)
+        self.collection = self.store.get_or_create_collection(
+            self.collection_name,
             metadata={"description": "Coherence entry embeddings"}
         )
 
-        self._initialized = True
+    def use_collection(self, name: str):
+        """Serve from another (fully built) collection of the same store."""
+        self.collection = self.store.get_collection(name)
+        self.collection_name = name
+
+    async def _write(self, method: str, *args, embedded_for: Optional[str] = None) -> bool:
+        """
+        Run a collection write in a worker thread and persist it.
+
+        Args:
+            method: Collection method to call
+            embedded_for: Collection the embeddings in args were made for; if a
+                re-index swapped in another collection since, nothing is written
+
+        Returns:
+            Whether the write was made
+        """
+        def write():
+            getattr(self.collection, method)(*args)
+            self.store.persist()
+
+        async with self.swap_lock:
+            if embedded_for is not None and embedded_for != self.collection_name:
+                return False
+            await asyncio.to_thread(write)
+            return True
+
+    async def _embed_and_write(
+        self,
+        method: str,
+        entry_ids: List[str],
+        contents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]]
+    ):
+        """
+        Embed contents and write them to the collection.
+
+        A single text goes through generate_embedding so concurrent writes
+        share micro-batches. Embeddings are computed outside the swap lock; if
+        a re-index swaps collections (and models) meanwhile, they are computed
+        again with the new model and written to the new collection.
+        """
+        while True:
+            collection_name = self.collection_name
+            if len(contents) == 1:
+                embeddings = [await ai_processor.generate_embedding(contents[0])]
+            else:
+                embeddings = await ai_processor.generate_embeddings(contents)
+            if await self._write(method, entry_ids, embeddings, contents, metadatas, embedded_for=collection_name):
+                return
 
     async def add_entry(self, entry_id: str, content: str, metadata: Optional[Dict[str, Any]] = None):
         """
@@ -46,45 +155,41 @@ class SemanticSearchService:
             metadata: Additional metadata
         """
         await self.initialize()
+        await self._embed_and_write("upsert", [entry_id], [content], [metadata or {}])
 
-        # Generate embedding
-        embedding = await ai_processor.generate_embedding(content)
+    async def add_entries(
+        self,
+        entry_ids: List[str],
+        contents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ):
+        """
+        Add many entries to the vector database with one batched embed and write.
 
-        # Add to collection
-        self.collection.add(
-            ids=[entry_id],
-            embeddings=[embedding],
-            documents=[content],
-            metadatas=[metadata or {}]
-        )
+        Args:
+            entry_ids: Unique entry identifiers
+            contents: Text contents to embed, aligned with entry_ids
+            metadatas: Optional metadata per entry
+        """
+        await self.initialize()
 
-        # Persist changes
-        self.client.persist()
+        if not entry_ids:
+            return
+
+        # Upsert so a retried enrichment job doesn't fail on IDs it already wrote
+        await self._embed_and_write("upsert", entry_ids, contents, metadatas)
 
     async def update_entry(self, entry_id: str, content: str, metadata: Optional[Dict[str, Any]] = None):
         """Update entry in vector database."""
         await self.initialize()
-
-        # Generate new embedding
-        embedding = await ai_processor.generate_embedding(content)
-
-        # Update in collection
-        self.collection.update(
-            ids=[entry_id],
-            embeddings=[embedding],
-            documents=[content],
-            metadatas=[metadata or {}]
-        )
-
-        self.client.persist()
+        await self._embed_and_write("update", [entry_id], [content], [metadata or {}])
 
     async def delete_entry(self, entry_id: str):
         """Delete entry from vector database."""
         await self.initialize()
 
         try:
-            self.collection.delete(ids=[entry_id])
-            self.client.persist()
+            await self._write("delete", [entry_id])
         except Exception:
             # Entry might not exist, ignore
             pass
@@ -111,25 +216,149 @@ class SemanticSearchService:
         # Generate query embedding
         query_embedding = await ai_processor.generate_embedding(query)
 
+        return (await self._query_many([query_embedding], limit, filters))[0]
+
+    async def search_many(
+        self,
+        queries: List[str],
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Perform semantic search for several queries with one batched embed
+        and one multi-query vector store call.
+
+        Args:
+            queries: Search queries
+            limit: Maximum number of results per query
+            filters: Optional metadata filters, applied to every query
+
+        Returns:
+            One list of search results with scores per query, in query order
+        """
+        await self.initialize()
+
+        if not queries:
+            return []
+
+        # Generate query embeddings
+        query_embeddings = await ai_processor.generate_embeddings(queries)
+
+        return await self._query_many(query_embeddings, limit, filters)
+
+    async def _query_many(
+        self,
+        query_embeddings: List[List[float]],
+        limit: int,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[List[Dict[str, Any]]]:
+        """Query the collection with embeddings and convert distances to scores."""
         # Search in collection
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=limit,
-            where=filters
-        )
+        all_matches = await asyncio.to_thread(self.collection.query_many, query_embeddings, limit, filters)
 
         # Format results
-        search_results = []
-        if results['ids'] and results['ids'][0]:
-            for i, entry_id in enumerate(results['ids'][0]):
-                search_results.append({
-                    'entry_id': entry_id,
-                    'score': 1 - results['distances'][0][i],  # Convert distance to similarity
-                    'content': results['documents'][0][i] if results['documents'] else None,
-                    'metadata': results['metadatas'][0][i] if results['metadatas'] else {}
-                })
-
-        return search_results
+        return [
+            [
+                {
+                    'entry_id': match['entry_id'],
+                    'score': 1 - match['distance'],  # Convert distance to similarity
+                    'content': match['content'],
+                    'metadata': match['metadata']
+                }
+                for match in matches
+            ]
+            for matches in all_matches
+        ]
+
+    async def hybrid_search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Search with lexical and vector retrieval fused by reciprocal rank fusion.
+
+        The FTS5 keyword ranker catches exact identifiers (ticket numbers,
+        names, emails) that dense retrieval misses; the vector ranker catches
+        matches by meaning. Both run concurrently over HYBRID_CANDIDATES
+        candidates and are fused with the HYBRID_* weights.
+
+        Args:
+            query: Search query
+            limit: Maximum number of results
+
+        Returns:
+            List of search results with fused score, per-source scores
+            (source_scores) and keyword highlights
+        """
+        await self.initialize()
+
+        candidates = max(limit, settings.HYBRID_CANDIDATES)
+        lexical, vector = await asyncio.gather(
+            db.keyword_search(query, limit=candidates, match_all=False),
+            self.search(query, limit=candidates)
+        )
+        return self._fuse(lexical, vector, limit)
+
+    async def hybrid_search_many(self, queries: List[str], limit: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Hybrid search for several queries: the vector side runs as one batch
+        (see search_many), concurrently with a keyword search per query.
+
+        Args:
+            queries: Search queries
+            limit: Maximum number of results per query
+
+        Returns:
+            One list of hybrid search results per query, in query order
+        """
+        await self.initialize()
+
+        candidates = max(limit, settings.HYBRID_CANDIDATES)
+        vector_results, *lexical_results = await asyncio.gather(
+            self.search_many(queries, limit=candidates),
+            *(db.keyword_search(query, limit=candidates, match_all=False) for query in queries)
+        )
+        return [
+            self._fuse(lexical, vector, limit)
+            for lexical, vector in zip(lexical_results, vector_results)
+        ]
+
+    def _fuse(
+        self,
+        lexical: List[Dict[str, Any]],
+        vector: List[Dict[str, Any]],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Fuse one query's keyword and vector results into hybrid results."""
+        fused = reciprocal_rank_fusion(
+            {
+                'lexical': [r['entry_id'] for r in lexical],
+                'vector': [r['entry_id'] for r in vector],
+            },
+            weights={
+                'lexical': settings.HYBRID_LEXICAL_WEIGHT,
+                'vector': settings.HYBRID_VECTOR_WEIGHT,
+            },
+            k=settings.HYBRID_RRF_K
+        )[:limit]
+
+        lexical_by_id = {r['entry_id']: r for r in lexical}
+        vector_by_id = {r['entry_id']: r for r in vector}
+
+        results = []
+        for entry_id, score in fused:
+            source_scores = {}
+            if entry_id in lexical_by_id:
+                source_scores['lexical'] = lexical_by_id[entry_id]['score']
+            if entry_id in vector_by_id:
+                source_scores['vector'] = vector_by_id[entry_id]['score']
+
+            results.append({
+                'entry_id': entry_id,
+                'score': score,
+                'source_scores': source_scores,
+                'highlights': lexical_by_id.get(entry_id, {}).get('highlights', []),
+                'metadata': vector_by_id.get(entry_id, {}).get('metadata', {})
+            })
+
+        return results
 
     async def find_similar(
         self,
@@ -154,33 +383,27 @@ class SemanticSearchService:
 
         # Get entry embedding
         try:
-            entry = self.collection.get(ids=[entry_id], include=['embeddings'])
-            if not entry['embeddings']:
+            embeddings = await asyncio.to_thread(self.collection.get_embeddings, [entry_id])
+            if entry_id not in embeddings:
                 return []
 
-            embedding = entry['embeddings'][0]
-
-            # Search for similar entries
-            results = self.collection.query(
-                query_embeddings=[embedding],
-                n_results=limit + 1  # +1 to exclude the entry itself
-            )
+            # Search for similar entries (+1 to exclude the entry itself)
+            matches = await asyncio.to_thread(self.collection.query, embeddings[entry_id], limit + 1)
 
             # Format and filter results
             similar_entries = []
-            if results['ids'] and results['ids'][0]:
-                for i, result_id in enumerate(results['ids'][0]):
-                    if result_id == entry_id:
-                        continue  # Skip the entry itself
-
-                    similarity = 1 - results['distances'][0][i]
-                    if similarity >= threshold:
-                        similar_entries.append({
-                            'entry_id': result_id,
-                            'score': similarity,
-                            'content': results['documents'][0][i] if results['documents'] else None,
-                            'metadata': results['metadatas'][0][i] if results['metadatas'] else {}
-                        })
+            for match in matches:
+                if match['entry_id'] == entry_id:
+                    continue  # Skip the entry itself
+
+                similarity = 1 - match['distance']
+                if similarity >= threshold:
+                    similar_entries.append({
+                        'entry_id': match['entry_id'],
+                        'score': similarity,
+                        'content': match['content'],
+                        'metadata': match['metadata']
+                    })
 
             return similar_entries[:limit]
 
@@ -192,20 +415,14 @@ class SemanticSearchService:
         await self.initialize()
 
         try:
-            results = self.collection.get(include=['embeddings'])
-            embeddings = {}
-            if results['ids']:
-                for i, entry_id in enumerate(results['ids']):
-                    if results['embeddings'] and i < len(results['embeddings']):
-                        embeddings[entry_id] = results['embeddings'][i]
-            return embeddings
+            return await asyncio.to_thread(self.collection.get_embeddings)
         except Exception:
             return {}
 
     async def count(self) -> int:
         """Get total number of entries in collection."""
         await self.initialize()
-        return self.collection.count()
+        return await asyncio.to_thread(self.collection.count)
 
 
 # Global semantic search instance
@@ -0,0 +1,984 @@
+"""
+Vector Stores - interchangeable storage and search of entry embeddings.
+
+VECTOR_STORE selects one:
+- "chroma": ChromaDB with the local duckdb+parquet store
+- "flat": a built-in index of memory-mapped NumPy files with no separate
+  persist step, searched exactly with one matrix-vector product or, per
+  VECTOR_INDEX, approximately through an inverted-file index or a binary
+  code scan re-ranked with the float vectors. Rows can be stored as float16
+  and projected to fewer dimensions (VECTOR_PRECISION, VECTOR_PCA_DIMENSION)
+
+Both report squared L2 distances between normalized vectors (2 - 2 * cosine),
+so scores and SIMILARITY_THRESHOLD mean the same with either store. After
+switching stores, POST /admin/reindex fills the new one.
+"""
+from typing import Any, Dict, List, Optional
+from abc import ABC, abstractmethod
+from pathlib import Path
+import json
+import os
+import shutil
+import threading
+import numpy as np
+from app.core.config import settings
+from app.services.ivf_index import IvfIndex, assign_cells, train_centroids
+from app.services.quantization import fit_projection, hamming_distances, pack_signs
+
+
+class VectorCollection(ABC):
+    """Interface shared by the collections of every vector store."""
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ):
+        """Insert or replace embeddings by ID."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ):
+        """Replace embeddings of existing IDs; unknown IDs are ignored."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        """Delete embeddings by ID; unknown IDs are ignored."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def query(
+        self,
+        embedding: List[float],
+        limit: int,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the nearest embeddings.
+
+        Args:
+            embedding: Query embedding
+            limit: Maximum number of results
+            where: Optional metadata filters
+
+        Returns:
+            Dicts with entry_id, distance, content and metadata, nearest first
+
+        Raises:
+            ValueError: If where is given and the store has no metadata filters (flat)
+        """
+        raise NotImplementedError
+
+    def query_many(
+        self,
+        embeddings: List[List[float]],
+        limit: int,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Find the nearest embeddings for several queries at once.
+
+        Args:
+            embeddings: Query embeddings
+            limit: Maximum number of results per query
+            where: Optional metadata filters, applied to every query
+
+        Returns:
+            One list of matches (as returned by query) per query embedding
+        """
+        return [self.query(embedding, limit, where) for embedding in embeddings]
+
+    @abstractmethod
+    def get_embeddings(self, ids: Optional[List[str]] = None) -> Dict[str, List[float]]:
+        """Embeddings by ID (all of them if ids is None)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def ids(self) -> List[str]:
+        """All IDs in the collection."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of embeddings in the collection."""
+        raise NotImplementedError
+
+
+class VectorStore(ABC):
+    """Interface shared by the vector stores: a set of named collections."""
+
+    name = "base"
+
+    @abstractmethod
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> VectorCollection:
+        """Open a collection, creating it if needed."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_collection(self, name: str) -> VectorCollection:
+        """
+        Open an existing collection.
+
+        Raises:
+            ValueError: If it doesn't exist
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_collection(self, name: str):
+        """
+        Delete a collection.
+
+        Raises:
+            ValueError: If it doesn't exist
+        """
+        raise NotImplementedError
+
+    def persist(self):
+        """Flush writes to disk."""
+
+
+class ChromaCollection(VectorCollection):
+    """Adapter for a ChromaDB collection."""
+
+    def __init__(self, collection):
+        """Wrap a chromadb collection."""
+        self.collection = collection
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        """Upsert into the collection."""
+        self.collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadatas or [{} for _ in ids]
+        )
+
+    def update(self, ids, embeddings, documents=None, metadatas=None):
+        """Update the collection."""
+        self.collection.update(
+            ids=ids,
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadatas or [{} for _ in ids]
+        )
+
+    def delete(self, ids):
+        """Delete from the collection."""
+        self.collection.delete(ids=ids)
+
+    def query(self, embedding, limit, where=None):
+        """Query the collection."""
+        return self.query_many([embedding], limit, where)[0]
+
+    def query_many(self, embeddings, limit, where=None):
+        """Query the collection with all embeddings in one call."""
+        results = self.collection.query(
+            query_embeddings=embeddings,
+            n_results=limit,
+            where=where
+        )
+        all_matches = []
+        for q in range(len(embeddings)):
+            matches = []
+            ids = results['ids'][q] if results['ids'] else []
+            for i, entry_id in enumerate(ids):
+                matches.append({
+                    'entry_id': entry_id,
+                    'distance': results['distances'][q][i],
+                    'content': results['documents'][q][i] if results.get('documents') else None,
+                    'metadata': results['metadatas'][q][i] if results.get('metadatas') else {}
+                })
+            all_matches.append(matches)
+        return all_matches
+
+    def get_embeddings(self, ids=None):
+        """Get embeddings from the collection."""
+        results = self.collection.get(ids=ids, include=['embeddings'])
+        embeddings = {}
+        for i, entry_id in enumerate(results['ids'] or []):
+            if results['embeddings'] is not None and i < len(results['embeddings']):
+                embeddings[entry_id] = list(results['embeddings'][i])
+        return embeddings
+
+    def ids(self):
+        """Get all IDs from the collection."""
+        return self.collection.get(include=[])['ids']
+
+    def count(self):
+        """Count the collection."""
+        return self.collection.count()
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaDB with the local duckdb+parquet store."""
+
+    name = "chroma"
+
+    def __init__(self, persist_directory: str):
+        """Create the ChromaDB client."""
+        import chromadb
+        from chromadb.config import Settings as ChromaSettings
+
+        self.client = chromadb.Client(ChromaSettings(
+            chroma_db_impl="duckdb+parquet",
+            persist_directory=persist_directory
+        ))
+
+    def get_or_create_collection(self, name, metadata=None):
+        """Get or create a chromadb collection."""
+        return ChromaCollection(self.client.get_or_create_collection(name=name, metadata=metadata))
+
+    def get_collection(self, name):
+        """Get a chromadb collection."""
+        return ChromaCollection(self.client.get_collection(name=name))
+
+    def delete_collection(self, name):
+        """Delete a chromadb collection."""
+        self.client.delete_collection(name=name)
+
+    def persist(self):
+        """Write the duckdb+parquet files."""
+        self.client.persist()
+
+
+# Bytes per ID in the flat index's ID file (entry IDs are 36-character UUIDs)
+ID_WIDTH = 64
+# Dead rows tolerated before compaction, whatever the ratio
+COMPACT_MIN_ROWS = 1000
+# Rows sampled to fit a PCA projection
+PCA_SAMPLE_ROWS = 65536
+# Scores computed at once by a batch of exact queries (64 MiB of float32)
+_SCORE_MATRIX_ELEMENTS = 1 << 24
+# Storage precision to vector file suffix
+_VECTOR_SUFFIXES = {'float32': 'f32', 'float16': 'f16'}
+
+
+class FlatCollection(VectorCollection):
+    """
+    Nearest-neighbour search over memory-mapped vectors.
+
+    A collection is a directory of append-only files for one generation:
+    vectors-<g>.f32 (L2-normalized rows), ids-<g>.bin (fixed-width IDs, row
+    for row) and deleted-<g>.bits (tombstone bitmap), plus meta.json naming
+    the current generation. Opening maps the files without reading them.
+    Upserts append a row and tombstone the previous one; once tombstones
+    pass compact_ratio of the rows, live rows are rewritten into the next
+    generation and meta.json is swapped to it atomically.
+
+    With index="ivf" queries scan only the nearest cells of an IVF index
+    once the collection has ivf_min_rows rows (exact search is fast enough
+    below that). Centroids live in centroids-<v>.npy and each generation's
+    cell assignments in assign-<g>-<v>.i32; new rows are assigned as they are
+    appended, and the centroids are retrained in a background thread when
+    the collection doubles or inserted vectors drift from them.
+
+    With index="binary" each row also gets a sign-bit code in codes-<g>.u8
+    (1 bit per dimension, 1/32 of the float row). Queries scan the codes by
+    Hamming distance for the binary_candidates nearest rows and re-rank
+    only those with the float vectors.
+
+    Storage precision and PCA dimension are fixed when a collection is
+    created (re-index to change them). With precision="float16" rows are
+    stored in vectors-<g>.f16 at half the size and widened to float32 a
+    block at a time while scoring; NumPy has no fast float16 kernels, so
+    exact scans get slower and the saving pays off with an approximate
+    index, which only widens its candidates. With pca_dimension set, the
+    first pca_min_rows rows are stored as given; at that point a background
+    thread fits a projection to pca_dimension on them (pca.npy) and rewrites
+    every row projected into the next generation. Later rows and queries
+    are projected the same way, and get_embeddings maps rows back to the
+    embedding model's dimension.
+
+    Documents and metadata are not stored: queries return the ID and distance.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        metadata: Optional[Dict[str, Any]] = None,
+        compact_ratio: float = 0.2,
+        index: str = "exact",
+        nlist: int = 0,
+        nprobe: int = 8,
+        ivf_min_rows: int = 10000,
+        drift_tolerance: float = 0.25,
+        binary_candidates: int = 200,
+        precision: str = "float32",
+        pca_dimension: int = 0,
+        pca_min_rows: int = 5000
+    ):
+        """
+        Open or create a collection.
+
+        Args:
+            directory: Collection directory
+            metadata: Collection metadata, stored when it is created
+            compact_ratio: Fraction of tombstoned rows that triggers compaction
+            index: "exact", "ivf" or "binary"
+            nlist: IVF cells (0 picks sqrt(rows) at each training)
+            nprobe: IVF cells scanned per query
+            ivf_min_rows: Rows before the IVF index is first trained
+            drift_tolerance: See IvfIndex
+            binary_candidates: Rows re-ranked after the binary code scan
+            precision: "float32" or "float16", for a new collection
+            pca_dimension: Dimensions kept by PCA for a new collection (0 keeps all)
+            pca_min_rows: Rows the PCA projection is fitted on
+        """
+        if precision not in _VECTOR_SUFFIXES:
+            raise ValueError(f"Unknown vector precision: {precision}")
+        self.directory = directory
+        self.compact_ratio = compact_ratio
+        self.index = index
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.ivf_min_rows = ivf_min_rows
+        self.drift_tolerance = drift_tolerance
+        self.binary_candidates = binary_candidates
+        self.pca_min_rows = pca_min_rows
+        self.ivf: Optional[IvfIndex] = None
+        self._codes: Optional[np.ndarray] = None
+        self._training = False
+        self._fitting = False
+        self._lock = threading.RLock()
+
+        meta_path = directory / "meta.json"
+        if meta_path.exists():
+            self.meta = json.loads(meta_path.read_text())
+        else:
+            directory.mkdir(parents=True, exist_ok=True)
+            self.meta = {
+                'generation': 0,
+                'dimension': None,
+                'metadata': metadata or {},
+                'precision': precision,
+                'pca_dimension': pca_dimension,
+            }
+            self._write_meta()
+        self._load()
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Collection metadata."""
+        return self.meta['metadata']
+
+    @property
+    def _dtype(self) -> np.dtype:
+        """Storage dtype of the vectors (collections predating precision are float32)."""
+        return np.dtype(self.meta.get('precision', 'float32'))
+
+    def _path(self, kind: str, generation: Optional[int] = None) -> Path:
+        """Path of one of a generation's files."""
+        generation = self.meta['generation'] if generation is None else generation
+        suffix = {
+            'vectors': _VECTOR_SUFFIXES[self._dtype.name],
+            'ids': 'bin',
+            'deleted': 'bits',
+            'codes': 'u8',
+        }[kind]
+        return self.directory / f"{kind}-{generation}.{suffix}"
+
+    def _ivf_path(self, kind: str, version: int, generation: Optional[int] = None) -> Path:
+        """Path of an IVF centroids file or of a generation's assignments."""
+        if kind == 'centroids':
+            return self.directory / f"centroids-{version}.npy"
+        generation = self.meta['generation'] if generation is None else generation
+        return self.directory / f"assign-{generation}-{version}.i32"
+
+    def _write_meta(self):
+        """Replace meta.json atomically."""
+        tmp_path = self.directory / "meta.json.tmp"
+        tmp_path.write_text(json.dumps(self.meta))
+        os.replace(tmp_path, self.directory / "meta.json")
+
+    def _load(self):
+        """Map the current generation's files."""
+        self._rows = 0
+        self._deleted = np.zeros(0, dtype=bool)
+        self._row_of: Optional[Dict[str, int]] = None
+        self._components = np.load(self.directory / "pca.npy") if self.meta.get('pca') else None
+        dimension = self.meta['dimension']
+        if dimension:
+            vectors_path, ids_path = self._path('vectors'), self._path('ids')
+            vector_size = dimension * self._dtype.itemsize
+            vector_rows = vectors_path.stat().st_size // vector_size if vectors_path.exists() else 0
+            id_rows = ids_path.stat().st_size // ID_WIDTH if ids_path.exists() else 0
+            # A crash between the two appends leaves one file a row ahead
+            self._rows = min(vector_rows, id_rows)
+            for path, row_size in ((vectors_path, vector_size), (ids_path, ID_WIDTH)):
+                if path.exists() and path.stat().st_size > self._rows * row_size:
+                    os.truncate(path, self._rows * row_size)
+
+            deleted_path = self._path('deleted')
+            self._deleted = np.zeros(self._rows, dtype=bool)
+            if deleted_path.exists():
+                bits = np.unpackbits(np.fromfile(deleted_path, dtype=np.uint8)).astype(bool)
+                n = min(len(bits), self._rows)
+                self._deleted[:n] = bits[:n]
+        self._map()
+        self._load_codes()
+        self._load_ivf()
+
+    def _code_bytes(self) -> int:
+        """Bytes per binary code."""
+        return ((self.meta['dimension'] or 0) + 7) // 8
+
+    def _load_codes(self):
+        """Map the binary codes, encoding rows that have none yet."""
+        self._codes = None
+        if self.index != "binary":
+            return
+        path, code_bytes = self._path('codes'), self._code_bytes()
+        code_rows = path.stat().st_size // code_bytes if path.exists() and code_bytes else 0
+        if code_rows > self._rows:
+            os.truncate(path, self._rows * code_bytes)
+        elif code_rows < self._rows:
+            # Rows appended before a crash, or while binary codes were off
+            with open(path, 'ab') as f:
+                for start in range(code_rows, self._rows, 65536):
+                    f.write(pack_signs(self._vectors[start:min(start + 65536, self._rows)]).tobytes())
+        self._map_codes()
+
+    def _map_codes(self):
+        """(Re)map the binary codes at their current length."""
+        if self._rows:
+            self._codes = np.memmap(self._path('codes'), dtype=np.uint8, mode='r', shape=(self._rows, self._code_bytes()))
+        else:
+            self._codes = np.zeros((0, self._code_bytes()), dtype=np.uint8)
+
+    def _load_ivf(self):
+        """Load the IVF index of the current generation, assigning rows it lacks."""
+        self.ivf = None
+        if self.index != "ivf":
+            return
+        self.ivf = IvfIndex(nprobe=self.nprobe, drift_tolerance=self.drift_tolerance)
+        state = self.meta.get('ivf')
+        centroids_path = self._ivf_path('centroids', state['version']) if state else None
+        if self._rows and centroids_path and centroids_path.exists():
+            centroids = np.load(centroids_path)
+            assign_path = self._ivf_path('assign', state['version'])
+            cells = np.fromfile(assign_path, dtype=np.int32) if assign_path.exists() else np.zeros(0, dtype=np.int32)
+            if len(cells) > self._rows:
+                cells = cells[:self._rows]
+                os.truncate(assign_path, self._rows * 4)
+            elif len(cells) < self._rows:
+                # Rows appended before a crash, or while the index was off
+                tail, _ = assign_cells(self._vectors[len(cells):], centroids)
+                with open(assign_path, 'ab') as f:
+                    f.write(tail.tobytes())
+                cells = np.concatenate([cells, tail])
+            self.ivf.set_centroids(centroids, cells, state['train_error'], state['trained_rows'])
+        self._maybe_retrain()
+
+    def _map(self):
+        """(Re)map the vector and ID files at their current length."""
+        dimension = self.meta['dimension'] or 0
+        if self._rows:
+            self._vectors = np.memmap(self._path('vectors'), dtype=self._dtype, mode='r', shape=(self._rows, dimension))
+            self._ids = np.memmap(self._path('ids'), dtype=f"S{ID_WIDTH}", mode='r', shape=(self._rows,))
+        else:
+            self._vectors = np.zeros((0, dimension), dtype=self._dtype)
+            self._ids = np.zeros(0, dtype=f"S{ID_WIDTH}")
+
+    def _index(self) -> Dict[str, int]:
+        """ID to live row, built on first use; resolves duplicate rows left by a crash."""
+        if self._row_of is None:
+            row_of: Dict[str, int] = {}
+            duplicates = []
+            for row in np.flatnonzero(~self._deleted):
+                entry_id = self._ids[row].decode()
+                if entry_id in row_of:
+                    duplicates.append(row_of[entry_id])
+                row_of[entry_id] = int(row)
+            if duplicates:
+                self._tombstone(duplicates)
+            self._row_of = row_of
+        return self._row_of
+
+    def _tombstone(self, rows: List[int]):
+        """Mark rows deleted in memory and in the bitmap file."""
+        if not rows:
+            return
+        self._deleted[rows] = True
+        bits = np.packbits(self._deleted)
+        path = self._path('deleted')
+        with open(path, 'r+b' if path.exists() else 'w+b') as f:
+            for byte in sorted({row // 8 for row in rows}):
+                f.seek(byte)
+                f.write(bits[byte:byte + 1].tobytes())
+
+    def _normalized(self, embeddings) -> np.ndarray:
+        """Embeddings as L2-normalized float32 rows."""
+        vectors = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+    def _input_dimension(self) -> Optional[int]:
+        """Dimension of the embeddings given to upsert and query."""
+        pca = self.meta.get('pca')
+        return pca['input_dimension'] if pca else self.meta['dimension']
+
+    def _stored(self, embeddings, components: Optional[np.ndarray] = None) -> np.ndarray:
+        """Embeddings as they are stored: normalized and, once fitted, projected."""
+        vectors = self._normalized(embeddings)
+        components = self._components if components is None else components
+        if components is not None:
+            vectors = self._normalized(vectors @ components.T)
+        return vectors
+
+    def _scores(self, vectors: np.ndarray, queries: np.ndarray, block_rows: int = 8192) -> np.ndarray:
+        """
+        Dot products of every row with each query, shape (queries, rows);
+        float16 rows are widened a block at a time.
+        """
+        if vectors.dtype == np.float32:
+            return queries @ vectors.T
+        scores = np.empty((len(queries), len(vectors)), dtype=np.float32)
+        block = np.empty((min(block_rows, len(vectors)), vectors.shape[1]), dtype=np.float32)
+        for start in range(0, len(vectors), block_rows):
+            rows = vectors[start:start + block_rows]
+            block[:len(rows)] = rows
+            scores[:, start:start + len(rows)] = queries @ block[:len(rows)].T
+        return scores
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        """Append rows for the IDs and tombstone the rows they replace."""
+        if not ids:
+            return
+        encoded = [entry_id.encode() for entry_id in ids]
+        if any(len(entry_id) > ID_WIDTH for entry_id in encoded):
+            raise ValueError(f"IDs longer than {ID_WIDTH} bytes are not supported")
+
+        with self._lock:
+            dimension = len(embeddings[0])
+            if self.meta['dimension'] is None:
+                self.meta['dimension'] = dimension
+                self._write_meta()
+            elif dimension != self._input_dimension():
+                raise ValueError(
+                    f"Embedding dimension {dimension} does not match "
+                    f"the collection's {self._input_dimension()}"
+                )
+            vectors = self._stored(embeddings)
+            row_of = self._index()
+
+            # Vectors first: on open, rows without an ID are dropped
+            with open(self._path('vectors'), 'ab') as f:
+                f.write(vectors.astype(self._dtype).tobytes())
+            with open(self._path('ids'), 'ab') as f:
+                f.write(np.array(encoded, dtype=f"S{ID_WIDTH}").tobytes())
+
+            first = self._rows
+            self._rows += len(ids)
+            self._deleted = np.concatenate([self._deleted, np.zeros(len(ids), dtype=bool)])
+            replaced = []
+            for offset, entry_id in enumerate(ids):
+                if entry_id in row_of:
+                    replaced.append(row_of[entry_id])
+                row_of[entry_id] = first + offset
+            # Repeated IDs within the batch: the last one wins
+            replaced += [row for row in range(first, self._rows) if row_of[ids[row - first]] != row]
+            self._tombstone(replaced)
+            self._map()
+            if self._codes is not None:
+                with open(self._path('codes'), 'ab') as f:
+                    f.write(pack_signs(vectors).tobytes())
+                self._map_codes()
+            if self.ivf is not None and self.ivf.trained:
+                cells, errors = assign_cells(vectors, self.ivf.centroids)
+                with open(self._ivf_path('assign', self.meta['ivf']['version']), 'ab') as f:
+                    f.write(cells.tobytes())
+                self.ivf.add(first, cells, errors)
+            self._maybe_compact()
+            self._maybe_fit_pca()
+            self._maybe_retrain()
+
+    def update(self, ids, embeddings, documents=None, metadatas=None):
+        """Upsert the IDs that are already in the collection."""
+        with self._lock:
+            row_of = self._index()
+            known = [i for i, entry_id in enumerate(ids) if entry_id in row_of]
+            if known:
+                self.upsert([ids[i] for i in known], [embeddings[i] for i in known])
+
+    def delete(self, ids):
+        """Tombstone the rows of the IDs."""
+        with self._lock:
+            row_of = self._index()
+            self._tombstone([row_of.pop(entry_id) for entry_id in ids if entry_id in row_of])
+            self._maybe_compact()
+
+    def query(self, embedding, limit, where=None):
+        """Query with one embedding (see query_many)."""
+        return self.query_many([embedding], limit, where)[0]
+
+    def query_many(self, embeddings, limit, where=None):
+        """
+        Score each query's candidate rows (the nearest IVF cells, or the
+        nearest binary codes), or every live row, and take the top k.
+
+        Queries scored against every row share one matrix product per pass
+        over the vectors, so a batch costs about as much memory bandwidth
+        as a single query.
+        """
+        if where:
+            raise ValueError("The flat vector store does not support metadata filters")
+        if not len(embeddings):
+            return []
+        with self._lock:
+            queries = self._stored(embeddings)
+            vectors, ids, deleted, codes = self._vectors, self._ids, self._deleted, self._codes
+            live = int(len(deleted) - deleted.sum())
+            ivf = self.ivf if self.ivf is not None and self.ivf.trained else None
+            candidates = [ivf.candidates(query) if ivf else None for query in queries]
+        k = min(limit, live)
+        if k <= 0:
+            return [[] for _ in queries]
+
+        top: List[Any] = [None] * len(queries)
+        exact = []
+        for i, query in enumerate(queries):
+            rows = candidates[i]
+            if codes is not None and live > self.binary_candidates:
+                distances = hamming_distances(codes, pack_signs(query)[0])
+                distances[deleted[:len(distances)]] = np.iinfo(distances.dtype).max
+                pool = max(self.binary_candidates, k)
+                rows = np.argpartition(distances, pool - 1)[:pool]
+                rows.sort()
+            if rows is not None:
+                rows = rows[~deleted[rows]]
+            if rows is not None and len(rows) >= k:
+                scores = np.asarray(vectors[rows], dtype=np.float32) @ query
+                best = self._top_k(scores, k)
+                top[i] = (rows[best], scores[best])
+            else:
+                exact.append(i)
+
+        # Bound the (queries x rows) score matrix
+        group = max(1, _SCORE_MATRIX_ELEMENTS // max(len(vectors), 1))
+        for start in range(0, len(exact), group):
+            batch = exact[start:start + group]
+            scores = self._scores(vectors, queries[batch])
+            scores[:, deleted[:scores.shape[1]]] = -np.inf
+            for i, query_scores in zip(batch, scores):
+                best = self._top_k(query_scores, k)
+                top[i] = (best, query_scores[best])
+
+        return [
+            [
+                {
+                    'entry_id': ids[row].decode(),
+                    'distance': float(2 - 2 * score),
+                    'content': None,
+                    'metadata': {}
+                }
+                for row, score in zip(rows, scores)
+            ]
+            for rows, scores in top
+        ]
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indexes of the k highest scores, highest first."""
+        best = np.argpartition(-scores, k - 1)[:k]
+        return best[np.argsort(-scores[best])]
+
+    def get_embeddings(self, ids=None):
+        """Embeddings of the IDs' live rows, mapped back through the PCA projection if any."""
+        with self._lock:
+            row_of = self._index()
+            if ids is None:
+                ids = list(row_of)
+            ids = [entry_id for entry_id in ids if entry_id in row_of]
+            vectors = np.asarray(self._vectors[[row_of[entry_id] for entry_id in ids]], dtype=np.float32)
+            if self._components is not None:
+                vectors = vectors @ self._components
+            return dict(zip(ids, vectors.tolist()))
+
+    def ids(self):
+        """IDs of all live rows."""
+        with self._lock:
+            return list(self._index())
+
+    def count(self):
+        """Number of live rows."""
+        with self._lock:
+            return int(self._rows - self._deleted.sum())
+
+    def _maybe_compact(self):
+        """Compact once enough rows are tombstoned."""
+        dead = int(self._deleted.sum())
+        if dead >= COMPACT_MIN_ROWS and dead >= self.compact_ratio * self._rows:
+            self.compact()
+
+    def _maybe_retrain(self):
+        """Train the IVF index in the background once it is due."""
+        if self.ivf is None or self._training:
+            return
+        live = int(self._rows - self._deleted.sum())
+        if self.ivf.trained:
+            due = self.ivf.needs_retrain(live)
+        else:
+            due = live >= self.ivf_min_rows
+        if due:
+            self._training = True
+            threading.Thread(target=self.train_ivf, daemon=True).start()
+
+    def train_ivf(self, iterations: int = 10):
+        """
+        Train IVF centroids on a sample of the live rows and reassign all rows.
+
+        Training runs without the lock; rows appended meanwhile are assigned
+        when the new index is swapped in. If the collection was compacted
+        meanwhile the result is dropped and the next write retries.
+        """
+        self._training = True
+        try:
+            with self._lock:
+                generation, rows = self.meta['generation'], self._rows
+                vectors, deleted = self._vectors, self._deleted[:rows].copy()
+            live = np.flatnonzero(~deleted)
+            if not len(live):
+                return
+            nlist = self.nlist or int(np.sqrt(len(live)))
+            rng = np.random.default_rng(len(live))
+            sample = live if len(live) <= 64 * nlist else np.sort(rng.choice(live, 64 * nlist, replace=False))
+            sample_vectors = np.asarray(vectors[sample], dtype=np.float32)
+            centroids = train_centroids(sample_vectors, nlist, iterations=iterations)
+            train_error = float(assign_cells(sample_vectors, centroids)[1].mean())
+            cells, _ = assign_cells(vectors, centroids)
+
+            with self._lock:
+                if self.meta['generation'] != generation or self.ivf is None:
+                    return
+                if self._rows > rows:
+                    tail, _ = assign_cells(self._vectors[rows:], centroids)
+                    cells = np.concatenate([cells, tail])
+                previous = self.meta.get('ivf')
+                version = previous['version'] + 1 if previous else 1
+                np.save(self._ivf_path('centroids', version), centroids)
+                cells.tofile(self._ivf_path('assign', version))
+                self.meta['ivf'] = {
+                    'version': version,
+                    'nlist': len(centroids),
+                    'train_error': train_error,
+                    'trained_rows': len(live),
+                }
+                self._write_meta()
+                self.ivf.set_centroids(centroids, cells, train_error, len(live))
+                if previous:
+                    self._remove_ivf_files(previous['version'], generation)
+        finally:
+            self._training = False
+
+    def _remove_ivf_files(self, version: int, generation: int):
+        """Delete an IVF version's centroids and a generation's assignments."""
+        for path in (self._ivf_path('centroids', version), self._ivf_path('assign', version, generation)):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _needs_pca(self) -> bool:
+        """Whether a PCA projection is configured but not fitted yet."""
+        dimension = self.meta.get('pca_dimension')
+        return bool(dimension) and not self.meta.get('pca') and dimension < (self.meta['dimension'] or 0)
+
+    def _maybe_fit_pca(self):
+        """Fit the PCA projection in the background once the collection has pca_min_rows rows."""
+        if self._fitting or not self._needs_pca():
+            return
+        if self._rows - self._deleted.sum() >= self.pca_min_rows:
+            self._fitting = True
+            threading.Thread(target=self.fit_pca, daemon=True).start()
+
+    def fit_pca(self):
+        """
+        Fit a projection to pca_dimension on a sample of the live rows and
+        rewrite every row projected into the next generation.
+
+        The fit runs without the lock on a snapshot of the rows; rows appended
+        meanwhile are projected by the rewrite. A no-op once a projection is
+        in place (if another fit finished first, this one's result is dropped).
+        """
+        self._fitting = True
+        try:
+            with self._lock:
+                if not self._needs_pca():
+                    return
+                vectors, live = self._vectors, np.flatnonzero(~self._deleted)
+            if not len(live):
+                return
+            if len(live) > PCA_SAMPLE_ROWS:
+                live = np.sort(np.random.default_rng(len(live)).choice(live, PCA_SAMPLE_ROWS, replace=False))
+            components, retained = fit_projection(vectors[live], self.meta['pca_dimension'])
+
+            with self._lock:
+                if not self._needs_pca():
+                    return
+                np.save(self.directory / "pca.npy", components)
+                self._rewrite(components, {
+                    'input_dimension': self.meta['dimension'],
+                    'retained_energy': retained,
+                    'fitted_rows': len(live),
+                })
+            print(
+                f"📐 {self.directory.name}: projected to {len(components)} dimensions "
+                f"({retained:.1%} of the energy retained)"
+            )
+        finally:
+            self._fitting = False
+
+    def compact(self, chunk_rows: int = 65536):
+        """Rewrite live rows into a new generation and switch to it."""
+        with self._lock:
+            self._rewrite(chunk_rows=chunk_rows)
+
+    def _rewrite(
+        self,
+        components: Optional[np.ndarray] = None,
+        pca: Optional[Dict[str, Any]] = None,
+        chunk_rows: int = 65536
+    ):
+        """
+        Write the live rows into the next generation and switch to it.
+
+        Args:
+            components: PCA components to project the rows with on the way
+            pca: Projection details recorded in meta.json with the new generation
+            chunk_rows: Rows copied at a time
+        """
+        old_generation = self.meta['generation']
+        generation = old_generation + 1
+        live = np.flatnonzero(~self._deleted)
+        if self._codes is not None and components is None:
+            np.ascontiguousarray(self._codes[live]).tofile(self._path('codes', generation))
+        else:
+            # Left by an interrupted rewrite; projected rows are encoded on load
+            self._path('codes', generation).unlink(missing_ok=True)
+        # Carry IVF assignments over; without a loaded index, or with the
+        # rows projected, they go stale
+        state = self.meta.get('ivf')
+        cells = None
+        if state and components is None and self.ivf is not None and self.ivf.trained:
+            cells = np.fromfile(self._ivf_path('assign', state['version']), dtype=np.int32)
+        if cells is not None and len(cells) >= self._rows:
+            cells[live].tofile(self._ivf_path('assign', state['version'], generation))
+        elif state:
+            self._remove_ivf_files(state['version'], old_generation)
+            del self.meta['ivf']
+        with open(self._path('vectors', generation), 'wb') as vectors_file, \
+                open(self._path('ids', generation), 'wb') as ids_file:
+            for start in range(0, len(live), chunk_rows):
+                rows = live[start:start + chunk_rows]
+                vectors = self._vectors[rows]
+                if components is not None:
+                    vectors = self._stored(vectors, components)
+                vectors_file.write(np.ascontiguousarray(vectors, dtype=self._dtype).tobytes())
+                ids_file.write(np.ascontiguousarray(self._ids[rows]).tobytes())
+            for f in (vectors_file, ids_file):
+                f.flush()
+                os.fsync(f.fileno())
+
+        self.meta['generation'] = generation
+        if components is not None:
+            self.meta['dimension'] = len(components)
+            self.meta['pca'] = pca
+        self._write_meta()
+        self._load()
+        # Readers may still hold maps of the old files; on POSIX they stay valid
+        paths = [self._path(kind, old_generation) for kind in ('vectors', 'ids', 'deleted', 'codes')]
+        if state and 'ivf' in self.meta:
+            paths.append(self._ivf_path('assign', state['version'], old_generation))
+        for path in paths:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+class FlatVectorStore(VectorStore):
+    """Collections of memory-mapped NumPy files, one directory each."""
+
+    name = "flat"
+
+    def __init__(self, directory: str, compact_ratio: float = 0.2, **index_options):
+        """
+        Initialize store.
+
+        Args:
+            directory: Directory holding the collection directories
+            compact_ratio: Fraction of tombstoned rows that triggers compaction
+            **index_options: index, nlist, nprobe, ivf_min_rows, drift_tolerance,
+                binary_candidates, precision, pca_dimension and pca_min_rows
+                for FlatCollection
+        """
+        self.directory = Path(directory)
+        self.compact_ratio = compact_ratio
+        self.index_options = index_options
+        self._collections: Dict[str, FlatCollection] = {}
+        self._lock = threading.Lock()
+
+    def get_or_create_collection(self, name, metadata=None):
+        """Open (or create) a collection; one instance per name."""
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = FlatCollection(
+                    self.directory / name,
+                    metadata,
+                    self.compact_ratio,
+                    **self.index_options
+                )
+            return self._collections[name]
+
+    def get_collection(self, name):
+        """Open an existing collection."""
+        if name not in self._collections and not (self.directory / name / "meta.json").exists():
+            raise ValueError(f"Collection {name} does not exist")
+        return self.get_or_create_collection(name)
+
+    def delete_collection(self, name):
+        """Delete a collection's directory."""
+        with self._lock:
+            self._collections.pop(name, None)
+            if not (self.directory / name).exists():
+                raise ValueError(f"Collection {name} does not exist")
+            shutil.rmtree(self.directory / name)
+
+
+def create_vector_store(name: str) -> VectorStore:
+    """
+    Create the vector store selected in settings.
+
+    Args:
+        name: "chroma" or "flat"
+
+    Returns:
+        Opened store
+    """
+    if name == "chroma":
+        return ChromaVectorStore(settings.CHROMA_PERSIST_DIR)
+    if name == "flat":
+        return FlatVectorStore(
+            settings.VECTOR_INDEX_DIR,
+            compact_ratio=settings.VECTOR_COMPACT_RATIO,
+            index=settings.VECTOR_INDEX,
+            nlist=settings.IVF_NLIST,
+            nprobe=settings.IVF_NPROBE,
+            ivf_min_rows=settings.IVF_MIN_ROWS,
+            drift_tolerance=settings.IVF_DRIFT_TOLERANCE,
+            binary_candidates=settings.BINARY_CANDIDATES,
+            precision=settings.VECTOR_PRECISION,
+            pca_dimension=settings.VECTOR_PCA_DIMENSION,
+            pca_min_rows=settings.VECTOR_PCA_MIN_ROWS
+        )
+    raise ValueError(f"Unknown vector store: {name}")
@@ -0,0 +1,86 @@
+"""
+Benchmark: a batch of searches (POST /search/batch) against the same
+searches run one by one.
+
+Embeds queries with the hashing fallback backend and queries a flat
+collection of random normalized embeddings, with float32 and float16 rows.
+For each, prints the time of one query, of BATCH queries run one at a time
+and of one batch, and checks that the batch returns the same IDs as the
+single queries (exits non-zero if not).
+
+Run from the backend directory:
+    python -m benchmarks.bench_batch_search [--rows 200000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.embedding_backends import HashingEmbeddingBackend
+from app.services.vector_stores import FlatVectorStore
+
+DIMENSION = 384
+BATCH = 32
+TOP_K = 10
+CHUNK = 10_000
+REPEATS = 5
+WORDS = "budget client report meeting flight hotel berlin rust tutorial family trip review".split()
+
+
+def best_ms(fn):
+    """Best of REPEATS runs of fn, in milliseconds."""
+    fn()
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    backend = HashingEmbeddingBackend(dimension=DIMENSION)
+    queries = [" ".join(rng.choice(WORDS, 4)) for _ in range(BATCH)]
+    mismatched = False
+
+    with tempfile.TemporaryDirectory() as directory:
+        for precision in ("float32", "float16"):
+            collection = FlatVectorStore(directory, precision=precision).get_or_create_collection(precision)
+            for offset in range(0, args.rows, CHUNK):
+                n = min(CHUNK, args.rows - offset)
+                collection.upsert(
+                    [f"{i:08d}" for i in range(offset, offset + n)],
+                    rng.standard_normal((n, DIMENSION), dtype=np.float32)
+                )
+
+            def one_by_one():
+                return [collection.query(backend.encode([query])[0], TOP_K) for query in queries]
+
+            def batched():
+                return collection.query_many(backend.encode(queries), TOP_K)
+
+            single_ms = best_ms(lambda: collection.query(backend.encode(queries[:1])[0], TOP_K))
+            sequential_ms = best_ms(one_by_one)
+            batch_ms = best_ms(batched)
+            print(
+                f"{precision} over {args.rows:,} x {DIMENSION}: 1 query {single_ms:.1f} ms, "
+                f"{BATCH} one by one {sequential_ms:.1f} ms, batch of {BATCH} {batch_ms:.1f} ms "
+                f"({sequential_ms / batch_ms:.1f}x throughput, {batch_ms / single_ms:.1f}x one query)"
+            )
+            expected = [[m['entry_id'] for m in matches] for matches in one_by_one()]
+            if expected != [[m['entry_id'] for m in matches] for matches in batched()]:
+                print(f"FAILED: {precision} batch results differ from single queries")
+                mismatched = True
+
+    if mismatched:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: binary-quantized first stage with float re-ranking
+(VECTOR_INDEX=binary) against exact search in the flat vector store.
+
+Uses the clustered synthetic embeddings of bench_ivf. Prints first-stage
+memory per row, recall@k and p50 latency for a range of candidate pool
+sizes, and the Hamming scan time over SCAN_ROWS random codes (the first
+stage alone, at a scale whose float vectors would not fit the sandbox).
+Exits non-zero if recall at the default BINARY_CANDIDATES falls below
+MIN_RECALL.
+
+Run from the backend directory:
+    python -m benchmarks.bench_binary [--rows 200000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.quantization import hamming_distances, pack_signs
+from app.services.vector_stores import FlatVectorStore
+from benchmarks.bench_ivf import CHUNK, CLUSTERS, DIMENSION, TOP_K, QUERIES, sample, timed_queries
+
+CANDIDATES = [50, 100, 200, 500, 1000]
+SCAN_ROWS = 2_000_000
+MIN_RECALL = 0.9
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((CLUSTERS, DIMENSION), dtype=np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        exact_collection = FlatVectorStore(directory).get_or_create_collection("bench")
+        for offset in range(0, args.rows, CHUNK):
+            n = min(CHUNK, args.rows - offset)
+            exact_collection.upsert([f"{i:08d}" for i in range(offset, offset + n)], sample(rng, centers, n))
+        queries = sample(rng, centers, QUERIES)
+        exact, exact_ms = timed_queries(exact_collection, queries)
+        print(f"exact search over {args.rows:,} x {DIMENSION}: p50 {exact_ms:.2f} ms")
+
+        # Reopening in binary mode encodes the existing rows
+        start = time.perf_counter()
+        collection = FlatVectorStore(directory, index="binary").get_collection("bench")
+        print(f"encode binary codes: {time.perf_counter() - start:.2f} s")
+        print(
+            f"first stage: {collection._codes.shape[1]} bytes/row vs "
+            f"{DIMENSION * 4} bytes/row float32 ({DIMENSION * 4 // collection._codes.shape[1]}x smaller)"
+        )
+
+        default_recall = None
+        print(f"{'pool':>6}  {'recall@' + str(TOP_K):>9}  {'p50 ms':>7}  speedup")
+        for pool in CANDIDATES:
+            collection.binary_candidates = pool
+            approximate, ms = timed_queries(collection, queries)
+            recall = np.mean([len(set(a) & set(e)) / TOP_K for a, e in zip(approximate, exact)])
+            if pool == settings.BINARY_CANDIDATES:
+                default_recall = recall
+            print(f"{pool:>6}  {recall:>9.3f}  {ms:>7.2f}  {exact_ms / ms:>6.1f}x")
+
+    codes = rng.integers(0, 256, size=(SCAN_ROWS, DIMENSION // 8), dtype=np.uint8)
+    query_code = pack_signs(queries[0])[0]
+    hamming_distances(codes[:1000], query_code)
+    start = time.perf_counter()
+    for _ in range(5):
+        hamming_distances(codes, query_code)
+    print(
+        f"Hamming scan of {SCAN_ROWS:,} codes ({codes.nbytes / 2**20:.0f} MiB): "
+        f"{(time.perf_counter() - start) / 5 * 1000:.1f} ms"
+    )
+
+    if default_recall is not None and default_recall < MIN_RECALL:
+        print(f"FAILED: recall at BINARY_CANDIDATES={settings.BINARY_CANDIDATES} below {MIN_RECALL}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: per-call overhead of connect-per-call vs pooled SQLite connections.
+
+Run from the backend directory:
+    python -m benchmarks.bench_db_pool
+"""
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import aiosqlite
+
+from app.db.database import Database
+
+CALLS = 2000
+
+
+async def bench_connect_per_call(db_path: str, entry_id: str) -> float:
+    """Time get_entry-style lookups that open a fresh connection each call."""
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        async with aiosqlite.connect(db_path) as conn:
+            conn.row_factory = aiosqlite.Row
+            async with conn.execute("SELECT * FROM entries WHERE id = ?", (entry_id,)) as cursor:
+                await cursor.fetchone()
+    return time.perf_counter() - start
+
+
+async def bench_pooled(database: Database, entry_id: str) -> float:
+    """Time lookups through the pooled Database.get_entry."""
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        await database.get_entry(entry_id)
+    return time.perf_counter() - start
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        database = Database(db_path)
+        try:
+            await database.initialize()
+            entry = await database.create_entry({'content': 'benchmark entry', 'type': 'note'})
+
+            before = await bench_connect_per_call(db_path, entry['id'])
+            after = await bench_pooled(database, entry['id'])
+        finally:
+            await database.close()
+
+    print(f"calls:            {CALLS}")
+    print(f"connect-per-call: {before / CALLS * 1e6:8.1f} us/call")
+    print(f"pooled:           {after / CALLS * 1e6:8.1f} us/call")
+    print(f"speedup:          {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
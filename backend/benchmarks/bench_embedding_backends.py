@@ -0,0 +1,97 @@
+"""
+Benchmark and parity check: ONNX Runtime embedding backend (fp32 and int8)
+vs the sentence-transformers (PyTorch) backend.
+
+Checks that ONNX vectors stay close enough to the PyTorch ones to share the
+existing collection (per-text cosine similarity), then reports encode
+throughput and resident memory added by loading each backend. Exits non-zero
+if a backend falls below its parity threshold.
+
+Run from the backend directory (needs torch, sentence-transformers,
+onnxruntime and an exported model in ONNX_MODEL_DIR):
+    python -m benchmarks.bench_embedding_backends
+"""
+import sys
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embedding_backends import OnnxEmbeddingBackend, SentenceTransformerBackend
+
+TEXTS = 512
+ROUNDS = 3
+
+# Minimum per-text cosine similarity to the PyTorch vectors
+PARITY = {'onnx': 0.999, 'onnx-int8': 0.97}
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process."""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * 4096 / 1024 / 1024
+
+
+def make_texts():
+    """Journal-style texts of varying length."""
+    base = [
+        "Meeting with the client about the Q3 budget report",
+        "Need to book a flight and hotel for the Berlin trip next week",
+        "Finished chapter four of the machine learning book, notes on regularization",
+        "Idea: a habit tracker that nudges you based on your calendar",
+        "Doctor appointment moved to Friday, remember to bring the insurance forms",
+    ]
+    return [f"{base[i % len(base)]} (entry {i})" + " and more detail" * (i % 7) for i in range(TEXTS)]
+
+
+def throughput(backend, texts) -> float:
+    """Texts per second over ROUNDS encodes of texts."""
+    backend.encode(texts[:8])  # warm-up
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        backend.encode(texts, batch_size=settings.EMBEDDING_BATCH_SIZE)
+    return len(texts) * ROUNDS / (time.perf_counter() - start)
+
+
+def main():
+    texts = make_texts()
+
+    # ONNX first, so its memory delta doesn't include torch
+    backends = []
+    for quantize in (False, True):
+        before = rss_mb()
+        backend = OnnxEmbeddingBackend(
+            settings.ONNX_MODEL_DIR,
+            quantize=quantize,
+            max_length=settings.ONNX_MAX_LENGTH,
+            threads=settings.ONNX_THREADS
+        )
+        backends.append((backend, rss_mb() - before))
+
+    before = rss_mb()
+    reference = SentenceTransformerBackend(settings.EMBEDDING_MODEL)
+    reference_mb = rss_mb() - before
+    expected = reference.encode(texts)
+
+    print(f"{TEXTS} texts, batch size {settings.EMBEDDING_BATCH_SIZE}")
+    print(f"{'backend':<22}{'texts/s':>10}{'load RSS MB':>13}{'min cos':>10}{'mean cos':>10}")
+    print(f"{reference.name:<22}{throughput(reference, texts):>10.1f}{reference_mb:>13.0f}{1.0:>10.4f}{1.0:>10.4f}")
+
+    failed = False
+    for backend, load_mb in backends:
+        vectors = backend.encode(texts)
+        cosines = np.sum(vectors * expected, axis=1) / (
+            np.linalg.norm(vectors, axis=1) * np.linalg.norm(expected, axis=1)
+        )
+        print(f"{backend.name:<22}{throughput(backend, texts):>10.1f}{load_mb:>13.0f}"
+              f"{cosines.min():>10.4f}{cosines.mean():>10.4f}")
+        if cosines.min() < PARITY[backend.name]:
+            print(f"  parity FAILED: min cosine below {PARITY[backend.name]}")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark: embedding throughput for concurrent single-text requests,
+with and without the micro-batcher.
+
+Run from the backend directory (needs the embedding model):
+    python -m benchmarks.bench_embedding_batcher
+"""
+import asyncio
+import time
+
+from app.core.config import settings
+from app.services.ai_processor import ai_processor
+
+CONCURRENCY = 50
+ROUNDS = 10
+
+
+async def run(micro_batch: bool) -> float:
+    """Return embeddings per second for ROUNDS waves of CONCURRENCY requests."""
+    settings.EMBEDDING_MICRO_BATCH = micro_batch
+    texts = [f"search query number {i} about project deadlines" for i in range(CONCURRENCY)]
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await asyncio.gather(*[ai_processor.generate_embedding(text) for text in texts])
+    return CONCURRENCY * ROUNDS / (time.perf_counter() - start)
+
+
+async def main():
+    await ai_processor.initialize()
+    await run(micro_batch=False)  # warm-up
+
+    unbatched = await run(micro_batch=False)
+    batched = await run(micro_batch=True)
+
+    print(f"concurrency: {CONCURRENCY}, max batch: {settings.EMBEDDING_MAX_BATCH_SIZE}, "
+          f"max wait: {settings.EMBEDDING_MAX_WAIT_MS} ms")
+    print(f"one encode per call: {unbatched:8.1f} embeddings/s")
+    print(f"micro-batched:       {batched:8.1f} embeddings/s")
+    print(f"speedup:             {batched / unbatched:8.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""
+Benchmark: the hashed n-gram TF-IDF fallback embedding (USE_LOCAL_EMBEDDINGS
+off) against the previous constant hash() vector.
+
+Measures single-core throughput, checks that vectors are identical across
+processes, and scores retrieval: each document is queried with a short
+phrase from it and should rank first. Exits non-zero if vectors differ
+between processes or fallback retrieval is no better than chance.
+
+Run from the backend directory:
+    python -m benchmarks.bench_fallback_embedding
+"""
+import hashlib
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from app.services.embedding_backends import HashingEmbeddingBackend
+from app.services.lexicon import DEFAULT_LEXICONS
+
+DOCS = 5000
+QUERIES = 500
+SEED = 7
+
+_PROBE = (
+    "import hashlib; from app.services.embedding_backends import HashingEmbeddingBackend; "
+    "print(hashlib.sha1(HashingEmbeddingBackend().encode({texts!r}).tobytes()).hexdigest())"
+)
+
+
+def make_docs(rng: random.Random):
+    """Journal-style entries over a mixed vocabulary."""
+    words = [w for ws in DEFAULT_LEXICONS['categories'].values() for w in ws]
+    words += [f"{rng.choice('bcdfgklmnprst')}{rng.choice('aeiou')}{rng.choice('lmnrst')}{n}" for n in range(2000)]
+    return [
+        " ".join(rng.choice(words) for _ in range(rng.randint(15, 60)))
+        for _ in range(DOCS)
+    ]
+
+
+def legacy_encode(texts):
+    """Previous fallback: one value from the (per-process salted) hash, repeated."""
+    return np.array([[float(hash(text) % 1000) / 1000.0] * 384 for text in texts], dtype=np.float32)
+
+
+def recall_at_1(encode, docs, queries, targets):
+    """Fraction of queries whose source document has the highest cosine similarity."""
+    doc_vectors = encode(docs)
+    query_vectors = encode(queries)
+    doc_vectors /= np.clip(np.linalg.norm(doc_vectors, axis=1, keepdims=True), 1e-12, None)
+    query_vectors /= np.clip(np.linalg.norm(query_vectors, axis=1, keepdims=True), 1e-12, None)
+    best = (query_vectors @ doc_vectors.T).argmax(axis=1)
+    return float(np.mean(best == np.array(targets)))
+
+
+def main():
+    rng = random.Random(SEED)
+    docs = make_docs(rng)
+    targets = rng.sample(range(DOCS), QUERIES)
+    queries = []
+    for target in targets:
+        words = docs[target].split()
+        length = max(3, len(words) // 10)
+        offset = rng.randint(0, len(words) - length)
+        queries.append(" ".join(words[offset:offset + length]))
+
+    backend = HashingEmbeddingBackend()
+    backend.encode(docs[:100])  # warm up
+    start = time.perf_counter()
+    backend.encode(docs)
+    elapsed = time.perf_counter() - start
+    print(f"hashing encode: {DOCS / elapsed:,.0f} docs/s ({elapsed * 1000:.0f} ms for {DOCS})")
+
+    fitted = HashingEmbeddingBackend()
+    fitted.fit_idf(docs)
+    print("recall@1 (query = a phrase of 10% of a document's words):")
+    print(f"  legacy hash() vector:  {recall_at_1(legacy_encode, docs, queries, targets):.3f}")
+    print(f"  hashed TF:             {recall_at_1(backend.encode, docs, queries, targets):.3f}")
+    hashed = recall_at_1(fitted.encode, docs, queries, targets)
+    print(f"  hashed TF-IDF:         {hashed:.3f}")
+
+    sample = docs[:20]
+    local = hashlib.sha1(HashingEmbeddingBackend().encode(sample).tobytes()).hexdigest()
+    other = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(texts=sample)],
+        capture_output=True, text=True, check=True
+    ).stdout.strip()
+    stable = local == other
+    print(f"identical across processes: {stable}")
+
+    failed = not stable or hashed <= 1 / DOCS
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
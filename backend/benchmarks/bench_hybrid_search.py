@@ -0,0 +1,110 @@
+"""
+Benchmark: relevance and latency of semantic, keyword and hybrid search.
+
+Builds a synthetic corpus where every entry carries a unique identifier
+(ticket number, email or name) inside otherwise similar prose, then queries
+for those identifiers. Dense retrieval tends to miss them; hybrid retrieval
+should find them at a cost of a few extra milliseconds per query.
+
+Run from the backend directory (needs the embedding model and ChromaDB):
+    python -m benchmarks.bench_hybrid_search
+"""
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CORPUS_SIZE = 2000
+QUERIES = 200
+TOP_K = 10
+
+TOPICS = [
+    "Follow up with the client about the quarterly report and budget review",
+    "Sync with the team on the project deadline and presentation slides",
+    "Investigate the failing payment invoice and reconcile the costs",
+    "Book the flight and hotel for the conference trip next month",
+    "Read the research paper and take notes for the study group",
+]
+FIRST_NAMES = ["Alice", "Bruno", "Chen", "Dara", "Emeka", "Farah", "Goran", "Hana"]
+LAST_NAMES = ["Okafor", "Lindqvist", "Moreau", "Tanaka", "Varga", "Whitfield"]
+
+
+def make_corpus(rng: random.Random):
+    """Return (contents, identifiers) for the synthetic corpus."""
+    contents, identifiers = [], []
+    for i in range(CORPUS_SIZE):
+        kind = i % 3
+        if kind == 0:
+            ident = f"TICKET-{10000 + i}"
+        elif kind == 1:
+            ident = f"user{i}@example.com"
+        else:
+            ident = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}{i}"
+        contents.append(f"{rng.choice(TOPICS)}. Reference {ident}.")
+        identifiers.append(ident)
+    return contents, identifiers
+
+
+async def run_mode(search, queries, expected):
+    """Run queries through a search function; return (hit rate, latencies in ms)."""
+    hits, latencies = 0, []
+    for query, entry_id in zip(queries, expected):
+        start = time.perf_counter()
+        results = await search(query, TOP_K)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if entry_id in [r['entry_id'] for r in results]:
+            hits += 1
+    return hits / len(queries), latencies
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings and the global services are created at import time
+        os.environ["CHROMA_PERSIST_DIR"] = str(Path(tmp) / "chroma")
+        os.environ["CHROMA_COLLECTION_NAME"] = "bench_hybrid"
+        os.chdir(tmp)
+        sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+        from app.db.database import db
+        from app.services.semantic_search import semantic_search
+
+        from app.services.ai_processor import ai_processor
+
+        # Close the pools even if a step fails, or their threads keep the process alive
+        try:
+            await db.initialize()
+            await semantic_search.initialize()
+
+            rng = random.Random(7)
+            contents, identifiers = make_corpus(rng)
+            created = await db.create_entries_many([{'content': c, 'type': 'note'} for c in contents])
+            entry_ids = [e['id'] for e in created]
+            await semantic_search.add_entries(entry_ids, contents)
+
+            sample = rng.sample(range(CORPUS_SIZE), QUERIES)
+            queries = [identifiers[i] for i in sample]
+            expected = [entry_ids[i] for i in sample]
+
+            modes = {
+                'semantic': lambda q, k: semantic_search.search(q, limit=k),
+                'keyword': lambda q, k: db.keyword_search(q, limit=k),
+                'hybrid': lambda q, k: semantic_search.hybrid_search(q, limit=k),
+            }
+
+            print(f"corpus: {CORPUS_SIZE} entries, {QUERIES} identifier queries, hit@{TOP_K}")
+            print(f"{'mode':<10}{'hit rate':>10}{'p50 ms':>10}{'p95 ms':>10}")
+            for name, search in modes.items():
+                hit_rate, latencies = await run_mode(search, queries, expected)
+                p95 = statistics.quantiles(latencies, n=20)[-1]
+                print(f"{name:<10}{hit_rate:>10.2%}{statistics.median(latencies):>10.2f}{p95:>10.2f}")
+        finally:
+            await db.close()
+            await ai_processor.embedding_cache.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
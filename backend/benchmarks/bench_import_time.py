@@ -0,0 +1,88 @@
+"""
+Import-time regression check for `import app.main`.
+
+Runs the import in a fresh interpreter with `python -X importtime`, prints the
+slowest modules, and exits non-zero if the cumulative import time exceeds
+BUDGET_MS or a heavy ML library is imported eagerly. Those libraries are
+loaded on first use, so CLI tools and test collection don't pay for them.
+
+Run from the backend directory:
+    python -m benchmarks.bench_import_time
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+BUDGET_MS = 800
+RUNS = 3
+TOP = 15
+
+# Must not be imported by `import app.main`
+HEAVY_MODULES = ['torch', 'sentence_transformers', 'transformers', 'chromadb', 'networkx', 'openai', 'spacy', 'onnxruntime', 'scipy']
+
+_PROBE = (
+    "import sys, app.main; "
+    f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+)
+
+
+def import_once():
+    """
+    Import app.main in a fresh interpreter.
+
+    Returns:
+        (cumulative microseconds per module, heavy modules that were imported)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if cumulative_us.strip().isdigit():
+            cumulative[name.strip()] = int(cumulative_us)
+    heavy = [m for m in result.stdout.strip().split(",") if m]
+    return cumulative, heavy
+
+
+def best_import(runs: int = RUNS):
+    """
+    Import app.main runs times and keep the fastest run.
+
+    Returns:
+        (cumulative microseconds per module, heavy modules that were imported)
+    """
+    # Best of several runs, so a cold filesystem cache doesn't fail the check
+    return min((import_once() for _ in range(runs)), key=lambda run: run[0].get("app.main", 0))
+
+
+def main():
+    cumulative, heavy = best_import()
+    total_ms = cumulative.get("app.main", 0) / 1000
+
+    print(f"slowest imports (cumulative, best of {RUNS}):")
+    for name, us in sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:TOP]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+    print(f"import app.main: {total_ms:.1f} ms (budget {BUDGET_MS} ms)")
+
+    failed = False
+    if total_ms > BUDGET_MS:
+        print("FAILED: over budget")
+        failed = True
+    if heavy:
+        print(f"FAILED: imported eagerly: {', '.join(heavy)}")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
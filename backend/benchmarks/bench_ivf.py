@@ -0,0 +1,96 @@
+"""
+Benchmark: recall@k and latency of the IVF index (VECTOR_INDEX=ivf) against
+exact search in the flat vector store.
+
+Embeddings are synthetic but clustered like real ones (a Gaussian mixture
+on the unit sphere). Queries are drawn from the same mixture. Prints
+training time, then recall and p50 latency for a range of nprobe values.
+Exits non-zero if recall at the default IVF_NPROBE falls below
+MIN_RECALL.
+
+Run from the backend directory:
+    python -m benchmarks.bench_ivf [--rows 200000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.vector_stores import FlatVectorStore
+
+DIMENSION = 384
+CLUSTERS = 2000
+NOISE = 0.9
+QUERIES = 200
+TOP_K = 10
+CHUNK = 10_000
+NPROBES = [1, 2, 4, 8, 16, 32, 64]
+MIN_RECALL = 0.9
+
+
+def sample(rng, centers, n):
+    """n points around random cluster centers."""
+    points = centers[rng.integers(0, len(centers), n)]
+    points += NOISE * rng.standard_normal((n, DIMENSION), dtype=np.float32) / np.sqrt(DIMENSION)
+    return points
+
+
+def timed_queries(collection, queries):
+    """Run the queries; return (result IDs per query, p50 latency in ms)."""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append([r['entry_id'] for r in collection.query(query, TOP_K)])
+        latencies.append(time.perf_counter() - start)
+    return results, float(np.percentile(latencies, 50)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((CLUSTERS, DIMENSION), dtype=np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Train explicitly below, not in the background while loading
+        store = FlatVectorStore(directory, index="ivf", ivf_min_rows=args.rows + 1)
+        collection = store.get_or_create_collection("bench")
+        for offset in range(0, args.rows, CHUNK):
+            n = min(CHUNK, args.rows - offset)
+            collection.upsert([f"{i:08d}" for i in range(offset, offset + n)], sample(rng, centers, n))
+        queries = sample(rng, centers, QUERIES)
+
+        exact, exact_ms = timed_queries(collection, queries)
+        print(f"exact search over {args.rows:,} x {DIMENSION}: p50 {exact_ms:.2f} ms")
+
+        start = time.perf_counter()
+        collection.train_ivf()
+        print(
+            f"IVF training (nlist {collection.meta['ivf']['nlist']}): "
+            f"{time.perf_counter() - start:.1f} s"
+        )
+
+        default_recall = None
+        print(f"{'nprobe':>6}  {'recall@' + str(TOP_K):>9}  {'p50 ms':>7}  speedup")
+        for nprobe in NPROBES:
+            collection.ivf.nprobe = nprobe
+            approximate, ms = timed_queries(collection, queries)
+            recall = np.mean([
+                len(set(a) & set(e)) / TOP_K for a, e in zip(approximate, exact)
+            ])
+            if nprobe == settings.IVF_NPROBE:
+                default_recall = recall
+            print(f"{nprobe:>6}  {recall:>9.3f}  {ms:>7.2f}  {exact_ms / ms:>6.1f}x")
+
+    if default_recall is not None and default_recall < MIN_RECALL:
+        print(f"FAILED: recall at IVF_NPROBE={settings.IVF_NPROBE} below {MIN_RECALL}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
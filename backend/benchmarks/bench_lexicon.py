@@ -0,0 +1,97 @@
+"""
+Benchmark: rule-based extraction with per-keyword substring scans vs the
+single-pass compiled lexicon, at the default lexicon size and with a large
+synthetic lexicon.
+
+Run from the backend directory:
+    python -m benchmarks.bench_lexicon
+"""
+import random
+import re
+import string
+import time
+
+from app.services.lexicon import DEFAULT_LEXICONS, Lexicon
+
+TEXTS = 2000
+SYNTHETIC_TERMS = 5000
+
+_ACTION_PATTERNS = [
+    r'(?:need to|must|should|have to|todo:|task:)\s+([^.!?\n]+)',
+    r'(?:will|going to|plan to)\s+([^.!?\n]+)',
+    r'(?:could|might|maybe)\s+([^.!?\n]+)',
+    r'(?:remember to|don\'t forget to)\s+([^.!?\n]+)',
+]
+
+
+def legacy_scan(text: str, lexicons: dict):
+    """Substring scans per keyword plus one regex per action pattern (previous implementation)."""
+    content_lower = text.lower()
+    categories = [
+        category for category, keywords in lexicons['categories'].items()
+        if any(keyword in content_lower for keyword in keywords)
+    ]
+    positive = sum(1 for word in lexicons['sentiment']['positive'] if word in content_lower)
+    negative = sum(1 for word in lexicons['sentiment']['negative'] if word in content_lower)
+    urgent = sum(1 for word in lexicons['urgency'] if word in content_lower)
+    actions = [m.group(1) for p in _ACTION_PATTERNS for m in re.finditer(p, text, re.IGNORECASE)]
+    return categories, positive, negative, urgent, actions
+
+
+def make_texts(rng: random.Random):
+    """Journal-style entries of a few sentences each."""
+    words = [w for ws in DEFAULT_LEXICONS['categories'].values() for w in ws]
+    words += ['today', 'the', 'team', 'and', 'with', 'about', 'after', 'lunch', 'notes']
+    texts = []
+    for _ in range(TEXTS):
+        sentences = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(6, 14)))
+            for _ in range(rng.randint(2, 6))
+        ]
+        sentences.append("I need to send the budget report to the client by Friday")
+        texts.append(". ".join(sentences) + ".")
+    return texts
+
+
+def make_large_lexicons(rng: random.Random):
+    """Default lexicons with SYNTHETIC_TERMS extra category keywords."""
+    lexicons = {**DEFAULT_LEXICONS, 'categories': dict(DEFAULT_LEXICONS['categories'])}
+    for n in range(SYNTHETIC_TERMS // 100):
+        lexicons['categories'][f'synthetic{n}'] = [
+            "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+            for _ in range(100)
+        ]
+    return lexicons
+
+
+def bench(label: str, lexicons: dict, texts):
+    """Time both implementations over texts and print throughput."""
+    start = time.perf_counter()
+    for text in texts:
+        legacy_scan(text, lexicons)
+    legacy = time.perf_counter() - start
+
+    compile_start = time.perf_counter()
+    lexicon = Lexicon(lexicons)
+    compile_ms = (time.perf_counter() - compile_start) * 1000
+
+    start = time.perf_counter()
+    for text in texts:
+        lexicon.scan(text)
+    compiled = time.perf_counter() - start
+
+    print(f"{label} ({len(lexicon.terms)} terms, compiled in {compile_ms:.0f} ms)")
+    print(f"  substring scans: {legacy / len(texts) * 1e6:8.1f} us/text")
+    print(f"  compiled lexicon:{compiled / len(texts) * 1e6:8.1f} us/text")
+    print(f"  speedup:         {legacy / compiled:8.1f}x")
+
+
+def main():
+    rng = random.Random(0)
+    texts = make_texts(rng)
+    bench("default lexicon", DEFAULT_LEXICONS, texts)
+    bench("large lexicon", make_large_lexicons(rng), texts)
+
+
+if __name__ == "__main__":
+    main()
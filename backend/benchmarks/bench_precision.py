@@ -0,0 +1,92 @@
+"""
+Benchmark: recall and latency cost of float16 storage and PCA projection
+(VECTOR_PRECISION, VECTOR_PCA_DIMENSION) in the flat vector store.
+
+Sentence embeddings concentrate their variance in a minority of directions,
+which is what makes PCA worthwhile; the synthetic embeddings here follow a
+Gaussian mixture whose per-direction spread decays as 1/sqrt(rank), randomly
+rotated. Every configuration is compared with exact float32 search over the
+same vectors. Prints bytes per row, recall@k and p50 latency, and exits
+non-zero if float16 alone falls below MIN_FLOAT16_RECALL.
+
+Run from the backend directory:
+    python -m benchmarks.bench_precision [--rows 200000]
+"""
+import argparse
+import sys
+import tempfile
+
+import numpy as np
+
+from app.services.vector_stores import FlatVectorStore
+from benchmarks.bench_ivf import CHUNK, DIMENSION, QUERIES, TOP_K, timed_queries
+
+CLUSTERS = 2000
+NOISE = 0.6
+CONFIGURATIONS = [
+    {'precision': 'float16'},
+    {'pca_dimension': 192},
+    {'pca_dimension': 128},
+    {'pca_dimension': 64},
+    {'precision': 'float16', 'pca_dimension': 128},
+    {'precision': 'float16', 'index': 'binary'},
+]
+MIN_FLOAT16_RECALL = 0.99
+
+
+def sample(rng, centers, rotation, n):
+    """n anisotropic points around random cluster centers."""
+    spread = np.arange(1, DIMENSION + 1, dtype=np.float32) ** -0.5
+    points = centers[rng.integers(0, len(centers), n)]
+    points += NOISE * rng.standard_normal((n, DIMENSION), dtype=np.float32) * spread
+    return points @ rotation
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((CLUSTERS, DIMENSION), dtype=np.float32)
+    centers *= np.arange(1, DIMENSION + 1, dtype=np.float32) ** -0.5
+    rotation = np.linalg.qr(rng.standard_normal((DIMENSION, DIMENSION)))[0].astype(np.float32)
+    chunks = [
+        ([f"{i:08d}" for i in range(offset, min(offset + CHUNK, args.rows))],
+         sample(rng, centers, rotation, min(CHUNK, args.rows - offset)))
+        for offset in range(0, args.rows, CHUNK)
+    ]
+    queries = sample(rng, centers, rotation, QUERIES)
+
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = FlatVectorStore(directory).get_or_create_collection("float32")
+        for ids, vectors in chunks:
+            baseline.upsert(ids, vectors)
+        exact, exact_ms = timed_queries(baseline, queries)
+        print(f"float32 over {args.rows:,} x {DIMENSION}: {DIMENSION * 4} bytes/row, p50 {exact_ms:.2f} ms")
+
+        float16_recall = None
+        print(f"{'configuration':<40}  {'bytes/row':>9}  {'recall@' + str(TOP_K):>9}  {'p50 ms':>7}")
+        for options in CONFIGURATIONS:
+            name = ", ".join(f"{key}={value}" for key, value in options.items())
+            collection = FlatVectorStore(directory, pca_min_rows=args.rows // 10, **options) \
+                .get_or_create_collection(name.replace("=", "-").replace(", ", "_"))
+            for ids, vectors in chunks:
+                collection.upsert(ids, vectors)
+            # The projection is fitted in the background; wait for it
+            collection.fit_pca()
+            approximate, ms = timed_queries(collection, queries)
+            recall = np.mean([len(set(a) & set(e)) / TOP_K for a, e in zip(approximate, exact)])
+            if options == {'precision': 'float16'}:
+                float16_recall = recall
+            row_bytes = collection.meta['dimension'] * collection._dtype.itemsize
+            print(f"{name:<40}  {row_bytes:>9}  {recall:>9.3f}  {ms:>7.2f}")
+            if collection.meta.get('pca'):
+                print(f"{'':<4}energy retained by PCA: {collection.meta['pca']['retained_energy']:.1%}")
+
+    if float16_recall is not None and float16_recall < MIN_FLOAT16_RECALL:
+        print(f"FAILED: float16 recall below {MIN_FLOAT16_RECALL}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
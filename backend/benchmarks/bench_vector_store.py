@@ -0,0 +1,93 @@
+"""
+Benchmark: the flat memory-mapped vector store (VECTOR_STORE=flat).
+
+Builds a collection of random normalized embeddings, then measures bulk
+upsert throughput, cold open time, top-k query latency, and delete plus
+compaction. Results are checked against a brute-force NumPy ranking, and
+the script exits non-zero if any query returns different IDs.
+
+Run from the backend directory:
+    python -m benchmarks.bench_vector_store [--rows 1000000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.vector_stores import FlatVectorStore
+
+DIMENSION = 384
+QUERIES = 200
+TOP_K = 10
+CHUNK = 10_000
+
+
+def percentile_ms(samples, q):
+    """Percentile of second-valued samples in milliseconds."""
+    return float(np.percentile(samples, q)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    rows = args.rows
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = FlatVectorStore(directory)
+        collection = store.get_or_create_collection("bench")
+        ids = [f"{i:08d}-0000-0000-0000-000000000000" for i in range(rows)]
+
+        start = time.perf_counter()
+        for offset in range(0, rows, CHUNK):
+            vectors = rng.standard_normal((min(CHUNK, rows - offset), DIMENSION), dtype=np.float32)
+            collection.upsert(ids[offset:offset + CHUNK], vectors)
+        elapsed = time.perf_counter() - start
+        print(f"upsert {rows:,} x {DIMENSION}: {rows / elapsed:,.0f} vectors/s")
+
+        start = time.perf_counter()
+        collection = FlatVectorStore(directory).get_collection("bench")
+        print(f"open: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        # Brute force reference over a copy read into memory
+        reference = np.array(collection._vectors)
+        queries = rng.standard_normal((QUERIES, DIMENSION), dtype=np.float32)
+        latencies, mismatches = [], 0
+        for query in queries:
+            start = time.perf_counter()
+            results = collection.query(query, TOP_K)
+            latencies.append(time.perf_counter() - start)
+            expected = np.argsort(-(reference @ query))[:TOP_K]
+            if [r['entry_id'] for r in results] != [ids[i] for i in expected]:
+                mismatches += 1
+        print(
+            f"query top-{TOP_K}: p50 {percentile_ms(latencies, 50):.2f} ms, "
+            f"p95 {percentile_ms(latencies, 95):.2f} ms, mismatches {mismatches}/{QUERIES}"
+        )
+
+        # Delete a quarter of the rows in batches; crossing the ratio compacts
+        deleted = rng.choice(rows, size=rows // 4, replace=False)
+        start = time.perf_counter()
+        for offset in range(0, len(deleted), CHUNK):
+            collection.delete([ids[i] for i in deleted[offset:offset + CHUNK]])
+        elapsed = time.perf_counter() - start
+        print(
+            f"delete {len(deleted):,} (with compaction): {elapsed * 1000:.0f} ms, "
+            f"generation {collection.meta['generation']}, {collection.count():,} live"
+        )
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            collection.query(query, TOP_K)
+            latencies.append(time.perf_counter() - start)
+        print(f"query after compaction: p50 {percentile_ms(latencies, 50):.2f} ms")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
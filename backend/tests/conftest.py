@@ -0,0 +1,20 @@
+"""
+Shared fixtures for the backend tests.
+
+Run from the backend directory:
+    python -m pytest
+"""
+import pytest
+
+from app.db.database import Database
+
+
+@pytest.fixture
+async def database(tmp_path):
+    """A migrated database in a temporary directory, closed after the test."""
+    database = Database(str(tmp_path / "test.db"))
+    await database.initialize()
+    try:
+        yield database
+    finally:
+        await database.close()
@@ -0,0 +1,272 @@
+"""Tests for the SQLite data layer (app/db/database.py)."""
+import sqlite3
+
+import pytest
+
+from app.db.database import Database, _MIGRATIONS
+
+
+async def create_entries(database, count, **fields):
+    """Create count note entries and return them in creation order."""
+    return await database.create_entries_many(
+        [{'content': f"entry {i}", 'type': 'note', **fields} for i in range(count)]
+    )
+
+
+async def trace_reads(database):
+    """Record every statement the pool's readers execute."""
+    statements = []
+    for conn in database.pool._readers:
+        await conn.set_trace_callback(statements.append)
+    return statements
+
+
+# Batched hydration
+
+async def test_get_entries_many_keeps_order_and_skips_missing(database):
+    entries = await create_entries(database, 3)
+    ids = [entries[2]['id'], "missing", entries[0]['id']]
+
+    found = await database.get_entries_many(ids)
+
+    assert [e['id'] for e in found] == [entries[2]['id'], entries[0]['id']]
+
+
+async def test_get_entries_many_spans_chunks(database):
+    entries = await create_entries(database, 1200)
+    ids = [e['id'] for e in reversed(entries)]
+    statements = await trace_reads(database)
+
+    found = await database.get_entries_many(ids)
+
+    assert [e['id'] for e in found] == ids
+    assert len(statements) == 3
+
+
+async def test_list_actions_for_entries_fetches_a_page_in_one_query(database):
+    entries = await create_entries(database, 3)
+    await database.create_action({'entry_id': entries[0]['id'], 'description': "call Bob", 'priority': 'high'})
+    await database.create_action({'entry_id': entries[0]['id'], 'description': "email Ann", 'priority': 'low'})
+    await database.create_action({'entry_id': entries[2]['id'], 'description': "book hotel", 'priority': 'medium'})
+    statements = await trace_reads(database)
+
+    actions = await database.list_actions_for_entries([e['id'] for e in entries])
+
+    assert len(statements) == 1
+    assert sorted(a['description'] for a in actions[entries[0]['id']]) == ["call Bob", "email Ann"]
+    assert actions[entries[1]['id']] == []
+    assert [a['description'] for a in actions[entries[2]['id']]] == ["book hotel"]
+
+
+# Migrations and tag filtering
+
+async def test_initialize_twice_is_a_no_op(tmp_path):
+    path = str(tmp_path / "migrate.db")
+    database = Database(path)
+    await database.initialize()
+    await database.create_entry({'content': "tagged", 'type': 'note', 'tags': ["work", "urgent"]})
+    await database.close()
+
+    database = Database(path)
+    await database.initialize()
+    try:
+        async with database.pool.reader() as conn:
+            async with conn.execute("PRAGMA user_version") as cursor:
+                assert (await cursor.fetchone())[0] == len(_MIGRATIONS)
+            async with conn.execute("SELECT tag FROM entry_tags ORDER BY tag") as cursor:
+                assert [row[0] for row in await cursor.fetchall()] == ["urgent", "work"]
+        assert len(await database.list_entries()) == 1
+    finally:
+        await database.close()
+
+
+@pytest.fixture
+async def tagged(database):
+    """Entries tagged a, a+b, b and none, by name."""
+    entries = {}
+    for name, tags in [('a', ["a"]), ('ab', ["a", "b"]), ('b', ["b"]), ('none', [])]:
+        entries[name] = (await database.create_entry({'content': name, 'type': 'note', 'tags': tags}))['id']
+    return entries
+
+
+@pytest.mark.parametrize("tags, match, expected", [
+    ("a", "any", {'a', 'ab'}),
+    (["a", "b"], "any", {'a', 'ab', 'b'}),
+    (["a", "b"], "all", {'ab'}),
+    (["a", "a"], "all", {'a', 'ab'}),
+    (["a", "missing"], "all", set()),
+])
+async def test_list_entries_tag_filter(database, tagged, tags, match, expected):
+    found = await database.list_entries(tag_filter=tags, tag_match=match)
+
+    assert {e['content'] for e in found} == expected
+
+
+async def test_update_entry_replaces_tags(database, tagged):
+    await database.update_entry(tagged['ab'], {'tags': ["c"]})
+
+    assert {e['content'] for e in await database.list_entries(tag_filter="a")} == {'a'}
+    assert {e['content'] for e in await database.list_entries(tag_filter="c")} == {'ab'}
+
+
+# Keyset pagination
+
+async def test_cursor_round_trip(database):
+    entry = await database.create_entry({'content': "x", 'type': 'note'})
+
+    assert database.decode_cursor(database.encode_cursor(entry)) == (entry['created_at'], entry['id'])
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "WzEsIDJd", "eyJhIjogMX0"])
+async def test_decode_cursor_rejects_malformed(database, cursor):
+    with pytest.raises(ValueError):
+        database.decode_cursor(cursor)
+
+
+async def test_cursor_pages_cover_entries_with_equal_created_at(database):
+    # One transaction, so every entry shares created_at and only id orders them
+    entries = await create_entries(database, 7)
+    assert len({e['created_at'] for e in entries}) == 1
+
+    seen, cursor = [], None
+    while True:
+        page = await database.list_entries(limit=3, cursor=cursor)
+        seen.extend(e['id'] for e in page)
+        if len(page) < 3:
+            break
+        cursor = database.decode_cursor(database.encode_cursor(page[-1]))
+
+    assert seen == sorted((e['id'] for e in entries), reverse=True)
+
+
+async def test_cursor_ignores_offset(database):
+    entries = await create_entries(database, 4)
+    first = await database.list_entries(limit=2)
+
+    second = await database.list_entries(limit=2, offset=100, cursor=(first[-1]['created_at'], first[-1]['id']))
+
+    assert len(second) == 2
+    assert not {e['id'] for e in first} & {e['id'] for e in second}
+    assert len({e['id'] for e in first + second}) == len(entries)
+
+
+# Full-text search
+
+async def keyword_ids(database, query, **kwargs):
+    return [r['entry_id'] for r in await database.keyword_search(query, **kwargs)]
+
+
+async def test_keyword_search_ranks_and_highlights(database):
+    meeting = await database.create_entry({'content': "Budget meeting with the client", 'type': 'note'})
+    await database.create_entry({'content': "Hiking trip", 'type': 'note'})
+
+    results = await database.keyword_search("client budget")
+
+    assert [r['entry_id'] for r in results] == [meeting['id']]
+    assert results[0]['highlights'] == ["<mark>Budget</mark> meeting with the <mark>client</mark>"]
+
+
+async def test_keyword_search_match_any(database):
+    budget = await database.create_entry({'content': "budget review", 'type': 'note'})
+    hotel = await database.create_entry({'content': "hotel booking", 'type': 'note'})
+
+    assert await keyword_ids(database, "budget hotel") == []
+    assert set(await keyword_ids(database, "budget hotel", match_all=False)) == {budget['id'], hotel['id']}
+
+
+@pytest.mark.parametrize("query", ["", "  ", "!!!", '"', "budget OR", "NEAR(a b)", "a*"])
+async def test_keyword_search_treats_input_as_words(database, query):
+    await database.create_entry({'content': "budget review", 'type': 'note'})
+
+    assert await keyword_ids(database, query) == []
+
+
+async def test_fts_index_follows_updates(database):
+    entry = await database.create_entry({'content': "budget review", 'type': 'note'})
+
+    await database.update_entry(entry['id'], {'content': "hotel booking"})
+
+    assert await keyword_ids(database, "budget") == []
+    assert await keyword_ids(database, "hotel") == [entry['id']]
+
+
+async def test_fts_index_follows_deletes(database):
+    entry = await database.create_entry({'content': "budget review", 'type': 'note'})
+
+    await database.delete_entry(entry['id'])
+
+    assert await keyword_ids(database, "budget") == []
+    assert await database.get_highlights([entry['id']], "budget") == {}
+
+
+async def test_get_highlights_only_for_requested_matches(database):
+    budget = await database.create_entry({'content': "budget review", 'type': 'note'})
+    other = await database.create_entry({'content': "budget meeting", 'type': 'note'})
+    hotel = await database.create_entry({'content': "hotel booking", 'type': 'note'})
+
+    highlights = await database.get_highlights([budget['id'], hotel['id']], "budget")
+
+    assert highlights == {budget['id']: ["<mark>budget</mark> review"]}
+    assert other['id'] not in highlights
+
+
+# Relationships
+
+async def test_relationship_upsert_keeps_one_edge(database):
+    await database.create_relationship("a", "b", 0.5, "similar")
+    edge = await database.create_relationship("a", "b", 0.9, "similar")
+    await database.create_relationships_many([("a", "b", 0.7, "similar"), ("a", "b", 0.8, "similar")])
+
+    edges = await database.get_relationships("a")
+
+    assert len(edges) == 1
+    assert edges[0]['id'] == edge['id']
+    assert edges[0]['weight'] == 0.8
+
+
+async def test_relationship_types_and_directions_are_distinct_edges(database):
+    await database.create_relationships_many([
+        ("a", "b", 0.5, "similar"),
+        ("a", "b", 0.5, "mentions"),
+        ("b", "a", 0.5, "similar"),
+    ])
+
+    assert len(await database.get_relationships("a")) == 3
+
+
+async def test_migration_collapses_duplicate_relationships(tmp_path):
+    # A database from before migrations: relationships keyed by UUID, with duplicates
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE entries (
+            id TEXT PRIMARY KEY, content TEXT NOT NULL, type TEXT NOT NULL, tags TEXT,
+            ai_categories TEXT, ai_entities TEXT, ai_summary TEXT, ai_sentiment TEXT,
+            ai_key_phrases TEXT, created_at TEXT NOT NULL, updated_at TEXT NOT NULL,
+            view_count INTEGER DEFAULT 0, last_accessed TEXT
+        );
+        CREATE TABLE relationships (
+            id TEXT PRIMARY KEY, source_id TEXT NOT NULL, target_id TEXT NOT NULL,
+            weight REAL NOT NULL, type TEXT NOT NULL, created_at TEXT NOT NULL
+        );
+        INSERT INTO entries (id, content, type, tags, created_at, updated_at)
+        VALUES ('a', 'budget review', 'note', '["work"]', '2024-01-01', '2024-01-01');
+        INSERT INTO relationships VALUES
+            ('r1', 'a', 'b', 0.5, 'similar', '2024-01-01'),
+            ('r2', 'a', 'b', 0.9, 'similar', '2024-01-03'),
+            ('r3', 'a', 'b', 0.7, 'similar', '2024-01-02'),
+            ('r4', 'a', 'c', 0.4, 'similar', '2024-01-01');
+    """)
+    conn.close()
+
+    database = Database(str(path))
+    await database.initialize()
+    try:
+        edges = {edge['target_id']: edge for edge in await database.get_relationships("a")}
+        assert set(edges) == {"b", "c"}
+        assert edges["b"]['weight'] == 0.9
+        assert edges["b"]['created_at'] == '2024-01-01'
+        assert [e['id'] for e in await database.list_entries(tag_filter="work")] == ["a"]
+        assert [r['entry_id'] for r in await database.keyword_search("budget")] == ["a"]
+    finally:
+        await database.close()
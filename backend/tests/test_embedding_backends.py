@@ -0,0 +1,178 @@
+"""Tests for the embedding backends (app/services/embedding_backends.py)."""
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.ai_processor import AIProcessor
+from app.services.embedding_backends import (
+    HashingEmbeddingBackend,
+    OnnxEmbeddingBackend,
+    create_embedding_backend,
+    embedding_cache_key,
+)
+
+VOCABULARY = ["[PAD]", "[UNK]", "budget", "client", "meeting", "hotel", "flight", "berlin"]
+HIDDEN = 16
+DIMENSION = 8
+
+
+@pytest.fixture(scope="module")
+def onnx_model_dir(tmp_path_factory):
+    """A tiny exported "transformer": token embedding lookup and one projection."""
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+    from tokenizers import Tokenizer, models, pre_tokenizers
+
+    directory = tmp_path_factory.mktemp("onnx-model")
+    rng = np.random.default_rng(0)
+    graph = helper.make_graph(
+        [
+            helper.make_node("Gather", ["table", "input_ids"], ["hidden"]),
+            helper.make_node("MatMul", ["hidden", "projection"], ["last_hidden_state"]),
+        ],
+        "tiny-encoder",
+        [
+            helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", "tokens"]),
+            helper.make_tensor_value_info("attention_mask", TensorProto.INT64, ["batch", "tokens"]),
+        ],
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["batch", "tokens", DIMENSION])],
+        initializer=[
+            numpy_helper.from_array(rng.standard_normal((len(VOCABULARY), HIDDEN)).astype(np.float32), "table"),
+            numpy_helper.from_array(rng.standard_normal((HIDDEN, DIMENSION)).astype(np.float32), "projection"),
+        ],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(directory / "model.onnx"))
+
+    tokenizer = Tokenizer(models.WordLevel({token: i for i, token in enumerate(VOCABULARY)}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.save(str(directory / "tokenizer.json"))
+    return directory
+
+
+def test_onnx_pooling_ignores_padding(onnx_model_dir):
+    backend = OnnxEmbeddingBackend(str(onnx_model_dir))
+    texts = ["budget", "client meeting in berlin", "flight"]
+
+    batched = backend.encode(texts)
+    one_by_one = np.concatenate([backend.encode([text]) for text in texts])
+
+    assert batched.shape == (3, DIMENSION)
+    np.testing.assert_allclose(batched, one_by_one, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(np.linalg.norm(batched, axis=1), 1.0, rtol=1e-5)
+
+
+def test_onnx_batches_match_a_single_pass(onnx_model_dir):
+    backend = OnnxEmbeddingBackend(str(onnx_model_dir))
+    texts = ["budget client", "hotel", "flight to berlin", "meeting", "client"]
+
+    np.testing.assert_allclose(backend.encode(texts, batch_size=2), backend.encode(texts), rtol=1e-5, atol=1e-6)
+
+
+def test_onnx_int8_model_stays_close(onnx_model_dir):
+    texts = ["budget client", "hotel flight", "meeting in berlin"]
+    exact = OnnxEmbeddingBackend(str(onnx_model_dir)).encode(texts)
+
+    quantized = OnnxEmbeddingBackend(str(onnx_model_dir), quantize=True)
+
+    assert quantized.name == "onnx-int8"
+    assert (onnx_model_dir / "model.int8.onnx").exists()
+    assert np.all(np.sum(exact * quantized.encode(texts), axis=1) > 0.99)
+
+
+# Hashing fallback
+
+@pytest.mark.parametrize("texts", [[""], ["!!!"], ["?", "!"], []])
+def test_hashing_without_words_gives_zero_vectors(texts):
+    embeddings = HashingEmbeddingBackend(dimension=64).encode(texts)
+
+    assert embeddings.shape == (len(texts), 64)
+    assert embeddings.dtype == np.float32
+    assert not embeddings.any()
+
+
+def test_hashing_mixes_empty_and_word_texts():
+    embeddings = HashingEmbeddingBackend(dimension=64).encode(["budget review", "!!!"])
+
+    assert np.linalg.norm(embeddings[0]) == pytest.approx(1.0, rel=1e-5)
+    assert not embeddings[1].any()
+
+
+async def test_fallback_embedding_of_punctuation(monkeypatch):
+    monkeypatch.setattr(settings, "USE_LOCAL_EMBEDDINGS", False)
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PATH", "")
+
+    embedding = await AIProcessor().generate_embedding("!!!")
+
+    assert len(embedding) == settings.FALLBACK_EMBEDDING_DIM
+
+
+def test_hashing_vectors_are_unit_length():
+    texts = ["budget review with the client", "hotel", "flight to Berlin on Monday morning"]
+
+    embeddings = HashingEmbeddingBackend(dimension=64).encode(texts)
+
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0, rtol=1e-5)
+
+
+def test_hashing_is_the_same_in_every_process():
+    texts = ["budget review with the client", "hotel booking"]
+    script = (
+        "import sys; from app.services.embedding_backends import HashingEmbeddingBackend as H; "
+        f"sys.stdout.buffer.write(H(dimension=64).encode({texts!r}).tobytes())"
+    )
+    outputs = [
+        subprocess.run(
+            [sys.executable, "-c", script],
+            env={**os.environ, "PYTHONHASHSEED": seed},
+            capture_output=True,
+            check=True
+        ).stdout
+        for seed in ("1", "2")
+    ]
+
+    assert outputs[0] == outputs[1] == HashingEmbeddingBackend(dimension=64).encode(texts).tobytes()
+
+
+def test_hashing_near_duplicates_score_closer_than_unrelated_texts():
+    text, near, unrelated = HashingEmbeddingBackend().encode([
+        "Budget review meeting with the client on Monday",
+        "budget reviews: meeting with the client on monday!",
+        "Book a hotel and a flight for the Berlin trip",
+    ])
+
+    assert text @ near > 0.8
+    assert text @ near > text @ unrelated + 0.5
+
+
+def test_onnx_backend_rejects_other_models(onnx_model_dir, monkeypatch):
+    monkeypatch.setattr(settings, "ONNX_MODEL_DIR", str(onnx_model_dir))
+
+    with pytest.raises(ValueError):
+        create_embedding_backend("onnx", "another/model")
+    assert create_embedding_backend("onnx", settings.EMBEDDING_MODEL).name == "onnx"
+    assert create_embedding_backend("onnx").name == "onnx"
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_embedding_backend("tensorflow")
+
+
+@pytest.mark.parametrize("local, backend, quantize, expected", [
+    (True, "sentence-transformers", False, "model-x"),
+    (True, "onnx", False, "model-x@onnx"),
+    (True, "onnx", True, "model-x@onnx-int8"),
+    (False, "onnx", True, f"hashing-{settings.FALLBACK_EMBEDDING_DIM}"),
+])
+def test_cache_key_is_namespaced_per_backend(monkeypatch, local, backend, quantize, expected):
+    monkeypatch.setattr(settings, "USE_LOCAL_EMBEDDINGS", local)
+    monkeypatch.setattr(settings, "EMBEDDING_BACKEND", backend)
+    monkeypatch.setattr(settings, "ONNX_QUANTIZE", quantize)
+
+    assert embedding_cache_key("model-x") == expected
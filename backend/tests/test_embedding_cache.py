@@ -0,0 +1,109 @@
+"""Tests for the two-tier embedding cache (app/services/embedding_cache.py)."""
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.ai_processor import AIProcessor
+from app.services.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "embeddings.db")
+
+
+class CountingModel:
+    """Embedding model stand-in that records the texts it encodes."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32):
+        self.encoded.append(list(texts))
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+async def processor(monkeypatch, cache_path):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PATH", cache_path)
+    monkeypatch.setattr(settings, "EMBEDDING_MICRO_BATCH", False)
+    processor = AIProcessor()
+    processor.use_embedding_model("counting-model", CountingModel())
+    yield processor
+    await processor.embedding_cache.close()
+
+
+async def test_memory_hit_and_miss():
+    cache = EmbeddingCache("model-a")
+    await cache.put_many(["hello"], [[0.5, 1.0]])
+
+    assert await cache.get_many(["hello", "other", "hello"]) == [[0.5, 1.0], None, [0.5, 1.0]]
+    assert cache.stats == {'memory_hits': 2, 'disk_hits': 0, 'misses': 1}
+
+
+async def test_memory_tier_evicts_least_recently_used():
+    cache = EmbeddingCache("model-a", capacity=2)
+    await cache.put_many(["a", "b"], [[1.0], [2.0]])
+    await cache.get_many(["a"])
+    await cache.put_many(["c"], [[3.0]])
+
+    assert await cache.get_many(["a", "b", "c"]) == [[1.0], None, [3.0]]
+
+
+async def test_disk_tier_survives_restart(cache_path):
+    cache = EmbeddingCache("model-a", path=cache_path)
+    await cache.put_many(["hello", "world"], [[0.5, -1.0], [0.25, 2.0]])
+    await cache.close()
+
+    cache = EmbeddingCache("model-a", path=cache_path)
+    try:
+        assert await cache.get_many(["world", "hello", "new"]) == [[0.25, 2.0], [0.5, -1.0], None]
+        assert cache.stats['disk_hits'] == 2
+        # Disk hits are promoted to memory
+        await cache.get_many(["hello"])
+        assert cache.stats['memory_hits'] == 1
+    finally:
+        await cache.close()
+
+
+async def test_models_do_not_share_embeddings(cache_path):
+    cache = EmbeddingCache("model-a", path=cache_path)
+    try:
+        await cache.put_many(["hello"], [[1.0]])
+
+        cache.set_model("model-b")
+        assert await cache.get_many(["hello"]) == [None]
+
+        cache.set_model("model-a")
+        assert await cache.get_many(["hello"]) == [[1.0]]
+    finally:
+        await cache.close()
+
+
+async def test_lookups_span_chunks(cache_path):
+    texts = [f"text {i}" for i in range(1200)]
+    cache = EmbeddingCache("model-a", capacity=1, path=cache_path)
+    try:
+        await cache.put_many(texts, [[float(i)] for i in range(1200)])
+
+        assert await cache.get_many(texts) == [[float(i)] for i in range(1200)]
+    finally:
+        await cache.close()
+
+
+async def test_generate_embeddings_encodes_only_misses(processor):
+    await processor.generate_embedding("cached")
+
+    embeddings = await processor.generate_embeddings(["cached", "new", "longer text"])
+
+    assert embeddings == [[6.0], [3.0], [11.0]]
+    assert processor.embedding_model.encoded == [["cached"], ["new", "longer text"]]
+
+
+async def test_switching_model_does_not_reuse_embeddings(processor):
+    await processor.generate_embedding("hello")
+
+    processor.use_embedding_model("other-model", CountingModel())
+    await processor.generate_embedding("hello")
+
+    assert processor.embedding_model.encoded == [["hello"]]
@@ -0,0 +1,213 @@
+"""Tests for the durable enrichment job queue (app/services/enrichment_queue.py)."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import enrichment_queue as enrichment_queue_module
+from app.services.enrichment_queue import PRIORITY_BULK, PRIORITY_INTERACTIVE, EnrichmentQueue
+
+
+async def create_pending(database, content, priority=PRIORITY_INTERACTIVE):
+    return await database.create_entry({'content': content, 'type': 'note'}, enrichment_priority=priority)
+
+
+def result_for(entry, **fields):
+    return {'entry_id': entry['id'], 'content': entry['content'], 'ai_summary': "summary", **fields}
+
+
+@pytest.fixture
+def queue(database, monkeypatch):
+    """A queue whose workers use the test database."""
+    monkeypatch.setattr(enrichment_queue_module, "db", database)
+    return EnrichmentQueue(workers=1, batch_size=4, max_attempts=3, backoff=0.01, poll_interval=0.01)
+
+
+async def test_new_entries_are_pending_with_a_queued_job(database):
+    entry = await create_pending(database, "call Bob")
+
+    assert entry['processing_status'] == 'pending'
+    job = await database.get_enrichment_job(entry['id'])
+    assert (job['status'], job['priority'], job['attempts']) == ('queued', PRIORITY_INTERACTIVE, 0)
+
+
+async def test_claim_takes_the_interactive_lane_first_without_mixing_lanes(database):
+    bulk = await create_pending(database, "imported", PRIORITY_BULK)
+    interactive = [await create_pending(database, f"typed {i}") for i in range(2)]
+
+    first = await database.claim_enrichment_jobs(10)
+    second = await database.claim_enrichment_jobs(10)
+
+    assert [job['entry_id'] for job in first] == [e['id'] for e in interactive]
+    assert [job['entry_id'] for job in second] == [bulk['id']]
+    assert await database.claim_enrichment_jobs(10) == []
+
+
+async def test_claim_marks_jobs_running_and_entries_processing(database):
+    entry = await create_pending(database, "call Bob")
+
+    [job] = await database.claim_enrichment_jobs(1)
+
+    assert (job['status'], job['attempts']) == ('running', 1)
+    assert (await database.get_enrichment_job(entry['id']))['status'] == 'running'
+    assert (await database.get_entry(entry['id']))['processing_status'] == 'processing'
+
+
+async def test_failed_attempt_waits_for_its_retry_time(database):
+    entry = await create_pending(database, "call Bob")
+    [job] = await database.claim_enrichment_jobs(1)
+
+    await database.fail_enrichment_job(job['id'], "boom", datetime.utcnow() + timedelta(hours=1))
+
+    assert await database.claim_enrichment_jobs(1) == []
+    assert (await database.get_entry(entry['id']))['processing_status'] == 'pending'
+    assert (await database.get_enrichment_job(entry['id']))['last_error'] == "boom"
+
+
+async def test_giving_up_marks_the_entry_failed(database):
+    entry = await create_pending(database, "call Bob")
+    [job] = await database.claim_enrichment_jobs(1)
+
+    await database.fail_enrichment_job(job['id'], "boom")
+
+    assert (await database.get_enrichment_job(entry['id']))['status'] == 'failed'
+    assert (await database.get_entry(entry['id']))['processing_status'] == 'failed'
+    assert await database.claim_enrichment_jobs(1) == []
+
+
+async def test_requeue_running_jobs(database):
+    entries = [await create_pending(database, f"entry {i}") for i in range(2)]
+    jobs = await database.claim_enrichment_jobs(2)
+
+    assert await database.requeue_running_enrichment_jobs([jobs[0]['id']]) == 1
+    assert (await database.get_entry(entries[0]['id']))['processing_status'] == 'pending'
+    assert (await database.get_entry(entries[1]['id']))['processing_status'] == 'processing'
+    assert await database.requeue_running_enrichment_jobs() == 1
+    assert len(await database.claim_enrichment_jobs(2)) == 2
+
+
+async def test_complete_enrichment_stores_only_fresh_results(database):
+    fresh, edited, deleted = [await create_pending(database, f"entry {i}") for i in range(3)]
+    await database.claim_enrichment_jobs(3)
+    await database.create_relationships_many([(deleted['id'], fresh['id'], 0.9, "similar")])
+    await database.update_entry(edited['id'], {'content': "edited"})
+    await database.delete_entry(deleted['id'])
+
+    stale = await database.complete_enrichment(
+        [result_for(fresh), result_for(edited), result_for(deleted)],
+        [{'entry_id': entry['id'], 'description': "do it"} for entry in (fresh, edited, deleted)]
+    )
+
+    assert stale == {'deleted': [deleted['id']], 'changed': [edited['id']]}
+    stored = await database.get_entry(fresh['id'])
+    assert (stored['processing_status'], stored['ai_summary']) == ('completed', "summary")
+    assert await database.get_enrichment_job(fresh['id']) is None
+    assert (await database.get_entry(edited['id']))['ai_summary'] is None
+    assert (await database.get_enrichment_job(edited['id']))['status'] == 'queued'
+    assert [a['entry_id'] for a in await database.list_actions()] == [fresh['id']]
+    assert await database.get_relationships(fresh['id']) == []
+
+
+async def test_content_edit_requeues_a_finished_or_failed_entry(database):
+    entry = await create_pending(database, "call Bob")
+    [job] = await database.claim_enrichment_jobs(1)
+    await database.fail_enrichment_job(job['id'], "boom")
+
+    updated = await database.update_entry(entry['id'], {'content': "call Ann"}, enrichment_priority=PRIORITY_INTERACTIVE)
+
+    assert updated['processing_status'] == 'pending'
+    job = await database.get_enrichment_job(entry['id'])
+    assert (job['status'], job['attempts'], job['last_error']) == ('queued', 0, None)
+
+
+async def test_content_edit_leaves_a_running_job_to_complete_enrichment(database):
+    entry = await create_pending(database, "call Bob")
+    await database.claim_enrichment_jobs(1)
+
+    await database.update_entry(entry['id'], {'content': "call Ann"}, enrichment_priority=PRIORITY_INTERACTIVE)
+
+    assert (await database.get_enrichment_job(entry['id']))['status'] == 'running'
+    stale = await database.complete_enrichment([result_for(entry)], [])
+    assert stale['changed'] == [entry['id']]
+    assert (await database.get_enrichment_job(entry['id']))['status'] == 'queued'
+
+
+async def test_tag_edit_does_not_requeue(database):
+    entry = await database.create_entry({'content': "call Bob", 'type': 'note'})
+
+    await database.update_entry(entry['id'], {'tags': ["x"]}, enrichment_priority=PRIORITY_INTERACTIVE)
+
+    assert await database.get_enrichment_job(entry['id']) is None
+    assert (await database.get_entry(entry['id']))['processing_status'] == 'completed'
+
+
+@pytest.mark.parametrize("attempts, retry_in", [(1, 0.01), (2, 0.02)])
+async def test_retries_back_off_exponentially(database, queue, attempts, retry_in):
+    entry = await create_pending(database, "call Bob")
+    [job] = await database.claim_enrichment_jobs(1)
+    job['attempts'] = attempts
+    before = datetime.utcnow()
+
+    await queue._fail(job, RuntimeError("model crashed"))
+
+    stored = await database.get_enrichment_job(entry['id'])
+    assert stored['status'] == 'queued'
+    assert stored['last_error'] == "RuntimeError: model crashed"
+    delay = (datetime.fromisoformat(stored['run_after']) - before).total_seconds()
+    assert retry_in <= delay < retry_in + 1
+
+
+async def test_last_attempt_fails_the_job(database, queue):
+    entry = await create_pending(database, "call Bob")
+    [job] = await database.claim_enrichment_jobs(1)
+    job['attempts'] = queue.max_attempts
+
+    await queue._fail(job, RuntimeError("model crashed"))
+
+    assert (await database.get_enrichment_job(entry['id']))['status'] == 'failed'
+    assert queue.stats['failed'] == 1
+
+
+async def test_worker_survives_queue_errors(database, queue, monkeypatch):
+    entry = await create_pending(database, "call Bob")
+    enriched = []
+    claim = database.claim_enrichment_jobs
+    errors = iter([RuntimeError("database is locked")])
+
+    async def flaky_claim(limit):
+        for error in errors:
+            raise error
+        return await claim(limit)
+
+    async def enrich(jobs):
+        enriched.extend(job['entry_id'] for job in jobs)
+        await database.complete_enrichment([result_for(entry)], [])
+
+    monkeypatch.setattr(database, "claim_enrichment_jobs", flaky_claim)
+    monkeypatch.setattr(queue, "_enrich", enrich)
+    await queue.start()
+    try:
+        for _ in range(200):
+            if enriched:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await queue.stop()
+
+    assert enriched == [entry['id']]
+    assert (await database.get_entry(entry['id']))['processing_status'] == 'completed'
+
+
+async def test_batch_failure_retries_jobs_one_by_one(database, queue, monkeypatch):
+    good, bad = [await create_pending(database, content) for content in ("good", "bad")]
+
+    async def enrich(jobs):
+        if any(job['entry_id'] == bad['id'] for job in jobs):
+            raise ValueError("bad entry")
+        await database.complete_enrichment([result_for(good)], [])
+
+    monkeypatch.setattr(queue, "_enrich", enrich)
+    await queue._run_once([])
+
+    assert (await database.get_entry(good['id']))['processing_status'] == 'completed'
+    assert (await database.get_enrichment_job(bad['id']))['last_error'] == "ValueError: bad entry"
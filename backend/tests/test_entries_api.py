@@ -0,0 +1,130 @@
+"""Tests for the entry routes (app/api/entries.py)."""
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api import entries as entries_module
+from app.core.config import settings
+from app.services.enrichment_queue import PRIORITY_BULK
+
+
+@pytest.fixture
+async def client(database, monkeypatch):
+    """An API client over the test database."""
+    monkeypatch.setattr(entries_module, "db", database)
+    app = FastAPI()
+    app.include_router(entries_module.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+# Listing
+
+async def test_list_entries_includes_each_entrys_actions(client, database):
+    with_actions, without = await database.create_entries_many(
+        [{'content': "budget review", 'type': 'note'}, {'content': "hotel", 'type': 'note'}]
+    )
+    await database.create_actions_many([
+        {'entry_id': with_actions['id'], 'description': "call Bob", 'priority': 'high'},
+        {'entry_id': with_actions['id'], 'description': "email Ann", 'priority': 'low'},
+    ])
+
+    response = await client.get("/entries")
+
+    assert response.status_code == 200
+    actions = {e['id']: e['extracted_actions'] for e in response.json()}
+    assert sorted((a['description'], a['priority']) for a in actions[with_actions['id']]) == [
+        ("call Bob", 'high'), ("email Ann", 'low')
+    ]
+    assert actions[without['id']] == []
+
+
+# Bulk create
+
+BULK = [
+    {'content': "budget review", 'type': 'note', 'tags': ["work", "finance"]},
+    {'content': "hotel booking", 'type': 'task', 'tags': ["travel"]},
+    {'content': "grocery list", 'type': 'note'},
+]
+
+
+async def test_bulk_create_returns_entries_in_input_order(client):
+    response = await client.post("/entries/bulk", json={'entries': BULK})
+
+    assert response.status_code == 201
+    created = response.json()
+    assert [e['content'] for e in created] == [e['content'] for e in BULK]
+    assert [e['type'] for e in created] == ['note', 'task', 'note']
+    assert {e['processing_status'] for e in created} == {'pending'}
+
+
+async def test_bulk_create_persists_tags_per_entry(client, database):
+    created = (await client.post("/entries/bulk", json={'entries': BULK})).json()
+
+    for entry, data in zip(created, BULK):
+        assert (await database.get_entry(entry['id']))['tags'] == data.get('tags', [])
+    assert [e['id'] for e in await database.list_entries(tag_filter="travel")] == [created[1]['id']]
+
+
+async def test_bulk_create_queues_one_bulk_job_per_entry(client, database):
+    created = (await client.post("/entries/bulk", json={'entries': BULK})).json()
+
+    jobs = [await database.get_enrichment_job(entry['id']) for entry in created]
+
+    assert [(job['status'], job['priority']) for job in jobs] == [('queued', PRIORITY_BULK)] * len(BULK)
+    assert await database.count_enrichment_jobs() == {'queued': {PRIORITY_BULK: len(BULK)}}
+
+
+async def test_bulk_create_over_the_limit_is_rejected(client, database, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_MAX_ENTRIES", 2)
+
+    response = await client.post("/entries/bulk", json={'entries': BULK})
+
+    assert response.status_code == 413
+    assert await database.list_entries() == []
+
+
+async def test_bulk_create_rejects_an_empty_list(client):
+    response = await client.post("/entries/bulk", json={'entries': []})
+
+    assert response.status_code == 422
+
+
+async def test_batch_enrichment_links_actions_to_their_bulk_entries(client, database):
+    created = (await client.post("/entries/bulk", json={'entries': BULK})).json()
+    await database.claim_enrichment_jobs(len(BULK))
+
+    await database.complete_enrichment(
+        [{'entry_id': e['id'], 'content': e['content'], 'ai_summary': e['content']} for e in created],
+        [
+            {'entry_id': created[0]['id'], 'description': "check the budget"},
+            {'entry_id': created[1]['id'], 'description': "book the hotel"},
+            {'entry_id': created[0]['id'], 'description': "send the review"},
+        ]
+    )
+
+    actions = await database.list_actions_for_entries([e['id'] for e in created])
+    assert sorted(a['description'] for a in actions[created[0]['id']]) == ["check the budget", "send the review"]
+    assert [a['description'] for a in actions[created[1]['id']]] == ["book the hotel"]
+    assert actions[created[2]['id']] == []
+    assert await database.count_enrichment_jobs() == {}
+
+
+async def test_create_actions_many_links_actions_to_their_entries(database):
+    entries = await database.create_entries_many([{'content': c, 'type': 'note'} for c in ("a", "b")])
+
+    created = await database.create_actions_many([
+        {'entry_id': entries[0]['id'], 'description': "call Bob", 'priority': 'high'},
+        {'entry_id': entries[1]['id'], 'description': "book hotel"},
+        {'entry_id': entries[0]['id'], 'description': "email Ann", 'priority': 'low'},
+    ])
+
+    assert [a['description'] for a in created] == ["call Bob", "book hotel", "email Ann"]
+    stored = await database.list_actions_for_entries([e['id'] for e in entries])
+    assert sorted((a['description'], a['priority']) for a in stored[entries[0]['id']]) == [
+        ("call Bob", 'high'), ("email Ann", 'low')
+    ]
+    assert [(a['description'], a['priority'], a['status']) for a in stored[entries[1]['id']]] == [
+        ("book hotel", 'medium', 'pending')
+    ]
+    assert await database.create_actions_many([]) == []
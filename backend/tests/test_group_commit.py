@@ -0,0 +1,87 @@
+"""Tests for the group-commit writer (app/db/group_commit.py)."""
+import asyncio
+
+import pytest
+
+from app.db.group_commit import GroupCommitWriter
+
+
+class RecordingFlush:
+    """Flush callback that records each batch it receives."""
+
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        if self.error:
+            raise self.error
+
+
+async def test_concurrent_submits_share_one_flush():
+    flush = RecordingFlush()
+    writer = GroupCommitWriter(flush, interval=0.05)
+
+    await asyncio.gather(*(writer.submit([i]) for i in range(10)))
+    await writer.close()
+
+    assert len(flush.batches) == 1
+    assert sorted(flush.batches[0]) == list(range(10))
+
+
+async def test_full_batch_flushes_before_the_interval():
+    flush = RecordingFlush()
+    writer = GroupCommitWriter(flush, interval=60, max_batch=3)
+
+    await asyncio.wait_for(writer.submit([1, 2, 3]), timeout=5)
+    await writer.close()
+
+    assert flush.batches == [[1, 2, 3]]
+
+
+async def test_flush_error_reaches_every_submitter_in_the_batch():
+    flush = RecordingFlush(error=RuntimeError("disk full"))
+    writer = GroupCommitWriter(flush, interval=0.05)
+
+    results = await asyncio.gather(writer.submit([1]), writer.submit([2]), return_exceptions=True)
+    await writer.close()
+
+    assert [str(r) for r in results] == ["disk full", "disk full"]
+
+
+async def test_writer_recovers_after_a_failed_flush():
+    flush = RecordingFlush(error=RuntimeError("disk full"))
+    writer = GroupCommitWriter(flush, interval=0.01)
+    with pytest.raises(RuntimeError):
+        await writer.submit([1])
+
+    flush.error = None
+    await writer.submit([2])
+    await writer.close()
+
+    assert flush.batches[-1] == [2]
+
+
+async def test_close_flushes_pending_items_and_rejects_new_ones():
+    flush = RecordingFlush()
+    writer = GroupCommitWriter(flush, interval=60)
+    pending = asyncio.create_task(writer.submit([1]))
+    await asyncio.sleep(0)
+
+    await writer.close()
+    await pending
+
+    assert flush.batches == [[1]]
+    with pytest.raises(RuntimeError):
+        await writer.submit([2])
+
+
+async def test_empty_submit_does_not_flush():
+    flush = RecordingFlush()
+    writer = GroupCommitWriter(flush)
+
+    await writer.submit([])
+    await writer.close()
+
+    assert flush.batches == []
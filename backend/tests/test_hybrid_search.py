@@ -0,0 +1,52 @@
+"""Tests for reciprocal rank fusion in hybrid search (app/services/semantic_search.py)."""
+import pytest
+
+from app.core.config import settings
+from app.services.semantic_search import reciprocal_rank_fusion, semantic_search
+
+
+def test_rrf_scores_sum_over_rankings():
+    fused = dict(reciprocal_rank_fusion({'lexical': ["a", "b"], 'vector': ["b", "c"]}, k=60))
+
+    assert fused["a"] == pytest.approx(1 / 61)
+    assert fused["b"] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused["c"] == pytest.approx(1 / 62)
+
+
+def test_rrf_ranks_agreement_first():
+    fused = reciprocal_rank_fusion({'lexical': ["a", "b", "c"], 'vector': ["c", "d", "b"]})
+
+    assert [item_id for item_id, _ in fused][:2] == ["c", "b"]
+
+
+def test_rrf_weights_favour_a_source():
+    rankings = {'lexical': ["a"], 'vector': ["b"]}
+
+    assert reciprocal_rank_fusion(rankings, weights={'lexical': 2.0})[0][0] == "a"
+    assert reciprocal_rank_fusion(rankings, weights={'vector': 2.0})[0][0] == "b"
+
+
+def test_rrf_empty():
+    assert reciprocal_rank_fusion({'lexical': [], 'vector': []}) == []
+
+
+def test_fuse_keeps_scores_highlights_and_metadata(monkeypatch):
+    monkeypatch.setattr(settings, "HYBRID_LEXICAL_WEIGHT", 1.0)
+    monkeypatch.setattr(settings, "HYBRID_VECTOR_WEIGHT", 1.0)
+    lexical = [
+        {'entry_id': "ticket", 'score': 7.5, 'highlights': ["<mark>TICKET</mark>-1"]},
+        {'entry_id': "both", 'score': 3.0, 'highlights': ["<mark>both</mark>"]},
+    ]
+    vector = [
+        {'entry_id': "both", 'score': 0.9, 'metadata': {'type': 'note'}},
+        {'entry_id': "meaning", 'score': 0.8, 'metadata': {'type': 'task'}},
+    ]
+
+    results = semantic_search._fuse(lexical, vector, limit=2)
+
+    assert [r['entry_id'] for r in results] == ["both", "ticket"]
+    assert results[0]['source_scores'] == {'lexical': 3.0, 'vector': 0.9}
+    assert results[0]['highlights'] == ["<mark>both</mark>"]
+    assert results[0]['metadata'] == {'type': 'note'}
+    assert results[1]['source_scores'] == {'lexical': 7.5}
+    assert results[1]['metadata'] == {}
@@ -0,0 +1,17 @@
+"""
+`import app.main` must stay within the import-time budget and must not load
+the heavy ML libraries; they are imported on first use (see
+benchmarks/bench_import_time.py).
+"""
+from benchmarks.bench_import_time import BUDGET_MS, HEAVY_MODULES, best_import
+
+
+def test_heavy_modules_cover_the_lazily_imported_libraries():
+    assert {'networkx', 'openai', 'transformers', 'onnxruntime'} <= set(HEAVY_MODULES)
+
+
+def test_import_app_main_skips_heavy_modules_and_stays_within_budget():
+    cumulative, heavy = best_import()
+
+    assert heavy == []
+    assert cumulative["app.main"] / 1000 <= BUDGET_MS
@@ -0,0 +1,55 @@
+"""Tests for the inference executor's admission control (app/services/inference.py)."""
+import asyncio
+import sys
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.services.inference import InferenceExecutor, InferenceOverloaded
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    """An executor with one in-flight slot and room for one waiting call."""
+    monkeypatch.setattr(settings, "INFERENCE_MAX_PENDING", 1)
+    monkeypatch.setattr(settings, "INFERENCE_MAX_WAITING", 1)
+    executor = InferenceExecutor()
+    yield executor
+    executor.shutdown()
+
+
+async def test_calls_over_the_waiting_limit_fail_fast(executor):
+    release = threading.Event()
+    running = asyncio.create_task(executor.run("model", lambda: release.wait(5) and "first"))
+    waiting = asyncio.create_task(executor.run("model", lambda: "second"))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(InferenceOverloaded) as rejected:
+        await executor.run("model", lambda: "third")
+
+    assert rejected.value.retry_after == settings.INFERENCE_RETRY_AFTER
+    release.set()
+    assert await asyncio.gather(running, waiting) == ["first", "second"]
+    assert executor.get_stats()["model"]['calls'] == 2
+    assert executor.get_stats()["model"]['rejected'] == 1
+
+
+async def test_slots_are_released_after_failures(executor):
+    def fail():
+        raise RuntimeError("model error")
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            await executor.run("model", fail)
+
+    assert await executor.run("model", lambda: "ok") == "ok"
+    assert executor._waiting == 0
+
+
+async def test_thread_mode_without_spacy_reports_unavailable(executor, monkeypatch):
+    monkeypatch.setattr(settings, "SPACY_EXECUTOR", "thread")
+    monkeypatch.setitem(sys.modules, "spacy", None)  # import spacy raises ImportError
+
+    assert await executor.load_nlp("en_core_web_sm") is False
+    assert not executor.nlp_available
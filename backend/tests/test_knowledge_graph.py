@@ -0,0 +1,106 @@
+"""Tests for edge writes of the knowledge graph build (app/services/knowledge_graph.py)."""
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.db.group_commit import GroupCommitWriter
+from app.services import knowledge_graph as knowledge_graph_module
+from app.services.knowledge_graph import KnowledgeGraphService
+
+CREATED_AT = "2024-05-01T09:00:00"
+
+
+class FakeSearch:
+    """find_similar answering from a fixed table of (entry, score) lists."""
+
+    def __init__(self, similar):
+        self.similar = similar
+
+    async def find_similar(self, entry_id, limit=5):
+        return [{'entry_id': other, 'score': score} for other, score in self.similar.get(entry_id, [])]
+
+
+@pytest.fixture
+def writes(database, monkeypatch):
+    """Batches passed to create_relationships_many, which still writes them."""
+    batches = []
+    create_relationships_many = database.create_relationships_many
+
+    async def recording(edges):
+        batches.append(list(edges))
+        return await create_relationships_many(edges)
+
+    monkeypatch.setattr(database, "create_relationships_many", recording)
+    monkeypatch.setattr(knowledge_graph_module, "db", database)
+    return batches
+
+
+async def graph_of(monkeypatch, similar, nodes):
+    """A graph service with nodes {id: (created_at, entity texts)}."""
+    monkeypatch.setattr(knowledge_graph_module, "semantic_search", FakeSearch(similar))
+    graph = KnowledgeGraphService()
+    for entry_id, (created_at, entities) in nodes.items():
+        await graph.add_entry_node(
+            entry_id,
+            entry_id,
+            {'created_at': created_at, 'entities': [{'text': text} for text in entities]}
+        )
+    return graph
+
+
+async def test_build_connections_writes_all_its_edges_in_one_batch(database, writes, monkeypatch):
+    monkeypatch.setattr(settings, "GRAPH_GROUP_COMMIT", False)
+    graph = await graph_of(
+        monkeypatch,
+        {'a': [('b', 0.9), ('unknown', 0.8)]},
+        {
+            'a': (CREATED_AT, ["Berlin", "Ann"]),
+            'b': ("2024-01-01T09:00:00", []),
+            'c': ("2024-01-01T09:00:00", ["Berlin", "Ann"]),
+            'd': ("2024-05-01T21:00:00", []),
+        }
+    )
+
+    await graph.build_connections('a')
+
+    assert len(writes) == 1
+    assert sorted(writes[0]) == [
+        ('a', 'b', 0.9, 'similarity'),
+        ('a', 'c', 1.0, 'entity'),
+        ('a', 'd', 0.5, 'temporal'),
+    ]
+    stored = await database.get_relationships('a')
+    assert sorted((r['target_id'], r['type'], r['weight']) for r in stored) == [
+        ('b', 'similarity', 0.9), ('c', 'entity', 1.0), ('d', 'temporal', 0.5)
+    ]
+
+
+async def test_build_connections_without_edges_writes_nothing(database, writes, monkeypatch):
+    monkeypatch.setattr(settings, "GRAPH_GROUP_COMMIT", False)
+    graph = await graph_of(monkeypatch, {}, {'a': (CREATED_AT, [])})
+
+    await graph.build_connections('a')
+    await graph.build_connections('missing')
+
+    assert sum(len(batch) for batch in writes) == 0
+    assert await database.get_relationships('a') == []
+
+
+async def test_group_commit_coalesces_concurrent_builds(database, writes, monkeypatch):
+    monkeypatch.setattr(settings, "GRAPH_GROUP_COMMIT", True)
+    writer = GroupCommitWriter(database.create_relationships_many, interval=0.05)
+    monkeypatch.setattr(knowledge_graph_module, "relationship_writer", writer)
+    ids = ['a', 'b', 'c', 'd']
+    graph = await graph_of(monkeypatch, {}, {entry_id: (CREATED_AT, []) for entry_id in ids})
+
+    await asyncio.gather(*(graph.build_connections(entry_id) for entry_id in ids))
+    await writer.close()
+
+    assert len(writes) == 1
+    assert len(writes[0]) == len(ids) * (len(ids) - 1)
+    for entry_id in ids:
+        stored = await database.get_relationships(entry_id)
+        assert {(r['source_id'], r['target_id']) for r in stored if r['source_id'] == entry_id} == {
+            (entry_id, other) for other in ids if other != entry_id
+        }
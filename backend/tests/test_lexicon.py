@@ -0,0 +1,56 @@
+"""Tests for single-pass lexicon scanning (app/services/lexicon.py)."""
+import pytest
+
+from app.services.lexicon import DEFAULT_LEXICONS, Lexicon
+
+
+@pytest.fixture(scope="module")
+def lexicon():
+    return Lexicon(DEFAULT_LEXICONS)
+
+
+@pytest.mark.parametrize("text", [
+    "love", "loves", "loved", "loving", "LOVED",
+])
+def test_positive_inflections_match(lexicon, text):
+    assert lexicon.scan(text).positive == 1
+
+
+@pytest.mark.parametrize("text", [
+    "hate", "hates", "hated", "hating", "worried", "frustrated",
+])
+def test_negative_inflections_match(lexicon, text):
+    assert lexicon.scan(text).negative == 1
+
+
+@pytest.mark.parametrize("text, category", [
+    ("meetings", "work"),
+    ("studying", "learning"),
+    ("exercised", "health"),
+    ("exercising", "health"),
+    ("purchased", "shopping"),
+    ("ordering", "shopping"),
+])
+def test_category_inflections_match(lexicon, text, category):
+    assert lexicon.scan(text).categories == [category]
+
+
+@pytest.mark.parametrize("text", [
+    "lov", "hat", "lovs", "hats", "badge", "lovely", "hatred", "glove",
+])
+def test_non_inflections_do_not_match(lexicon, text):
+    hits = lexicon.scan(text)
+
+    assert (hits.positive, hits.negative, hits.categories) == (0, 0, [])
+
+
+def test_distinct_words_are_counted_once(lexicon):
+    hits = lexicon.scan("Loved it, love it, great and greater")
+
+    assert hits.positive == 2
+
+
+def test_action_cues_match_exactly(lexicon):
+    text = "I need to call Bob. We needed to wait."
+
+    assert lexicon.scan(text).action_cues == [(2, 9, 'high')]
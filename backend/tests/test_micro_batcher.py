@@ -0,0 +1,54 @@
+"""Tests for the micro-batching scheduler (app/services/micro_batcher.py)."""
+import asyncio
+
+from app.services.micro_batcher import MicroBatcher
+
+
+class RecordingProcess:
+    """Batch callback that doubles each item and records the batches."""
+
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        if "boom" in items:
+            raise ValueError("boom")
+        return [item * 2 for item in items]
+
+
+async def test_concurrent_submits_are_processed_as_one_batch():
+    process = RecordingProcess()
+    batcher = MicroBatcher(process, max_batch_size=32, max_wait=0.05)
+
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert results == [0, 2, 4, 6, 8]
+    assert process.batches == [[0, 1, 2, 3, 4]]
+
+
+async def test_batches_are_capped_at_max_batch_size():
+    process = RecordingProcess()
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait=60)
+
+    results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(8))), timeout=5)
+
+    assert results == [i * 2 for i in range(8)]
+    assert process.batches == [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+
+async def test_lone_submit_waits_at_most_max_wait():
+    process = RecordingProcess()
+    batcher = MicroBatcher(process, max_batch_size=32, max_wait=0.01)
+
+    assert await asyncio.wait_for(batcher.submit(21), timeout=5) == 42
+
+
+async def test_process_error_fails_the_whole_batch_only():
+    process = RecordingProcess()
+    batcher = MicroBatcher(process, max_batch_size=32, max_wait=0.05)
+
+    results = await asyncio.gather(batcher.submit("boom"), batcher.submit("x"), return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert await batcher.submit(3) == 6
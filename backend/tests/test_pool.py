@@ -0,0 +1,102 @@
+"""Tests for the SQLite connection pool (app/db/pool.py)."""
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.db.pool import ConnectionPool
+
+PRAGMAS = {'synchronous': 'NORMAL', 'cache_size': -4000, 'busy_timeout': 2500}
+
+
+@pytest.fixture
+async def pool(tmp_path):
+    """An open pool of two readers over a database with one table."""
+    pool = ConnectionPool(str(tmp_path / "pool.db"), readers=2, pragmas=PRAGMAS)
+    async with pool.writer() as conn:
+        await conn.execute("CREATE TABLE items (name TEXT)")
+        await conn.execute("INSERT INTO items VALUES ('first')")
+    try:
+        yield pool
+    finally:
+        await pool.close()
+
+
+async def pragma(conn, name):
+    async with conn.execute(f"PRAGMA {name}") as cursor:
+        return (await cursor.fetchone())[0]
+
+
+async def names(conn):
+    async with conn.execute("SELECT name FROM items ORDER BY rowid") as cursor:
+        return [row[0] for row in await cursor.fetchall()]
+
+
+async def test_every_connection_is_configured(pool):
+    connections = [pool._writer, *pool._readers]
+
+    assert len(connections) == 3
+    for conn in connections:
+        assert await pragma(conn, "journal_mode") == "wal"
+        assert await pragma(conn, "synchronous") == 1  # NORMAL
+        assert await pragma(conn, "cache_size") == -4000
+        assert await pragma(conn, "busy_timeout") == 2500
+
+
+async def test_readers_do_not_wait_for_an_open_write(pool):
+    async with pool.writer() as writer:
+        await writer.execute("INSERT INTO items VALUES ('uncommitted')")
+
+        async def read():
+            async with pool.reader() as conn:
+                return await names(conn)
+
+        seen = await asyncio.wait_for(asyncio.gather(read(), read()), timeout=2)
+
+    assert seen == [["first"], ["first"]]
+    async with pool.reader() as conn:
+        assert await names(conn) == ["first", "uncommitted"]
+
+
+async def test_failed_write_rolls_back(pool):
+    with pytest.raises(RuntimeError):
+        async with pool.writer() as conn:
+            await conn.execute("INSERT INTO items VALUES ('lost')")
+            raise RuntimeError("write failed")
+
+    async with pool.writer() as conn:
+        assert await names(conn) == ["first"]
+    async with pool.reader() as conn:
+        assert await names(conn) == ["first"]
+
+
+async def test_failed_statement_leaves_the_writer_usable(pool):
+    with pytest.raises(sqlite3.OperationalError):
+        async with pool.writer() as conn:
+            await conn.execute("INSERT INTO missing VALUES (1)")
+
+    async with pool.writer() as conn:
+        await conn.execute("INSERT INTO items VALUES ('second')")
+    async with pool.reader() as conn:
+        assert await names(conn) == ["first", "second"]
+
+
+async def test_readers_return_to_the_pool_after_errors(pool):
+    for _ in range(5):
+        with pytest.raises(sqlite3.OperationalError):
+            async with pool.reader() as conn:
+                await conn.execute("SELECT * FROM missing")
+
+    assert pool._idle.qsize() == 2
+    async with pool.reader() as first, pool.reader() as second:
+        assert first is not second
+        assert await names(first) == await names(second) == ["first"]
+
+
+async def test_failed_open_closes_what_it_opened(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), readers=2, pragmas={'cache_size': "not a number;"})
+
+    with pytest.raises(sqlite3.OperationalError):
+        await pool.open()
+
+    assert not pool.is_open
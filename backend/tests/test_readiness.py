@@ -0,0 +1,156 @@
+"""Tests for background load tracking (app/core/readiness.py) and /health, /ready."""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from app import main
+from app.core import readiness as readiness_module
+from app.core.config import settings
+from app.core.readiness import ComponentDegraded, Readiness, requires
+
+
+@pytest.fixture
+async def tracker(monkeypatch):
+    """A fresh tracker in place of the global one, with short waits."""
+    monkeypatch.setattr(settings, "READINESS_WAIT_SECONDS", 0.05)
+    tracker = Readiness()
+    monkeypatch.setattr(readiness_module, "readiness", tracker)
+    monkeypatch.setattr(main, "readiness", tracker)
+    yield tracker
+    await tracker.cancel()
+
+
+def loader(event):
+    """An initializer that finishes once event is set."""
+    async def init():
+        await event.wait()
+    return init
+
+
+async def instant():
+    pass
+
+
+async def failing():
+    raise RuntimeError("model missing")
+
+
+async def degraded():
+    raise ComponentDegraded("reduced mode")
+
+
+async def test_wait_for_is_a_503_with_retry_after_while_loading(tracker):
+    tracker.start("model", loader(asyncio.Event()))
+
+    with pytest.raises(HTTPException) as error:
+        await tracker.wait_for("model")
+
+    assert error.value.status_code == 503
+    assert error.value.headers["Retry-After"] == str(settings.READINESS_RETRY_AFTER)
+    assert tracker.report()["model"]['state'] == 'loading'
+
+
+async def test_wait_for_returns_once_the_component_loads(tracker):
+    loaded = asyncio.Event()
+    tracker.start("model", loader(loaded))
+    asyncio.get_running_loop().call_later(0.01, loaded.set)
+
+    await tracker.wait_for("model", timeout=1)
+
+    assert tracker.is_ready("model")
+    assert tracker.status == "healthy"
+
+
+async def test_wait_for_reports_a_failed_load(tracker):
+    tracker.start("model", failing)
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as error:
+        await tracker.wait_for("model")
+
+    assert error.value.status_code == 503
+    assert "model missing" in error.value.detail
+    assert tracker.status == "degraded"
+
+
+async def test_requires_is_a_503_while_loading(tracker):
+    app = FastAPI()
+
+    @app.get("/needs-model", dependencies=[requires("model")])
+    async def needs_model():
+        return {}
+
+    tracker.start("model", loader(asyncio.Event()))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/needs-model")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(settings.READINESS_RETRY_AFTER)
+
+
+async def test_degraded_components_are_usable(tracker):
+    await tracker.load("nlp", degraded)
+
+    assert tracker.is_ready("nlp")
+    assert tracker.all_ready
+    assert tracker.status == "degraded"
+    assert tracker.report()["nlp"]['state'] == 'degraded'
+    assert tracker.report()["nlp"]['error'] == "reduced mode"
+
+
+async def test_nlp_without_its_model_loads_degraded(tracker, monkeypatch):
+    async def load_without_model():
+        main.ai_processor.nlp_available = False
+    monkeypatch.setattr(main.ai_processor, "load_nlp", load_without_model)
+
+    with pytest.raises(ComponentDegraded):
+        await main.load_nlp()
+    await tracker.load("nlp", main.load_nlp)
+
+    assert tracker.report()["nlp"]['state'] == 'degraded'
+    assert settings.SPACY_MODEL in tracker.report()["nlp"]['error']
+
+
+@pytest.fixture
+async def client(tracker):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        yield client
+
+
+async def test_ready_is_a_503_while_loading_and_200_once_ready(tracker, client):
+    loaded = asyncio.Event()
+    await tracker.load("database", instant)
+    tracker.start("vector_store", loader(loaded))
+
+    starting = await client.get("/ready")
+    loaded.set()
+    await asyncio.sleep(0.01)
+    ready = await client.get("/ready")
+
+    assert starting.status_code == 503
+    assert starting.headers["Retry-After"] == str(settings.READINESS_RETRY_AFTER)
+    assert starting.json()['ready'] is False
+    assert ready.status_code == 200
+    assert ready.json()['ready'] is True
+
+
+async def test_health_reports_each_component(tracker, client):
+    tracker.start("embedding_model", loader(asyncio.Event()))
+    await asyncio.sleep(0)
+    await tracker.load("nlp", degraded)
+    with pytest.raises(RuntimeError):
+        await tracker.load("vector_store", failing)
+
+    response = await client.get("/health")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['status'] == "degraded"
+    assert {name: state['state'] for name, state in body['services'].items()} == {
+        'embedding_model': 'loading',
+        'nlp': 'degraded',
+        'vector_store': 'failed',
+    }
+    assert body['services']['vector_store']['error'] == "model missing"
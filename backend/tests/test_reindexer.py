@@ -0,0 +1,136 @@
+"""Tests for re-embedding into a shadow collection (app/services/reindexer.py)."""
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services import reindexer as reindexer_module
+from app.services import semantic_search as semantic_search_module
+from app.services.ai_processor import ai_processor
+from app.services.reindexer import Reindexer
+from app.services.semantic_search import SemanticSearchService
+
+
+@pytest.fixture
+async def search(database, tmp_path, monkeypatch):
+    """A search service over a flat store in tmp_path, used by the re-indexer."""
+    monkeypatch.setattr(settings, "VECTOR_STORE", "flat")
+    monkeypatch.setattr(settings, "VECTOR_INDEX", "exact")
+    monkeypatch.setattr(settings, "VECTOR_INDEX_DIR", str(tmp_path / "vectors"))
+    monkeypatch.setattr(settings, "USE_LOCAL_EMBEDDINGS", False)
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PATH", "")
+    service = SemanticSearchService()
+    monkeypatch.setattr(semantic_search_module, "db", database)
+    monkeypatch.setattr(reindexer_module, "db", database)
+    monkeypatch.setattr(reindexer_module, "semantic_search", service)
+    await service.initialize()
+    return service
+
+
+async def add_entries(database, search, contents):
+    entries = await database.create_entries_many([{'content': c, 'type': 'note'} for c in contents])
+    await search.add_entries([e['id'] for e in entries], contents)
+    return entries
+
+
+async def stored_embedding(search, entry_id):
+    return search.collection.get_embeddings([entry_id])[entry_id]
+
+
+async def test_reindex_swaps_in_a_full_shadow(database, search):
+    entries = await add_entries(database, search, [f"note number {i}" for i in range(7)])
+    original = search.collection_name
+
+    progress = await Reindexer(chunk_size=3).run()
+
+    assert progress['status'] == 'completed'
+    assert progress['indexed'] == 7
+    assert search.collection_name == progress['collection'] != original
+    assert set(search.collection.ids()) == {e['id'] for e in entries}
+    assert (await database.get_vector_collection("active"))['name'] == progress['collection']
+    assert await database.get_vector_collection("building") is None
+    with pytest.raises(ValueError):
+        search.store.get_collection(original)
+
+
+class Interrupted(Exception):
+    pass
+
+
+async def test_interrupted_reindex_resumes_from_its_checkpoint(database, search):
+    entries = await add_entries(database, search, [f"note number {i}" for i in range(7)])
+
+    def interrupt(progress):
+        raise Interrupted
+
+    with pytest.raises(Interrupted):
+        await Reindexer(chunk_size=3).run(on_progress=interrupt)
+    checkpoint = await database.get_vector_collection("building")
+    assert checkpoint['indexed'] == 3
+
+    progress = await Reindexer(chunk_size=3).run()
+
+    assert progress['collection'] == checkpoint['name']
+    assert progress['indexed'] == 7
+    assert set(search.collection.ids()) == {e['id'] for e in entries}
+
+
+async def test_catch_up_covers_edits_and_deletes_during_the_run(database, search):
+    entries = await add_entries(database, search, [f"note number {i}" for i in range(6)])
+    edited, deleted = entries[0], entries[5]
+    done = []
+
+    def change_entries(progress):
+        if not done:
+            done.append(asyncio.ensure_future(asyncio.gather(
+                database.update_entry(edited['id'], {'content': "edited while re-indexing"}),
+                database.delete_entry(deleted['id']),
+            )))
+
+    reindexer = Reindexer(chunk_size=3)
+    original_write = reindexer._write
+
+    async def slow_write(*args):
+        await asyncio.sleep(0.01)
+        await original_write(*args)
+
+    reindexer._write = slow_write
+    await reindexer.run(on_progress=change_entries)
+    await done[0]
+
+    assert deleted['id'] not in search.collection.ids()
+    expected = (await ai_processor.generate_embeddings(["edited while re-indexing"]))[0]
+    assert await stored_embedding(search, edited['id']) == pytest.approx(expected, abs=1e-6)
+
+
+async def test_writes_during_the_swap_land_in_the_new_collection(database, search):
+    await add_entries(database, search, ["first note", "second note"])
+    reindexer = Reindexer(chunk_size=10)
+    remove_deleted = reindexer._remove_deleted
+    late = {}
+
+    async def add_entry_during_swap(shadow):
+        # Committed after the last catch-up read; its vector write must wait for the swap
+        entry = await database.create_entry({'content': "captured during the swap", 'type': 'note'})
+        late['id'] = entry['id']
+        late['task'] = asyncio.create_task(search.add_entry(entry['id'], entry['content']))
+        await asyncio.sleep(0.05)
+        await remove_deleted(shadow)
+
+    reindexer._remove_deleted = add_entry_during_swap
+    progress = await reindexer.run()
+    await late['task']
+
+    assert search.collection_name == progress['collection']
+    assert late['id'] in search.collection.ids()
+
+
+async def test_onnx_reindex_rejects_a_model_other_than_the_export(database, search, monkeypatch):
+    monkeypatch.setattr(settings, "USE_LOCAL_EMBEDDINGS", True)
+    monkeypatch.setattr(settings, "EMBEDDING_BACKEND", "onnx")
+
+    with pytest.raises(ValueError):
+        Reindexer().start("another/model")
+    with pytest.raises(ValueError):
+        await Reindexer().run("another/model")
+    assert await database.get_vector_collection("building") is None
@@ -0,0 +1,111 @@
+"""Tests for POST /search/batch (app/api/entries.py)."""
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api import entries as entries_module
+from app.core import readiness as readiness_module
+from app.core.config import settings
+from app.core.readiness import Readiness
+from app.main import inference_overloaded_handler
+from app.services.inference import InferenceOverloaded
+from app.services import semantic_search as semantic_search_module
+from app.services.semantic_search import SemanticSearchService
+
+CONTENTS = [
+    "budget review with the client",
+    "hotel booking for the conference",
+    "weekly grocery list",
+    "client budget meeting notes",
+]
+
+
+@pytest.fixture
+async def service(client):
+    return entries_module.semantic_search
+
+
+@pytest.fixture
+async def client(database, tmp_path, monkeypatch):
+    """An API client over a flat store in tmp_path, holding CONTENTS."""
+    monkeypatch.setattr(settings, "VECTOR_STORE", "flat")
+    monkeypatch.setattr(settings, "VECTOR_INDEX", "exact")
+    monkeypatch.setattr(settings, "VECTOR_INDEX_DIR", str(tmp_path / "vectors"))
+    monkeypatch.setattr(settings, "USE_LOCAL_EMBEDDINGS", False)
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PATH", "")
+    service = SemanticSearchService()
+    monkeypatch.setattr(semantic_search_module, "db", database)
+    monkeypatch.setattr(entries_module, "db", database)
+    monkeypatch.setattr(entries_module, "semantic_search", service)
+    await service.initialize()
+
+    ready = Readiness()
+    for name in ("embedding_model", "vector_store"):
+        await ready.load(name, service.initialize)
+    monkeypatch.setattr(readiness_module, "readiness", ready)
+    monkeypatch.setattr(entries_module, "readiness", ready)
+
+    created = await database.create_entries_many([{'content': c, 'type': 'note'} for c in CONTENTS])
+    await service.add_entries([e['id'] for e in created], CONTENTS)
+
+    app = FastAPI()
+    app.include_router(entries_module.router)
+    app.add_exception_handler(InferenceOverloaded, inference_overloaded_handler)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+def ranked(results):
+    return [(r['entry']['id'], r['highlights']) for r in results]
+
+
+@pytest.mark.parametrize("mode", ["semantic", "keyword", "hybrid"])
+async def test_batch_matches_single_searches(client, mode):
+    queries = ["client budget", "hotel", "groceries"]
+
+    response = await client.post("/search/batch", json={'queries': queries, 'limit': 3, 'mode': mode})
+
+    assert response.status_code == 200
+    batch = response.json()
+    assert [item['query'] for item in batch] == queries
+    for query, item in zip(queries, batch):
+        single = await client.get("/search", params={'query': query, 'limit': 3, 'mode': mode})
+        assert ranked(item['results']) == ranked(single.json())
+        assert [r['score'] for r in item['results']] == pytest.approx([r['score'] for r in single.json()], abs=1e-5)
+
+
+async def test_batch_over_the_query_limit_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_BATCH_MAX_QUERIES", 2)
+
+    response = await client.post("/search/batch", json={'queries': ["a", "b", "c"]})
+
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize("body", [
+    {'queries': []},
+    {'queries': ["budget", ""]},
+    {'queries': ["budget"], 'mode': "fuzzy"},
+    {'queries': ["budget"], 'limit': 0},
+])
+async def test_batch_rejects_invalid_requests(client, body):
+    response = await client.post("/search/batch", json=body)
+
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("mode", ["semantic", "hybrid"])
+async def test_overloaded_inference_is_a_503_with_retry_after(client, service, monkeypatch, mode):
+    async def overloaded(*args, **kwargs):
+        raise InferenceOverloaded(retry_after=3)
+    monkeypatch.setattr(service, "search", overloaded)
+    monkeypatch.setattr(service, "search_many", overloaded)
+    monkeypatch.setattr(service, "hybrid_search", overloaded)
+    monkeypatch.setattr(service, "hybrid_search_many", overloaded)
+
+    single = await client.get("/search", params={'query': "budget", 'mode': mode})
+    batch = await client.post("/search/batch", json={'queries': ["budget"], 'mode': mode})
+
+    for response in (single, batch):
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
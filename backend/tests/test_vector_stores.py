@@ -0,0 +1,381 @@
+"""Tests for the flat vector store (app/services/vector_stores.py)."""
+import time
+
+import numpy as np
+import pytest
+
+from app.services import vector_stores
+from app.services.quantization import hamming_distances, pack_signs
+from app.services.vector_stores import FlatVectorStore, VectorCollection, VectorStore
+
+DIMENSION = 32
+
+
+def normalized(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture(scope="module")
+def data():
+    """(ids, vectors, queries, exact top-1 ID per query) for 600 clustered rows."""
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((20, DIMENSION))
+    vectors = normalized(centers[rng.integers(0, 20, 600)] + 0.3 * rng.standard_normal((600, DIMENSION)))
+    ids = [f"entry-{i}" for i in range(600)]
+    queries = normalized(vectors[:40] + 0.05 * rng.standard_normal((40, DIMENSION)))
+    nearest = [ids[i] for i in np.argmax(queries @ vectors.T, axis=1)]
+    return ids, vectors.astype(np.float32), queries.astype(np.float32), nearest
+
+
+def open_collection(path, name="test", **options):
+    return FlatVectorStore(str(path), **options).get_or_create_collection(name)
+
+
+def top1(collection, queries):
+    return [matches[0]['entry_id'] for matches in collection.query_many(queries.tolist(), 1)]
+
+
+def test_interfaces_are_abstract():
+    with pytest.raises(TypeError):
+        VectorCollection()
+    with pytest.raises(TypeError):
+        VectorStore()
+
+
+def test_exact_search_returns_the_nearest_rows(tmp_path, data):
+    ids, vectors, queries, nearest = data
+    collection = open_collection(tmp_path)
+    collection.upsert(ids, vectors.tolist())
+
+    matches = collection.query(queries[0].tolist(), 5)
+
+    assert top1(collection, queries) == nearest
+    assert [m['entry_id'] for m in matches][0] == nearest[0]
+    distances = [m['distance'] for m in matches]
+    assert distances == sorted(distances)
+    expected = 2 - 2 * float(queries[0] @ vectors[ids.index(nearest[0])])
+    assert distances[0] == pytest.approx(expected, abs=1e-5)
+
+
+def test_query_many_matches_single_queries(tmp_path, data):
+    ids, vectors, queries, _ = data
+    collection = open_collection(tmp_path)
+    collection.upsert(ids, vectors.tolist())
+
+    batched = collection.query_many(queries[:8].tolist(), 5)
+
+    for matches, query in zip(batched, queries[:8]):
+        single = collection.query(query.tolist(), 5)
+        assert [m['entry_id'] for m in matches] == [m['entry_id'] for m in single]
+        assert [m['distance'] for m in matches] == pytest.approx([m['distance'] for m in single], abs=1e-5)
+
+
+def test_upsert_replaces_and_delete_tombstones(tmp_path, data):
+    ids, vectors, queries, nearest = data
+    collection = open_collection(tmp_path)
+    collection.upsert(ids, vectors.tolist())
+
+    collection.delete([nearest[0], "unknown"])
+    assert nearest[0] not in [m['entry_id'] for m in collection.query(queries[0].tolist(), 10)]
+    assert collection.count() == len(ids) - 1
+
+    collection.upsert(["entry-1"], [queries[0].tolist()])
+    assert collection.query(queries[0].tolist(), 1)[0]['entry_id'] == "entry-1"
+    assert collection.count() == len(ids) - 1
+    assert collection.get_embeddings(["entry-1"])["entry-1"] == pytest.approx(queries[0].tolist(), abs=1e-6)
+
+
+def test_update_ignores_unknown_ids(tmp_path, data):
+    ids, vectors, _, _ = data
+    collection = open_collection(tmp_path)
+    collection.upsert(ids[:2], vectors[:2].tolist())
+
+    collection.update(["entry-0", "unknown"], vectors[2:4].tolist())
+
+    assert sorted(collection.ids()) == ["entry-0", "entry-1"]
+    assert collection.get_embeddings(["entry-0"])["entry-0"] == pytest.approx(vectors[2].tolist(), abs=1e-6)
+
+
+def test_compaction_drops_tombstones_and_keeps_results(tmp_path, data, monkeypatch):
+    ids, vectors, queries, _ = data
+    monkeypatch.setattr(vector_stores, "COMPACT_MIN_ROWS", 0)
+    collection = open_collection(tmp_path, compact_ratio=0.2)
+    collection.upsert(ids, vectors.tolist())
+    live = ids[::2]
+
+    collection.delete(ids[1::2])
+
+    assert collection.meta['generation'] == 1
+    assert collection._rows == len(live)
+    assert sorted(collection.ids()) == sorted(live)
+    assert not (tmp_path / "test" / "vectors-0.f32").exists()
+    expected = [ids[i * 2] for i in np.argmax(queries @ vectors[::2].T, axis=1)]
+    assert top1(collection, queries) == expected
+
+
+def test_collection_reopens_from_disk(tmp_path, data):
+    ids, vectors, queries, nearest = data
+    collection = open_collection(tmp_path)
+    collection.upsert(ids, vectors.tolist())
+    collection.delete(ids[:10])
+    collection.compact()
+
+    reopened = open_collection(tmp_path)
+
+    assert reopened.count() == len(ids) - 10
+    assert top1(reopened, queries) == top1(collection, queries)
+
+
+def test_torn_append_is_truncated_on_open(tmp_path, data):
+    ids, vectors, _, _ = data
+    collection = open_collection(tmp_path)
+    collection.upsert(ids[:3], vectors[:3].tolist())
+    # A crash after writing a vector but before its ID
+    with open(tmp_path / "test" / "vectors-0.f32", "ab") as f:
+        f.write(vectors[3].tobytes())
+
+    reopened = open_collection(tmp_path)
+
+    assert sorted(reopened.ids()) == sorted(ids[:3])
+    reopened.upsert(["entry-3"], [vectors[3].tolist()])
+    assert reopened.count() == 4
+
+
+def test_metadata_filters_are_rejected(tmp_path, data):
+    ids, vectors, queries, _ = data
+    collection = open_collection(tmp_path)
+    collection.upsert(ids, vectors.tolist())
+
+    with pytest.raises(ValueError):
+        collection.query(queries[0].tolist(), 1, where={'type': 'note'})
+
+
+def test_wrong_dimension_is_rejected(tmp_path, data):
+    ids, vectors, _, _ = data
+    collection = open_collection(tmp_path)
+    collection.upsert(ids[:1], vectors[:1].tolist())
+
+    with pytest.raises(ValueError):
+        collection.upsert(["other"], [[1.0, 0.0]])
+
+
+def test_store_collections(tmp_path, data):
+    ids, vectors, _, _ = data
+    store = FlatVectorStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.get_collection("missing")
+
+    store.get_or_create_collection("a").upsert(ids[:1], vectors[:1].tolist())
+    assert FlatVectorStore(str(tmp_path)).get_collection("a").ids() == ids[:1]
+
+    store.delete_collection("a")
+    with pytest.raises(ValueError):
+        store.get_collection("a")
+
+
+# IVF index
+
+def ivf_collection(path, data, **options):
+    ids, vectors, _, _ = data
+    # Trained explicitly below instead of by the background thread
+    collection = open_collection(path, index="ivf", nlist=20, nprobe=4, ivf_min_rows=10 ** 9, **options)
+    collection.upsert(ids, vectors.tolist())
+    collection.train_ivf()
+    return collection
+
+
+def test_ivf_returns_the_exact_top1(tmp_path, data):
+    _, _, queries, nearest = data
+    collection = ivf_collection(tmp_path, data)
+
+    assert collection.ivf.trained
+    assert top1(collection, queries) == nearest
+
+
+def test_ivf_scans_only_the_probed_cells(tmp_path, data):
+    _, _, queries, _ = data
+    collection = ivf_collection(tmp_path, data)
+
+    candidates = collection.ivf.candidates(queries[0])
+
+    assert 0 < len(candidates) < collection.count()
+
+
+def test_ivf_assigns_rows_added_after_training(tmp_path, data):
+    _, _, queries, _ = data
+    collection = ivf_collection(tmp_path, data)
+
+    collection.upsert(["late"], [queries[0].tolist()])
+
+    assert collection.query(queries[0].tolist(), 1)[0]['entry_id'] == "late"
+
+
+def test_ivf_skips_tombstoned_rows(tmp_path, data):
+    _, _, queries, nearest = data
+    collection = ivf_collection(tmp_path, data)
+
+    collection.delete([nearest[0]])
+
+    assert nearest[0] not in [m['entry_id'] for m in collection.query(queries[0].tolist(), 10)]
+
+
+def test_ivf_survives_compaction_and_reopening(tmp_path, data):
+    ids, vectors, queries, _ = data
+    collection = ivf_collection(tmp_path, data)
+    collection.delete(ids[1::2])
+    collection.compact()
+    expected = [ids[i * 2] for i in np.argmax(queries @ vectors[::2].T, axis=1)]
+
+    assert collection.ivf.trained
+    assert top1(collection, queries) == expected
+
+    reopened = open_collection(tmp_path, index="ivf", nlist=20, nprobe=4, ivf_min_rows=10 ** 9)
+    assert reopened.ivf.trained
+    assert top1(reopened, queries) == expected
+
+
+def test_ivf_trains_in_the_background_once_big_enough(tmp_path, data):
+    ids, vectors, queries, nearest = data
+    collection = open_collection(tmp_path, index="ivf", nlist=20, nprobe=4, ivf_min_rows=len(ids))
+    collection.upsert(ids[:-1], vectors[:-1].tolist())
+    assert not collection.ivf.trained
+
+    collection.upsert(ids[-1:], vectors[-1:].tolist())
+    for _ in range(500):
+        if collection.ivf.trained:
+            break
+        time.sleep(0.01)
+
+    assert collection.ivf.trained
+    assert top1(collection, queries) == nearest
+
+
+# Binary codes
+
+def test_pack_signs_and_hamming_distances():
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((50, 20)).astype(np.float32)
+    query = rng.standard_normal(20).astype(np.float32)
+
+    codes = pack_signs(vectors)
+    distances = hamming_distances(codes, pack_signs(query[None])[0])
+
+    assert codes.shape == (50, 3)
+    assert distances.tolist() == ((vectors > 0) != (query > 0)).sum(axis=1).tolist()
+
+
+def test_binary_returns_the_exact_top1(tmp_path, data):
+    ids, vectors, queries, nearest = data
+    collection = open_collection(tmp_path, index="binary", binary_candidates=50)
+    collection.upsert(ids, vectors.tolist())
+
+    assert collection._codes.shape == (len(ids), DIMENSION // 8)
+    assert top1(collection, queries) == nearest
+
+
+def test_binary_skips_tombstoned_rows(tmp_path, data):
+    ids, vectors, queries, nearest = data
+    collection = open_collection(tmp_path, index="binary", binary_candidates=50)
+    collection.upsert(ids, vectors.tolist())
+
+    collection.delete([nearest[0]])
+
+    assert nearest[0] not in [m['entry_id'] for m in collection.query(queries[0].tolist(), 10)]
+
+
+def test_binary_codes_are_built_for_existing_rows(tmp_path, data):
+    ids, vectors, queries, nearest = data
+    open_collection(tmp_path).upsert(ids, vectors.tolist())
+
+    collection = open_collection(tmp_path, index="binary", binary_candidates=50)
+
+    assert collection._codes.shape == (len(ids), DIMENSION // 8)
+    assert top1(collection, queries) == nearest
+    collection.delete(ids[1::2])
+    collection.compact()
+    assert len(collection._codes) == len(ids) // 2
+
+
+# float16 and PCA storage
+
+def recall(found, nearest):
+    return sum(a == b for a, b in zip(found, nearest)) / len(nearest)
+
+
+def wait_for_pca(collection):
+    for _ in range(500):
+        if collection.meta.get('pca') and not collection._fitting:
+            return
+        time.sleep(0.01)
+
+
+def test_float16_returns_the_exact_top1_at_half_the_size(tmp_path, data):
+    ids, vectors, queries, nearest = data
+    collection = open_collection(tmp_path, precision="float16")
+    collection.upsert(ids, vectors.tolist())
+
+    assert collection._vectors.dtype == np.float16
+    assert (tmp_path / "test" / "vectors-0.f16").stat().st_size == len(ids) * DIMENSION * 2
+    assert top1(collection, queries) == nearest
+    assert top1(open_collection(tmp_path), queries) == nearest
+
+
+def test_pca_is_fitted_in_the_background(tmp_path, data):
+    ids, vectors, queries, nearest = data
+    collection = open_collection(tmp_path, pca_dimension=24, pca_min_rows=400)
+    collection.upsert(ids[:300], vectors[:300].tolist())
+    assert not collection.meta.get('pca')
+
+    collection.upsert(ids[300:], vectors[300:].tolist())
+    wait_for_pca(collection)
+
+    assert collection.meta['dimension'] == 24
+    assert collection.meta['pca']['input_dimension'] == DIMENSION
+    assert collection.count() == len(ids)
+    assert recall(top1(collection, queries), nearest) >= 0.9
+
+
+def test_pca_rows_added_later_are_projected(tmp_path, data):
+    ids, vectors, queries, _ = data
+    collection = open_collection(tmp_path, pca_dimension=24, pca_min_rows=10 ** 9)
+    collection.upsert(ids, vectors.tolist())
+    collection.fit_pca()
+
+    collection.upsert(["late"], [queries[0].tolist()])
+
+    assert collection.query(queries[0].tolist(), 1)[0]['entry_id'] == "late"
+    restored = np.array(collection.get_embeddings(["late"])["late"])
+    assert restored.shape == (DIMENSION,)
+    assert float(restored @ queries[0]) > 0.9
+
+
+def test_fit_pca_is_a_no_op_once_fitted(tmp_path, data):
+    ids, vectors, _, _ = data
+    collection = open_collection(tmp_path, pca_dimension=24, pca_min_rows=10 ** 9)
+    collection.upsert(ids, vectors.tolist())
+    collection.fit_pca()
+    generation = collection.meta['generation']
+
+    collection.fit_pca()
+
+    assert collection.meta['generation'] == generation
+
+
+def test_float16_pca_with_ivf_and_binary(tmp_path, data):
+    ids, vectors, queries, nearest = data
+    for index in ("ivf", "binary"):
+        collection = open_collection(
+            tmp_path, index, index=index, precision="float16", pca_dimension=24, pca_min_rows=10 ** 9,
+            nlist=20, nprobe=4, ivf_min_rows=10 ** 9, binary_candidates=100
+        )
+        collection.upsert(ids, vectors.tolist())
+        collection.fit_pca()
+        if index == "ivf":
+            collection.train_ivf()
+
+        assert recall(top1(collection, queries), nearest) >= 0.9, index
+
+
+def test_unknown_precision_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        open_collection(tmp_path, precision="int4")
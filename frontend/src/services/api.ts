@@ -26,9 +26,18 @@ export interface Entry {
   ai_key_phrases: string[];
   extracted_actions: any[];
   related_entry_ids: string[];
+  processing_status: 'pending' | 'processing' | 'completed' | 'failed';
   view_count: number;
 }
 
+export interface EnrichmentStatus {
+  entry_id: string;
+  processing_status: Entry['processing_status'];
+  attempts: number;
+  last_error?: string;
+  next_attempt_at?: string;
+}
+
 export interface CreateEntryRequest {
   content: string;
   type?: string;
@@ -41,6 +50,11 @@ export interface SearchResult {
   highlights: string[];
 }
 
+export interface SearchBatchResult {
+  query: string;
+  results: SearchResult[];
+}
+
 export interface GraphNode {
   id: string;
   label: string;
@@ -70,16 +84,26 @@ export const entryAPI = {
     return response.data;
   },
 
-  list: async (params?: { limit?: number; offset?: number; type?: string; tag?: string }): Promise<Entry[]> => {
+  list: async (params?: { limit?: number; offset?: number; cursor?: string; type?: string; tag?: string }): Promise<Entry[]> => {
     const response = await api.get('/api/v1/entries', { params });
     return response.data;
   },
 
+  listPage: async (params?: { limit?: number; cursor?: string; type?: string; tag?: string }): Promise<{ entries: Entry[]; nextCursor?: string }> => {
+    const response = await api.get('/api/v1/entries', { params });
+    return { entries: response.data, nextCursor: response.headers['x-next-cursor'] };
+  },
+
   get: async (id: string): Promise<Entry> => {
     const response = await api.get(`/api/v1/entries/${id}`);
     return response.data;
   },
 
+  status: async (id: string): Promise<EnrichmentStatus> => {
+    const response = await api.get(`/api/v1/entries/${id}/status`);
+    return response.data;
+  },
+
   update: async (id: string, data: Partial<CreateEntryRequest>): Promise<Entry> => {
     const response = await api.put(`/api/v1/entries/${id}`, data);
     return response.data;
@@ -96,6 +120,11 @@ export const searchAPI = {
     const response = await api.get('/api/v1/search', { params: { query, limit } });
     return response.data;
   },
+
+  searchBatch: async (queries: string[], limit: number = 10): Promise<SearchBatchResult[]> => {
+    const response = await api.post('/api/v1/search/batch', { queries, limit });
+    return response.data;
+  },
 };
 
 // Graph API